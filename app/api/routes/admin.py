@@ -0,0 +1,80 @@
+"""
+Routes d'administration (clé d'API de scope "admin")
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.core.api_keys import require_admin_key
+from app.core.config import get_settings
+from app.core.db_instrumentation import query_stats
+from app.core.profiling import (
+    COVERAGE,
+    SORT_KEYS,
+    ProfilingBusyError,
+    profiling_session,
+    stats_to_json,
+    stats_to_text,
+)
+
+router = APIRouter(prefix="/admin", tags=["administration"], dependencies=[Depends(require_admin_key)])
+settings = get_settings()
+
+
+@router.post("/profile")
+async def profile_worker(
+    requests: int = Query(100, ge=1, le=100_000, description="Nombre de requêtes à profiler"),
+    seconds: float = Query(30.0, gt=0, description="Durée maximale du profilage"),
+    format: str = Query("json", pattern="^(json|text)$", description="json ou text (pstats)"),
+    sort: str = Query("cumulative", description="cumulative, tottime ou ncalls"),
+    limit: int = Query(50, ge=1, le=1000, description="Nombre de fonctions retournées")
+):
+    """
+    Profile ce worker pendant les `requests` prochaines requêtes ou `seconds` secondes
+
+    La réponse est renvoyée à la fin de la session : statistiques cProfile
+    agrégées, triées par temps cumulé par défaut. Seul le thread de la boucle
+    d'événements est profilé (`coverage`) : le scoring des lots et les écritures
+    exécutés dans des threads n'y figurent que comme attente.
+    """
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profilage désactivé")
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"Tri inconnu: {sort}")
+    if seconds > settings.PROFILING_MAX_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Durée maximale : {settings.PROFILING_MAX_SECONDS} secondes"
+        )
+
+    try:
+        stats = await profiling_session.run(requests, seconds)
+    except ProfilingBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if format == "text":
+        return PlainTextResponse(stats_to_text(stats, sort, limit))
+    return {
+        "requests_profiled": profiling_session.requests_profiled,
+        "coverage": COVERAGE,
+        "total_calls": stats.total_calls,
+        "total_time": round(stats.total_tt, 6),
+        "functions": stats_to_json(stats, sort, limit),
+    }
+
+
+@router.get("/queries")
+async def query_fingerprints(
+    sort: str = Query("total", pattern="^(total|count|p95)$", description="total, count ou p95"),
+    limit: int = Query(50, ge=1, le=1000, description="Nombre d'empreintes retournées"),
+    reset: bool = Query(False, description="Remet les compteurs à zéro après lecture")
+):
+    """
+    Requêtes SQL agrégées par empreinte (paramètres retirés)
+
+    Exécutions, temps total, moyenne, p95 et maximum depuis le démarrage du
+    worker ou la dernière remise à zéro.
+    """
+    fingerprints = query_stats.snapshot(sort, limit)
+    if reset:
+        query_stats.clear()
+    return {"fingerprints": fingerprints}
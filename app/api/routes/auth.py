@@ -0,0 +1,85 @@
+"""
+Route d'émission des tokens d'accès (OAuth2 password flow)
+"""
+import secrets
+from datetime import timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.login_limiter import FailedLoginLimiter
+from app.core.security import create_access_token, hash_password_async, verify_password_async
+from app.models.database import User, get_db
+from app.models.schemas import TokenResponse
+
+router = APIRouter(tags=["authentification"])
+settings = get_settings()
+
+login_limiter = FailedLoginLimiter(
+    max_failures=settings.LOGIN_MAX_FAILURES,
+    window=settings.LOGIN_FAILURE_WINDOW_SECONDS
+)
+
+# Hash de référence pour les utilisateurs inconnus (même durée de réponse)
+_dummy_hash: Optional[str] = None
+
+
+async def _get_dummy_hash() -> str:
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = await hash_password_async(secrets.token_urlsafe(16))
+    return _dummy_hash
+
+
+@router.post("/token", response_model=TokenResponse)
+async def login_for_access_token(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db)
+):
+    """
+    Émet un token d'accès JWT
+
+    - **username**: Nom d'utilisateur
+    - **password**: Mot de passe
+
+    Après `LOGIN_MAX_FAILURES` échecs pour un utilisateur ou une adresse IP,
+    les tentatives sont refusées (429) jusqu'à la fin de la fenêtre.
+    """
+    client_ip = request.client.host if request.client else "unknown"
+    keys = [f"user:{form_data.username}", f"ip:{client_ip}"]
+
+    retry_after = login_limiter.retry_after(keys)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Trop de tentatives de connexion. Réessayez plus tard.",
+            headers={"Retry-After": str(int(retry_after) + 1)},
+        )
+
+    user = db.query(User).filter(User.username == form_data.username).first()
+    hashed_password = user.hashed_password if user is not None else await _get_dummy_hash()
+    valid, new_hash = await verify_password_async(form_data.password, hashed_password)
+
+    if user is None or not valid or not user.is_active:
+        login_limiter.record_failure(keys)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Nom d'utilisateur ou mot de passe incorrect",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if new_hash is not None:
+        # Facteur de coût modifié : enregistrer le nouveau hash
+        user.hashed_password = new_hash
+        db.commit()
+
+    login_limiter.reset(keys[:1])
+    expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return TokenResponse(
+        access_token=create_access_token({"sub": user.username}, expires_delta=expires),
+        expires_in=int(expires.total_seconds()),
+    )
@@ -1,11 +1,18 @@
 """
-Route de health check
+Routes de health check
+
+`/health` renvoie l'état des dépendances mis en cache par la tâche de fond
+(voir app/core/health.py). `/health/live` et `/health/ready` sont en temps
+constant, pour des sondes Kubernetes fréquentes.
 """
+import time
+
 from fastapi import APIRouter
-from app.models.schemas import HealthResponse
-from ml.model_loader import model_loader
-from sqlalchemy import create_engine, text
+from fastapi.responses import JSONResponse
+
 from app.core.config import get_settings
+from app.core.health import health_monitor
+from app.models.schemas import HealthResponse
 
 router = APIRouter(tags=["health"])
 settings = get_settings()
@@ -14,30 +21,39 @@ settings = get_settings()
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """
-    Vérifie l'état de l'API, du modèle et de la base de données
+    Vérifie l'état de l'API, du modèle et de la base de données (dernier état connu)
     """
-    # Vérifier le modèle
-    model_loaded = model_loader.is_loaded()
-    
-    # Vérifier la base de données
-    database_connected = False
-    try:
-        engine = create_engine(settings.DATABASE_URL)
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-            database_connected = True
-    except Exception:
-        database_connected = False
+    health = await health_monitor.current()
     
-    status = "healthy" if (model_loaded and database_connected) else "degraded"
+    status = "healthy" if health.healthy else "degraded"
     message = "API opérationnelle" if status == "healthy" else "API fonctionnelle mais certaines dépendances ne sont pas disponibles"
     
     return HealthResponse(
         status=status,
         message=message,
-        model_loaded=model_loaded,
-        database_connected=database_connected,
-        version=settings.API_VERSION
+        model_loaded=health.model_loaded,
+        database_connected=health.database_connected,
+        version=settings.API_VERSION,
+        database_latency_ms=health.database_latency_ms,
+        checked_seconds_ago=round(time.monotonic() - health.checked_at, 3)
     )
 
 
+@router.get("/health/live")
+async def liveness():
+    """Sonde de vivacité : le processus répond"""
+    return {"status": "alive"}
+
+
+@router.get("/health/ready")
+async def readiness():
+    """
+    Sonde de disponibilité : le modèle est chargé (dernier état connu)
+
+    La base n'est pas requise : les prédictions sont alors placées dans le
+    spool local et rejouées à son retour.
+    """
+    health = health_monitor.status
+    if health is None or not health.model_loaded:
+        return JSONResponse(status_code=503, content={"status": "not_ready"})
+    return {"status": "ready", "database_connected": health.database_connected}
@@ -0,0 +1,70 @@
+"""
+Route d'exposition des métriques (format Prometheus)
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.admission import admission_controller
+from app.core.metrics import registry
+from app.core.rate_limit import rate_limiter
+from app.core.security import token_cache
+from app.models.persistence import prediction_writer
+from ml.model_loader import model_loader
+
+router = APIRouter(tags=["monitoring"])
+
+
+def _lane_stat(key: str):
+    return lambda: {(lane,): stats[key] for lane, stats in admission_controller.stats().items()}
+
+
+def _model_info():
+    metadata = model_loader.metadata or {}
+    version = metadata.get("model_version", "1.0.0")
+    return {(version, str(model_loader.is_loaded()).lower()): 1}
+
+
+# Métriques calculées à la lecture depuis l'état des composants
+registry.gauge("model_info", "Version du modèle servi", ("model_version", "loaded"), _model_info)
+registry.gauge("admission_active_requests", "Requêtes en cours par voie", ("lane",), _lane_stat("active"))
+registry.gauge("admission_queue_depth", "Requêtes en attente par voie", ("lane",), _lane_stat("queued"))
+registry.counter_function(
+    "admission_admitted_total", "Requêtes admises par voie", ("lane",), _lane_stat("admitted")
+)
+registry.counter_function(
+    "admission_rejected_total", "Requêtes refusées (file pleine) par voie", ("lane",), _lane_stat("rejected")
+)
+registry.counter_function(
+    "admission_timed_out_total", "Requêtes refusées (attente trop longue) par voie", ("lane",),
+    _lane_stat("timed_out")
+)
+registry.counter_function(
+    "rate_limit_accepted_units_total", "Unités acceptées par budget", ("budget",),
+    lambda: {(name,): s["accepted_units"] for name, s in rate_limiter.stats().items()}
+)
+registry.counter_function(
+    "rate_limit_rejected_total", "Requêtes refusées par budget", ("budget",),
+    lambda: {(name,): s["rejected_requests"] for name, s in rate_limiter.stats().items()}
+)
+registry.gauge(
+    "token_cache_hit_ratio", "Taux de succès du cache de tokens JWT",
+    function=lambda: token_cache.stats()["hit_rate"]
+)
+registry.counter_function(
+    "prediction_spooled_total", "Prédictions placées dans le spool local",
+    function=lambda: prediction_writer.spooled_count
+)
+registry.counter_function(
+    "prediction_replayed_total", "Prédictions rejouées depuis le spool",
+    function=lambda: prediction_writer.replayed_count
+)
+registry.gauge(
+    "db_circuit_breaker_open", "Disjoncteur de la base ouvert (1) ou fermé (0)",
+    function=lambda: int(prediction_writer.breaker.state != "closed")
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Métriques au format texte Prometheus"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,23 +1,54 @@
 """
 Routes pour les prédictions d'attrition
 """
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+from contextlib import contextmanager
+
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import date
+from time import perf_counter
 import pandas as pd
 
-from app.models.schemas import PredictRequest, PredictResponse
-from app.models.database import get_db, Prediction
+from app.core.admission import admission, admission_slot
+from app.core.api_keys import require_api_key
+from app.core.config import get_settings
+from app.core.metrics import (
+    STAGE_VALIDATION, STAGE_FEATURES, STAGE_MODEL, STAGE_PERSIST, STAGE_SERIALIZE,
+    batch_size, predictions_total
+)
+from app.core.rate_limit import enforce_rate_limit, rate_limit, refund_on_reject, refund_rate_limit
+from app.core.tracing import aggregate_spans, record_span, set_attribute, span
+from app.models.schemas import PredictRequest, PredictResponse, CurrentRiskResponse
+from app.models.database import get_db, get_read_db, Prediction
+from app.models.aggregates import query_stats
+from app.models.current_risk import get_current_risks, get_top_risks
+from app.models.persistence import prediction_sink, PredictionRecord
 from ml.model_loader import model_loader
 from ml.preprocessor import AttritionPreprocessor
 
-router = APIRouter(prefix="/predict", tags=["predictions"])
+settings = get_settings()
+
+# Clé d'API exigée si API_KEY_AUTH_ENABLED est activé
+router = APIRouter(
+    prefix="/predict",
+    tags=["predictions"],
+    dependencies=[Depends(require_api_key("predict"))]
+)
 
 # Initialiser le préprocesseur
 preprocessor = AttritionPreprocessor()
 
 
-@router.post("/attrition", response_model=PredictResponse)
+@router.post(
+    "/attrition",
+    response_model=PredictResponse,
+    dependencies=[
+        Depends(rate_limit("predict")),
+        Depends(admission("interactive", on_reject=refund_on_reject("predict")))
+    ]
+)
 async def predict_attrition(
     request: PredictRequest,
     db: Session = Depends(get_db)
@@ -33,71 +64,154 @@ async def predict_attrition(
     
     Retourne la prédiction avec la probabilité d'attrition.
     """
+    with _prediction_errors():
+        data, result, scored_at = _score(request)
+        # Sauvegarder la prédiction via le sink configuré (base ou journal colonnaire)
+        prediction_id = await prediction_sink.write_async(db, _record(request, data, result))
+        return _respond(request, result, prediction_id, scored_at)
+
+
+def _predict_one(request: PredictRequest, db: Session) -> PredictResponse:
+    """Prédiction et persistance d'une ligne (synchrone : lignes des lots, dans un thread)"""
+    with _prediction_errors():
+        data, result, scored_at = _score(request)
+        prediction_id = prediction_sink.write(db, _record(request, data, result))
+        return _respond(request, result, prediction_id, scored_at)
+
+
+@contextmanager
+def _prediction_errors():
+    """Convertit les erreurs inattendues en 500 (les HTTPException passent telles quelles)"""
     try:
-        # Vérifier que le modèle est chargé
-        if not model_loader.is_loaded():
-            # Tentative de chargement
-            model_loaded = model_loader.load()
-            if not model_loaded:
-                raise HTTPException(
-                    status_code=503,
-                    detail="Le modèle n'est pas disponible. Veuillez charger le modèle d'abord."
-                )
-        
-        # Convertir la requête en dictionnaire
-        data = request.dict(exclude_none=True)
-        
-        # Valider les données
-        is_valid, errors = preprocessor.validate_input(data)
-        if not is_valid:
-            raise HTTPException(status_code=400, detail=f"Erreurs de validation: {', '.join(errors)}")
-        
-        # Préprocesser les données
-        processed_data = preprocessor.prepare_features(data)
-        
-        # Faire la prédiction
-        result = model_loader.predict(processed_data)
-        
-        # Sauvegarder la prédiction en base de données
-        db_prediction = Prediction(
-            employee_id=request.employee_id,
-            input_data=data,
-            prediction=result['prediction'],
-            probability=result['probability'],
-            class_name=result['class_name'],
-            model_version=model_loader.metadata.get('model_version', '1.0.0') if model_loader.metadata else '1.0.0'
-        )
-        db.add(db_prediction)
-        db.commit()
-        db.refresh(db_prediction)
-        
-        # Ajouter l'ID de la prédiction à la réponse
-        result['employee_id'] = request.employee_id
-        result['prediction_id'] = db_prediction.id
-        
-        return PredictResponse(**result)
-        
+        yield
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de la prédiction: {str(e)}")
 
 
+def _model_version() -> str:
+    return model_loader.metadata.get('model_version', '1.0.0') if model_loader.metadata else '1.0.0'
+
+
+def _score(request: PredictRequest) -> Tuple[Dict[str, Any], Dict[str, Any], float]:
+    """
+    Validation, préparation et prédiction d'une ligne
+
+    Returns:
+        Données d'entrée, résultat du modèle et instant de fin du scoring
+    """
+    # Vérifier que le modèle est chargé
+    if not model_loader.is_loaded():
+        # Tentative de chargement
+        model_loaded = model_loader.load()
+        if not model_loaded:
+            raise HTTPException(
+                status_code=503,
+                detail="Le modèle n'est pas disponible. Veuillez charger le modèle d'abord."
+            )
+    
+    # Convertir la requête en dictionnaire
+    t0 = perf_counter()
+    data = request.dict(exclude_none=True)
+    
+    # Valider les données
+    is_valid, errors = preprocessor.validate_input(data)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=f"Erreurs de validation: {', '.join(errors)}")
+    t1 = perf_counter()
+    STAGE_VALIDATION.observe(t1 - t0)
+    record_span("validation", t0, t1)
+    
+    # Préprocesser les données
+    processed_data = preprocessor.prepare_features(data)
+    t2 = perf_counter()
+    STAGE_FEATURES.observe(t2 - t1)
+    record_span("prepare_features", t1, t2)
+    
+    # Faire la prédiction
+    result = model_loader.predict(processed_data)
+    t3 = perf_counter()
+    STAGE_MODEL.observe(t3 - t2)
+    record_span("model_predict", t2, t3)
+    return data, result, t3
+
+
+def _record(request: PredictRequest, data: Dict[str, Any], result: Dict[str, Any]) -> PredictionRecord:
+    return PredictionRecord(
+        employee_id=request.employee_id,
+        input_data=data,
+        prediction=result['prediction'],
+        probability=result['probability'],
+        class_name=result['class_name'],
+        model_version=_model_version()
+    )
+
+
+def _respond(
+    request: PredictRequest,
+    result: Dict[str, Any],
+    prediction_id: Optional[int],
+    scored_at: float
+) -> PredictResponse:
+    """Métriques de persistance, puis réponse"""
+    t4 = perf_counter()
+    STAGE_PERSIST.observe(t4 - scored_at)
+    record_span("persist", scored_at, t4)
+    model_version = _model_version()
+    predictions_total.labels(model_version, str(result['prediction'])).inc()
+    set_attribute("model_version", model_version)
+    
+    # Ajouter l'ID de la prédiction à la réponse
+    result['employee_id'] = request.employee_id
+    result['prediction_id'] = prediction_id
+    
+    response = PredictResponse(**result)
+    t5 = perf_counter()
+    STAGE_SERIALIZE.observe(t5 - t4)
+    record_span("serialize", t4, t5)
+    return response
+
+
 @router.post("/attrition/batch", response_model=List[PredictResponse])
 async def predict_attrition_batch(
     requests: List[PredictRequest],
+    http_request: Request,
     db: Session = Depends(get_db)
 ):
     """
     Prédit le risque d'attrition pour plusieurs employés en une seule requête
+    
+    Chaque ligne du lot est décomptée du budget "batch_rows" du client (et
+    rendue si le lot est refusé par le contrôle d'admission).
     """
-    results = []
+    enforce_rate_limit(http_request, "batch_rows", cost=len(requests))
+    batch_size.observe(len(requests))
+    set_attribute("batch_size", len(requests))
     
+    async with admission_slot(
+        "bulk", on_reject=lambda: refund_rate_limit(http_request, "batch_rows", len(requests))
+    ):
+        # Étapes de chaque ligne agrégées par nom : une trace bornée quelle que soit la taille du lot
+        with span("batch"), aggregate_spans():
+            return await _predict_batch(requests, db)
+
+
+async def _predict_batch(requests: List[PredictRequest], db: Session) -> List[PredictResponse]:
+    results = []
+    for start in range(0, len(requests), settings.BATCH_CHUNK_ROWS):
+        # Chaque bloc s'exécute dans un thread : la boucle d'événements continue
+        # de servir la voie interactive pendant le scoring du lot
+        chunk = requests[start:start + settings.BATCH_CHUNK_ROWS]
+        results.extend(await asyncio.to_thread(_predict_rows, chunk, db))
+    return results
+
+
+def _predict_rows(requests: List[PredictRequest], db: Session) -> List[PredictResponse]:
+    results = []
     for request in requests:
         try:
-            # Utiliser la fonction de prédiction unique
-            response = await predict_attrition(request, db)
-            results.append(response)
+            results.append(_predict_one(request, db))
         except Exception as e:
             # Continuer avec les autres même en cas d'erreur
             results.append(PredictResponse(
@@ -109,15 +223,18 @@ async def predict_attrition_batch(
                 seuil_utilise=0.5,
                 employee_id=request.employee_id
             ))
-    
     return results
 
 
-@router.get("/history", response_model=List[dict])
+@router.get(
+    "/history",
+    response_model=List[dict],
+    dependencies=[Depends(admission("analytics"))]
+)
 async def get_prediction_history(
     employee_id: int = None,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Récupère l'historique des prédictions
@@ -146,3 +263,93 @@ async def get_prediction_history(
     ]
 
 
+
+
+@router.get(
+    "/stats",
+    response_model=List[dict],
+    dependencies=[Depends(admission("analytics"))]
+)
+async def get_prediction_stats(
+    group_by: str = "department",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    department: Optional[str] = None,
+    poste: Optional[str] = None,
+    model_version: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Statistiques d'attrition calculées depuis les agrégats journaliers
+    
+    - **group_by**: Dimensions séparées par des virgules parmi day, department, poste, model_version (défaut: department)
+    - **start_date** / **end_date**: Intervalle de jours inclus (optionnel)
+    - **department**, **poste**, **model_version**: Filtres (optionnel)
+    """
+    dimensions = [dim.strip() for dim in group_by.split(",") if dim.strip()]
+    try:
+        return query_stats(
+            db,
+            group_by=dimensions,
+            start_date=start_date,
+            end_date=end_date,
+            department=department,
+            poste=poste,
+            model_version=model_version
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get(
+    "/risk/top",
+    response_model=List[CurrentRiskResponse],
+    dependencies=[Depends(admission("analytics"))]
+)
+async def get_top_risk(
+    k: int = Query(50, ge=1, le=1000),
+    department: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Employés au risque d'attrition courant le plus élevé
+    
+    - **k**: Nombre d'employés retournés (défaut: 50)
+    - **department**: Filtrer par département (optionnel)
+    """
+    return get_top_risks(db, k=k, department=department)
+
+
+@router.get(
+    "/risk",
+    response_model=List[CurrentRiskResponse],
+    dependencies=[Depends(admission("analytics"))]
+)
+async def get_risks(
+    employee_ids: List[int] = Query(..., description="IDs des employés"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Risque d'attrition courant de plusieurs employés
+    
+    - **employee_ids**: IDs répétés (`?employee_ids=1&employee_ids=2`)
+    """
+    return get_current_risks(db, employee_ids)
+
+
+@router.get(
+    "/risk/{employee_id}",
+    response_model=CurrentRiskResponse,
+    dependencies=[Depends(admission("analytics"))]
+)
+async def get_risk(
+    employee_id: int,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Risque d'attrition courant d'un employé (dernière prédiction)
+    """
+    risks = get_current_risks(db, [employee_id])
+    if not risks:
+        raise HTTPException(status_code=404, detail=f"Aucune prédiction pour l'employé {employee_id}")
+    return risks[0]
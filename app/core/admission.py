@@ -0,0 +1,169 @@
+"""
+Contrôle d'admission et files prioritaires
+
+Les requêtes sont réparties en voies ("interactive" : prédictions unitaires,
+"bulk" : lots, "analytics" : historique et statistiques). Chaque voie a une
+limite de concurrence et une file d'attente bornée ; toutes partagent
+`total_slots` emplacements, attribués en priorité aux voies les plus
+prioritaires. Une requête est refusée immédiatement si sa file est pleine, ou
+après `max_wait` secondes d'attente, plutôt que de laisser la latence croître.
+"""
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterable, Optional
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class AdmissionRejected(Exception):
+    """Requête refusée par le contrôle d'admission"""
+
+    def __init__(self, lane: str, reason: str):
+        super().__init__(f"Voie '{lane}' saturée ({reason})")
+        self.lane = lane
+        self.reason = reason
+
+
+@dataclass
+class Lane:
+    """Voie d'admission (priorité : plus petit = plus prioritaire)"""
+    name: str
+    priority: int
+    max_concurrency: int
+    max_queue: int
+    max_wait: float
+    active: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+    waiters: Deque[asyncio.Future] = field(default_factory=deque)
+
+
+class AdmissionController:
+    """Attribue les emplacements d'exécution aux voies, par ordre de priorité"""
+
+    def __init__(self, lanes: Iterable[Lane], total_slots: int, enabled: bool = True):
+        self.lanes: Dict[str, Lane] = {lane.name: lane for lane in lanes}
+        self._by_priority = sorted(self.lanes.values(), key=lambda lane: lane.priority)
+        self.total_slots = total_slots
+        self.enabled = enabled
+        self.active = 0
+
+    def _can_run(self, lane: Lane) -> bool:
+        return lane.active < lane.max_concurrency and self.active < self.total_slots
+
+    def _start(self, lane: Lane) -> None:
+        lane.active += 1
+        lane.admitted += 1
+        self.active += 1
+
+    def _dispatch(self) -> None:
+        for lane in self._by_priority:
+            while lane.waiters and self._can_run(lane):
+                waiter = lane.waiters.popleft()
+                if waiter.done():
+                    continue
+                self._start(lane)
+                waiter.set_result(None)
+
+    async def acquire(self, lane_name: str) -> None:
+        """Attend un emplacement pour la voie ; lève `AdmissionRejected` en cas de saturation"""
+        lane = self.lanes[lane_name]
+        if not lane.waiters and self._can_run(lane):
+            self._start(lane)
+            return
+        if len(lane.waiters) >= lane.max_queue:
+            lane.rejected += 1
+            raise AdmissionRejected(lane_name, "file pleine")
+
+        waiter = asyncio.get_running_loop().create_future()
+        lane.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), lane.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.done() and not waiter.cancelled():
+                # Emplacement attribué au moment de l'expiration : le rendre
+                self.release(lane_name)
+            else:
+                waiter.cancel()
+                lane.waiters.remove(waiter)
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            lane.timed_out += 1
+            raise AdmissionRejected(lane_name, "délai d'attente dépassé") from None
+
+    def release(self, lane_name: str) -> None:
+        """Libère l'emplacement et le transmet à la requête en attente la plus prioritaire"""
+        lane = self.lanes[lane_name]
+        lane.active -= 1
+        self.active -= 1
+        self._dispatch()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Métriques par voie : requêtes actives, en file, admises, refusées"""
+        return {
+            lane.name: {
+                "active": lane.active,
+                "queued": sum(1 for w in lane.waiters if not w.done()),
+                "admitted": lane.admitted,
+                "rejected": lane.rejected,
+                "timed_out": lane.timed_out,
+            }
+            for lane in self._by_priority
+        }
+
+
+admission_controller = AdmissionController(
+    [
+        Lane("interactive", 0, settings.ADMISSION_INTERACTIVE_CONCURRENCY,
+             settings.ADMISSION_INTERACTIVE_QUEUE, settings.ADMISSION_MAX_WAIT_MS / 1000),
+        Lane("analytics", 1, settings.ADMISSION_ANALYTICS_CONCURRENCY,
+             settings.ADMISSION_ANALYTICS_QUEUE, settings.ADMISSION_MAX_WAIT_MS / 1000),
+        Lane("bulk", 2, settings.ADMISSION_BULK_CONCURRENCY,
+             settings.ADMISSION_BULK_QUEUE, settings.ADMISSION_MAX_WAIT_MS / 1000),
+    ],
+    total_slots=settings.ADMISSION_TOTAL_SLOTS,
+    enabled=settings.ADMISSION_ENABLED
+)
+
+
+@asynccontextmanager
+async def admission_slot(lane_name: str, on_reject: Optional[Callable[[], None]] = None) -> AsyncIterator[None]:
+    """
+    Exécute le bloc dans la voie donnée (503 en cas de saturation)
+
+    `on_reject` est appelé avant le 503 (ex: rendre les unités de débit déjà prélevées).
+    """
+    if not admission_controller.enabled:
+        yield
+        return
+    try:
+        await admission_controller.acquire(lane_name)
+    except AdmissionRejected as e:
+        if on_reject is not None:
+            on_reject()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Service surchargé : {e}. Réessayez plus tard.",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        yield
+    finally:
+        admission_controller.release(lane_name)
+
+
+def admission(lane_name: str, on_reject: Optional[Callable[[Request], None]] = None) -> Callable:
+    """Dépendance FastAPI équivalente à `admission_slot` (`on_reject` reçoit la requête)"""
+    async def dependency(request: Request):
+        reject_callback = (lambda: on_reject(request)) if on_reject is not None else None
+        async with admission_slot(lane_name, reject_callback):
+            yield
+
+    return dependency
@@ -0,0 +1,208 @@
+"""
+Authentification par clé d'API pour les clients machine
+
+Les clés ne sont stockées que sous forme d'empreinte HMAC-SHA256 (table
+`api_keys`). Les clés actives sont gardées en mémoire (dictionnaire
+empreinte → clé) et rechargées périodiquement : une requête authentifiée ne
+coûte qu'un HMAC et une recherche, sans bcrypt, JWT ni accès à la base.
+"""
+import asyncio
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Sequence, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import APIKeyHeader
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.database import ApiKey
+
+settings = get_settings()
+
+KEY_PREFIX = "sk_"
+
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+
+def _pepper() -> bytes:
+    return (settings.API_KEY_PEPPER or settings.SECRET_KEY).encode("utf-8")
+
+
+def api_key_digest(key: str) -> str:
+    """Empreinte HMAC-SHA256 d'une clé"""
+    return hmac.new(_pepper(), key.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def generate_api_key() -> str:
+    """Génère une nouvelle clé en clair (à transmettre une seule fois au client)"""
+    return KEY_PREFIX + secrets.token_urlsafe(32)
+
+
+def create_api_key(
+    db: Session,
+    name: str,
+    scopes: Sequence[str] = ("predict",),
+    quota_per_minute: Optional[int] = None,
+) -> Tuple[ApiKey, str]:
+    """
+    Crée une clé d'API
+
+    Returns:
+        (ligne créée, clé en clair)
+    """
+    key = generate_api_key()
+    row = ApiKey(
+        name=name,
+        key_prefix=key[:12],
+        key_digest=api_key_digest(key),
+        scopes=",".join(scopes),
+        quota_per_minute=quota_per_minute,
+    )
+    db.add(row)
+    db.commit()
+    db.refresh(row)
+    return row, key
+
+
+@dataclass(frozen=True)
+class ApiKeyInfo:
+    """Clé d'API active, telle que gardée en mémoire"""
+    id: int
+    name: str
+    scopes: FrozenSet[str]
+    quota_per_minute: Optional[int]
+
+
+class ApiKeyStore:
+    """
+    Index en mémoire des clés actives, avec quotas par minute
+
+    `refresh()` remplace l'index en une affectation : les lectures
+    concurrentes voient l'ancien ou le nouvel index, jamais un état partiel.
+    """
+
+    def __init__(self):
+        self._keys: Dict[str, ApiKeyInfo] = {}
+        self._usage: Dict[int, Tuple[int, int]] = {}  # id -> (minute, compteur)
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def load(self, rows: Iterable[ApiKey]) -> int:
+        """Remplace l'index par les clés actives fournies"""
+        keys = {
+            row.key_digest: ApiKeyInfo(
+                id=row.id,
+                name=row.name,
+                scopes=frozenset(s.strip() for s in (row.scopes or "").split(",") if s.strip()),
+                quota_per_minute=row.quota_per_minute,
+            )
+            for row in rows if row.is_active
+        }
+        self._keys = keys
+        self.loaded = True
+        return len(keys)
+
+    def refresh(self, session_factory: Callable[[], Session]) -> int:
+        """Recharge les clés depuis la base (bloquant)"""
+        db = session_factory()
+        try:
+            return self.load(db.query(ApiKey).filter(ApiKey.is_active.is_(True)).all())
+        finally:
+            db.close()
+
+    def lookup(self, key: str) -> Optional[ApiKeyInfo]:
+        """Clé active correspondante, ou None"""
+        return self._keys.get(api_key_digest(key))
+
+    def consume(self, info: ApiKeyInfo) -> float:
+        """
+        Décompte une requête sur le quota de la clé
+
+        Returns:
+            0 si la requête est autorisée, sinon les secondes avant la minute suivante
+        """
+        if info.quota_per_minute is None:
+            return 0.0
+        now = time.time()
+        minute = int(now // 60)
+        with self._lock:
+            current, count = self._usage.get(info.id, (minute, 0))
+            if current != minute:
+                count = 0
+            if count >= info.quota_per_minute:
+                return 60 - (now % 60)
+            self._usage[info.id] = (minute, count + 1)
+        return 0.0
+
+
+api_key_store = ApiKeyStore()
+
+
+async def run_api_key_refresh_loop(
+    store: ApiKeyStore,
+    session_factory: Callable[[], Session],
+    interval: float
+) -> None:
+    """Tâche de fond : recharge périodiquement les clés hors de la boucle d'événements"""
+    while True:
+        try:
+            await asyncio.to_thread(store.refresh, session_factory)
+        except Exception as e:
+            logger.error("Erreur lors du rechargement des clés d'API: {}", e)
+        await asyncio.sleep(interval)
+
+
+def _authenticate(request: Request, key: Optional[str], scope: str) -> ApiKeyInfo:
+    info = api_key_store.lookup(key) if key else None
+    if info is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Clé d'API invalide ou manquante",
+            headers={"WWW-Authenticate": "ApiKey"},
+        )
+    if scope not in info.scopes:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Scope '{scope}' requis",
+        )
+    retry_after = api_key_store.consume(info)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Quota de la clé d'API dépassé",
+            headers={"Retry-After": str(int(retry_after) + 1)},
+        )
+    # Identité utilisée par la limitation de débit
+    request.state.principal = f"key:{info.id}"
+    return info
+
+
+def require_api_key(scope: str) -> Callable:
+    """
+    Dépendance FastAPI exigeant une clé d'API (en-tête `X-API-Key`) avec le scope donné
+
+    Sans effet si `API_KEY_AUTH_ENABLED` est désactivé.
+    """
+    async def dependency(
+        request: Request,
+        key: Optional[str] = Depends(api_key_header)
+    ) -> Optional[ApiKeyInfo]:
+        if not settings.API_KEY_AUTH_ENABLED:
+            return None
+        return _authenticate(request, key, scope)
+
+    return dependency
+
+
+async def require_admin_key(
+    request: Request,
+    key: Optional[str] = Depends(api_key_header)
+) -> ApiKeyInfo:
+    """Dépendance FastAPI exigeant une clé d'API de scope "admin" (toujours active)"""
+    return _authenticate(request, key, "admin")
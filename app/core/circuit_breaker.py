@@ -0,0 +1,80 @@
+"""
+Disjoncteur (circuit breaker) pour les dépendances externes
+"""
+import threading
+import time
+from typing import Optional
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur à trois états : fermé, ouvert, semi-ouvert
+
+    - fermé : les appels passent ; `failure_threshold` échecs consécutifs l'ouvrent
+    - ouvert : les appels sont refusés pendant `reset_timeout` secondes
+    - semi-ouvert : un seul appel d'essai ; son succès referme le disjoncteur
+
+    Un appel plus lent que `slow_call_threshold` secondes compte comme un échec.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        slow_call_threshold: Optional[float] = None,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.slow_call_threshold = slow_call_threshold
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """État courant (passe à semi-ouvert une fois le délai écoulé)"""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_progress = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Indique si un appel peut être tenté"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_progress:
+                self._trial_in_progress = True
+                return True
+            return False
+
+    def record_success(self, duration: Optional[float] = None) -> None:
+        """Enregistre un appel réussi (un appel trop lent compte comme un échec)"""
+        if self.slow_call_threshold is not None and duration is not None \
+                and duration > self.slow_call_threshold:
+            self.record_failure()
+            return
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_progress = False
+
+    def record_failure(self) -> None:
+        """Enregistre un appel en échec"""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_progress = False
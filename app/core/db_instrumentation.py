@@ -0,0 +1,231 @@
+"""
+Instrumentation des requêtes SQL par empreinte
+
+Les événements du moteur SQLAlchemy chronomètrent chaque requête. La requête
+est réduite à une empreinte (littéraux et paramètres remplacés par `?`,
+listes `IN (...)` et groupes `VALUES` repliés) : nombre d'exécutions, temps
+total et p95 sont agrégés par empreinte et exportés sur /metrics, étiquetés
+par l'identifiant court de l'empreinte (texte complet sur /admin/queries). L'attente
+d'une connexion du pool est mesurée séparément. Une requête plus lente que
+`DB_SLOW_QUERY_MS` est journalisée dans `app.slow_queries`, avec son plan
+d'exécution si `SQL_EXPLAIN_SLOW` est activé.
+"""
+import hashlib
+import math
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import get_settings
+from app.core.metrics import registry
+from app.core.tracing import record_span
+
+settings = get_settings()
+
+# Nom de journal fixe : niveau réglable par LOG_LEVELS["app.slow_queries"]
+slow_query_logger = logger.patch(lambda record: record.update(name="app.slow_queries"))
+
+OTHER_FINGERPRINT = "other"
+SAMPLE_SIZE = 256  # Dernières durées conservées par empreinte (calcul du p95)
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM = re.compile(r"%\(\w+\)s|%s|(?<![:\w]):\w+|\$\d+")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.I)
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_GROUPS = re.compile(r"\(\?(?:\+|)\)(?:\s*,\s*\(\?(?:\+|)\))+")
+_SPACES = re.compile(r"\s+")
+
+_EXPLAIN_PREFIX = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN ", "mysql": "EXPLAIN "}
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Empreinte d'une requête : même forme, paramètres et littéraux retirés"""
+    text = _COMMENT.sub(" ", statement)
+    text = _STRING.sub("?", text)
+    text = _PARAM.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _LIST.sub("(?+)", text)
+    text = _GROUPS.sub("(?+)+", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def fingerprint_id(text: str) -> str:
+    """Identifiant court et stable d'une empreinte"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+class _FingerprintStats:
+    __slots__ = ("id", "text", "count", "total", "max", "samples", "pos")
+
+    def __init__(self, text: str):
+        self.id = fingerprint_id(text)
+        self.text = text
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = [0.0] * SAMPLE_SIZE
+        self.pos = 0
+
+    def observe(self, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        self.samples[self.pos] = duration
+        self.pos = (self.pos + 1) % SAMPLE_SIZE
+
+    def p95(self) -> float:
+        filled = sorted(self.samples[:min(self.count, SAMPLE_SIZE)])
+        if not filled:
+            return 0.0
+        return filled[max(0, math.ceil(0.95 * len(filled)) - 1)]
+
+
+class QueryStats:
+    """Statistiques agrégées par empreinte de requête"""
+
+    def __init__(self, max_fingerprints: int = 500):
+        self.max_fingerprints = max_fingerprints
+        self._stats: Dict[str, _FingerprintStats] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, statement: str, duration: float) -> str:
+        """Enregistre une exécution ; retourne l'empreinte utilisée"""
+        text = fingerprint(statement)
+        with self._lock:
+            stats = self._stats.get(text)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    text = OTHER_FINGERPRINT
+                    stats = self._stats.get(text)
+                if stats is None:
+                    stats = self._stats[text] = _FingerprintStats(text)
+            stats.observe(duration)
+        return text
+
+    def snapshot(self, sort: str = "total", limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Empreintes triées par temps total (`total`), exécutions (`count`) ou p95 (`p95`)"""
+        with self._lock:
+            rows = [
+                {
+                    "fingerprint": s.id,
+                    "query": s.text,
+                    "count": s.count,
+                    "total_ms": round(s.total * 1000, 3),
+                    "mean_ms": round(s.total / s.count * 1000, 3) if s.count else 0.0,
+                    "p95_ms": round(s.p95() * 1000, 3),
+                    "max_ms": round(s.max * 1000, 3),
+                }
+                for s in self._stats.values()
+            ]
+        key = {"total": "total_ms", "count": "count", "p95": "p95_ms"}[sort]
+        rows.sort(key=lambda row: row[key], reverse=True)
+        return rows[:limit] if limit is not None else rows
+
+    def _series(self, value) -> Dict[tuple, float]:
+        with self._lock:
+            return {(s.id,): value(s) for s in self._stats.values()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+query_stats = QueryStats(settings.DB_QUERY_STATS_MAX_FINGERPRINTS)
+
+checkout_wait_seconds = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Attente d'une connexion du pool", ("engine",)
+)
+registry.counter_function(
+    "db_queries_total", "Requêtes SQL exécutées par empreinte", ("fingerprint",),
+    lambda: query_stats._series(lambda s: s.count)
+)
+registry.counter_function(
+    "db_query_seconds_total", "Temps cumulé des requêtes SQL par empreinte", ("fingerprint",),
+    lambda: query_stats._series(lambda s: s.total)
+)
+registry.gauge(
+    "db_query_p95_seconds", "p95 des dernières exécutions par empreinte", ("fingerprint",),
+    lambda: query_stats._series(lambda s: s.p95())
+)
+
+
+def explain(connection, statement: str, parameters) -> Optional[str]:
+    """Plan d'exécution d'une requête SELECT (None si indisponible)"""
+    prefix = _EXPLAIN_PREFIX.get(connection.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+    except Exception as e:
+        return f"(plan indisponible : {e})"
+    finally:
+        cursor.close()
+
+
+def _instrument_pool(engine: Engine, name: str) -> None:
+    pool = engine.pool
+    connect = pool.connect
+    child = checkout_wait_seconds.labels(name)
+
+    def timed_connect():
+        start = time.perf_counter()
+        connection = connect()
+        child.observe(time.perf_counter() - start)
+        return connection
+
+    pool.connect = timed_connect
+
+
+def instrument_engine(
+    engine: Engine,
+    name: str = "primary",
+    stats: QueryStats = query_stats,
+    slow_threshold_ms: Optional[float] = None,
+    explain_slow: Optional[bool] = None,
+) -> Engine:
+    """Branche le chronométrage des requêtes et de l'attente du pool sur un moteur"""
+    slow_threshold = (settings.DB_SLOW_QUERY_MS if slow_threshold_ms is None else slow_threshold_ms) / 1000
+    explain_slow = settings.SQL_EXPLAIN_SLOW if explain_slow is None else explain_slow
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        end = time.perf_counter()
+        start = conn.info["query_start"].pop()
+        duration = end - start
+        text = stats.observe(statement, duration)
+        record_span("db", start, end)
+        if duration >= slow_threshold:
+            plan = explain(conn, statement, parameters) if explain_slow and not executemany else None
+            slow_query_logger.warning(
+                "Requête lente ({}, {:.1f} ms) : {}{}", engine.url.get_backend_name(), duration * 1000,
+                text, f"\nPlan :\n{plan}" if plan else ""
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+        if starts:
+            starts.pop()
+
+    @event.listens_for(engine, "engine_disposed")
+    def _disposed(disposed_engine):
+        # dispose() recrée le pool : le nouveau pool doit être instrumenté
+        _instrument_pool(disposed_engine, name)
+
+    _instrument_pool(engine, name)
+    return engine
@@ -0,0 +1,126 @@
+"""
+État de santé mis en cache
+
+Une tâche de fond sonde les dépendances (modèle, base de données via le
+moteur de l'application) toutes les `HEALTH_CHECK_INTERVAL_SECONDS`, chaque
+sonde étant bornée par `HEALTH_CHECK_TIMEOUT_SECONDS`. `/health` renvoie le
+dernier résultat : une sonde Kubernetes ne coûte ni connexion ni requête SQL.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class HealthStatus:
+    """Résultat d'une vérification des dépendances"""
+    model_loaded: bool
+    database_connected: bool
+    checked_at: float
+    database_latency_ms: Optional[float] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.model_loaded and self.database_connected
+
+
+def ping_database(engine: Engine) -> None:
+    """SELECT 1 sur une connexion du pool de l'application"""
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+class HealthMonitor:
+    """Sondes des dépendances et dernier état connu"""
+
+    def __init__(
+        self,
+        model_check: Callable[[], bool],
+        database_check: Callable[[], None],
+        timeout: float = 2.0,
+        max_age: float = 30.0
+    ):
+        self.model_check = model_check
+        self.database_check = database_check
+        self.timeout = timeout
+        self.max_age = max_age
+        self.status: Optional[HealthStatus] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def stale(self) -> bool:
+        return self.status is None or time.monotonic() - self.status.checked_at > self.max_age
+
+    async def _probe_database(self) -> Optional[float]:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.to_thread(self.database_check), self.timeout)
+        except Exception:
+            return None
+        return (time.perf_counter() - start) * 1000
+
+    async def refresh(self) -> HealthStatus:
+        """Sonde les dépendances ; une seule sonde à la fois"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        if self._lock.locked():
+            # Une sonde est déjà en cours : attendre son résultat plutôt qu'en lancer une autre
+            async with self._lock:
+                return self.status
+        async with self._lock:
+            try:
+                model_loaded = bool(self.model_check())
+            except Exception:
+                model_loaded = False
+            latency = await self._probe_database()
+            self.status = HealthStatus(
+                model_loaded=model_loaded,
+                database_connected=latency is not None,
+                checked_at=time.monotonic(),
+                database_latency_ms=round(latency, 3) if latency is not None else None
+            )
+            return self.status
+
+    async def current(self) -> HealthStatus:
+        """Dernier état connu (sondé à la demande s'il est absent ou trop ancien)"""
+        if self.stale:
+            return await self.refresh()
+        return self.status
+
+
+def _model_loaded() -> bool:
+    from ml.model_loader import model_loader
+    return model_loader.is_loaded()
+
+
+def _ping_app_database() -> None:
+    from app.models.database import engine
+    ping_database(engine)
+
+
+health_monitor = HealthMonitor(
+    _model_loaded,
+    _ping_app_database,
+    timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS,
+    # Marge sur l'intervalle : la tâche de fond rafraîchit avant expiration
+    max_age=settings.HEALTH_CHECK_INTERVAL_SECONDS * 3
+)
+
+
+async def run_health_check_loop(monitor: HealthMonitor, interval: float) -> None:
+    """Tâche de fond : rafraîchit périodiquement l'état des dépendances"""
+    while True:
+        try:
+            await monitor.refresh()
+        except Exception as e:
+            logger.error("Erreur lors de la vérification de santé: {}", e)
+        await asyncio.sleep(interval)
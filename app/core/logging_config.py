@@ -0,0 +1,130 @@
+"""
+Journalisation de l'application (loguru)
+
+Un seul sink sur stdout, en JSON (une ligne par événement) ou en texte pour
+le développement. Avec `LOG_QUEUE`, les écritures passent par une file et un
+thread dédié : une requête ne bloque jamais sur la sortie du conteneur. Les
+journaux `logging` de la bibliothèque standard (uvicorn, SQLAlchemy...)
+sont redirigés vers loguru. Chaque événement porte
+l'identifiant de la requête en cours (en-tête `X-Request-ID`).
+"""
+import inspect
+import json
+import logging
+import sys
+import traceback
+import uuid
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from loguru import logger
+
+from app.core.config import Settings, get_settings
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+REQUEST_ID_HEADER = b"x-request-id"
+TEXT_FORMAT = (
+    "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {extra[request_id]} | {name}:{line} - {message}"
+)
+
+
+class InterceptHandler(logging.Handler):
+    """Redirige un enregistrement `logging` vers loguru (nom du logger conservé)"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            level = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+        # Remonter au code appelant, au-delà du module logging
+        frame, depth = inspect.currentframe(), 0
+        while frame is not None and (depth == 0 or frame.f_code.co_filename == logging.__file__):
+            frame = frame.f_back
+            depth += 1
+        logger.patch(lambda r: r.update(name=record.name)).opt(
+            depth=depth, exception=record.exc_info
+        ).log(level, record.getMessage())
+
+
+def _add_request_id(record) -> None:
+    record["extra"].setdefault("request_id", request_id_var.get() or "-")
+
+
+def _json_format(record) -> str:
+    entry = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "message": record["message"],
+    }
+    entry.update({key: value for key, value in record["extra"].items() if key != "json"})
+    if record["exception"] is not None:
+        exception = record["exception"]
+        entry["exception"] = "".join(
+            traceback.format_exception(exception.type, exception.value, exception.traceback)
+        )
+    record["extra"]["json"] = json.dumps(entry, ensure_ascii=False, default=str)
+    return "{extra[json]}\n"
+
+
+def _level_filter(levels: Dict[str, str]) -> Dict[str, int]:
+    return {name: logger.level(level.upper()).no for name, level in levels.items()}
+
+
+def setup_logging(settings: Optional[Settings] = None) -> None:
+    """Configure loguru et redirige la journalisation standard (idempotent)"""
+    settings = settings or get_settings()
+    levels = {"": settings.LOG_LEVEL, **settings.LOG_LEVELS}
+    level_filter = _level_filter(levels)
+
+    logger.remove()
+    logger.configure(patcher=_add_request_id)
+    logger.add(
+        sys.stdout,
+        level=min(level_filter.values()),
+        filter=level_filter,
+        format=_json_format if settings.LOG_JSON else TEXT_FORMAT,
+        enqueue=settings.LOG_QUEUE,
+        backtrace=False,
+        diagnose=False,
+    )
+
+    # Journalisation standard : un seul handler à la racine, niveaux filtrés par loguru
+    logging.basicConfig(handlers=[InterceptHandler()], level=min(level_filter.values()), force=True)
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        std_logger = logging.getLogger(name)
+        std_logger.handlers = []
+        std_logger.propagate = True
+
+
+class RequestIdMiddleware:
+    """Middleware ASGI : identifiant de requête (repris de `X-Request-ID` ou généré)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER, request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
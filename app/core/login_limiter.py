@@ -0,0 +1,59 @@
+"""
+Limitation des échecs de connexion
+
+Chaque clé (nom d'utilisateur, adresse IP) dispose de `max_failures` échecs
+sur une fenêtre glissante de `window` secondes ; au-delà, les tentatives sont
+refusées sans vérifier le mot de passe (pas de calcul bcrypt).
+"""
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable
+
+
+class FailedLoginLimiter:
+    """Fenêtre glissante d'échecs de connexion par clé"""
+
+    def __init__(self, max_failures: int = 5, window: float = 300.0, max_keys: int = 10000):
+        self.max_failures = max_failures
+        self.window = window
+        self.max_keys = max_keys
+        self._failures: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def _recent(self, key: str, now: float) -> Deque[float]:
+        failures = self._failures.get(key)
+        if failures is None:
+            return deque()
+        while failures and failures[0] <= now - self.window:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+        return failures
+
+    def retry_after(self, keys: Iterable[str]) -> float:
+        """Secondes avant la prochaine tentative autorisée (0 si autorisée)"""
+        now = time.monotonic()
+        wait = 0.0
+        with self._lock:
+            for key in keys:
+                failures = self._recent(key, now)
+                if len(failures) >= self.max_failures:
+                    wait = max(wait, failures[0] + self.window - now)
+        return wait
+
+    def record_failure(self, keys: Iterable[str]) -> None:
+        """Enregistre un échec pour chaque clé"""
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                if key not in self._failures and len(self._failures) >= self.max_keys:
+                    # Borne mémoire : oublier la clé la plus ancienne
+                    self._failures.pop(next(iter(self._failures)))
+                self._failures.setdefault(key, deque()).append(now)
+
+    def reset(self, keys: Iterable[str]) -> None:
+        """Oublie les échecs (connexion réussie)"""
+        with self._lock:
+            for key in keys:
+                self._failures.pop(key, None)
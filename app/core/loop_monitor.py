@@ -0,0 +1,112 @@
+"""
+Surveillance du retard de la boucle d'événements
+
+Une tâche de fond se réveille toutes les `interval` secondes et mesure son
+retard d'ordonnancement (exporté sur /metrics). Un thread de surveillance
+vérifie que ces réveils progressent : si la boucle est bloquée depuis plus de
+`threshold` secondes, la pile du thread de la boucle (le code bloquant en
+cours) est journalisée dans `app.loop_monitor`, une fois par blocage.
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from loguru import logger
+
+from app.core.config import get_settings
+from app.core.metrics import registry
+
+settings = get_settings()
+
+loop_monitor_logger = logger.patch(lambda record: record.update(name="app.loop_monitor"))
+
+loop_lag_seconds = registry.histogram(
+    "event_loop_lag_seconds", "Retard d'ordonnancement de la boucle d'événements"
+).labels()
+loop_blocked_total = registry.counter(
+    "event_loop_blocked_total", "Blocages de la boucle d'événements au-delà du seuil"
+).labels()
+
+
+class LoopLagMonitor:
+    """Mesure du retard de la boucle et détection des appels bloquants"""
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.2):
+        self.interval = interval
+        self.threshold = threshold
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.blocked_count = 0
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        """Démarre la surveillance (à appeler depuis la boucle d'événements)"""
+        self.stop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop = threading.Event()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat_loop())
+        self._thread = threading.Thread(target=self._watchdog, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Arrête la surveillance"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            loop_lag_seconds.observe(lag)
+            self._heartbeat = now
+
+    def _watchdog(self) -> None:
+        reported_heartbeat = None
+        while not self._stop.wait(self.interval / 2):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            if stalled > self.threshold and heartbeat != reported_heartbeat:
+                reported_heartbeat = heartbeat
+                self._report(stalled)
+
+    def _report(self, stalled: float) -> None:
+        self.blocked_count += 1
+        loop_blocked_total.inc()
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else "(pile indisponible)"
+        loop_monitor_logger.warning(
+            "Boucle d'événements bloquée depuis {:.0f} ms (seuil {:.0f} ms), pile en cours :\n{}",
+            stalled * 1000, self.threshold * 1000, stack
+        )
+
+
+loop_monitor = LoopLagMonitor(
+    interval=settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+    threshold=settings.LOOP_LAG_THRESHOLD_MS / 1000
+)
+
+registry.gauge(
+    "event_loop_lag_last_seconds", "Dernier retard mesuré de la boucle d'événements",
+    function=lambda: loop_monitor.last_lag
+)
@@ -0,0 +1,115 @@
+"""
+Profilage à la demande d'un worker en production
+
+`cProfile` est activé sur le thread de la boucle d'événements pendant les
+N prochaines requêtes ou T secondes (au premier des deux termes), puis les
+statistiques agrégées sont renvoyées, triées par temps cumulé. Une seule
+session à la fois par worker.
+
+Seul le thread de la boucle est couvert : le travail confié à des threads
+(`asyncio.to_thread`, dépendances et routes synchrones de FastAPI, écrivain
+SQLite) n'apparaît que comme l'attente de son résultat.
+"""
+import asyncio
+import cProfile
+import io
+import pstats
+from typing import Any, Dict, List, Optional
+
+SORT_KEYS = ("cumulative", "tottime", "ncalls")
+COVERAGE = "event_loop_thread"  # Threads profilés (voir docstring du module)
+
+
+class ProfilingBusyError(Exception):
+    """Une session de profilage est déjà en cours"""
+
+
+class ProfilingSession:
+    """Session de profilage du worker"""
+
+    def __init__(self):
+        self._profile: Optional[cProfile.Profile] = None
+        self._done: Optional[asyncio.Event] = None
+        self._max_requests = 0
+        self.requests_profiled = 0
+
+    @property
+    def active(self) -> bool:
+        return self._profile is not None
+
+    def request_finished(self) -> None:
+        """Appelé à la fin de chaque requête (middleware)"""
+        if self._profile is None:
+            return
+        self.requests_profiled += 1
+        if self.requests_profiled >= self._max_requests:
+            self._done.set()
+
+    async def run(self, max_requests: int, seconds: float) -> pstats.Stats:
+        """Profile les `max_requests` prochaines requêtes ou `seconds` secondes"""
+        if self._profile is not None:
+            raise ProfilingBusyError("Une session de profilage est déjà en cours")
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Un autre profileur (ex: débogueur) est déjà actif
+            raise ProfilingBusyError(str(e))
+        self._profile = profile
+        self._done = asyncio.Event()
+        self._max_requests = max_requests
+        self.requests_profiled = 0
+        try:
+            await asyncio.wait_for(self._done.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            profile.disable()
+            self._profile = None
+        return pstats.Stats(profile)
+
+
+profiling_session = ProfilingSession()
+
+
+def stats_to_text(stats: pstats.Stats, sort: str = "cumulative", limit: int = 50) -> str:
+    """Sortie pstats classique"""
+    stream = io.StringIO()
+    stream.write(f"Threads profilés : {COVERAGE} (travail des threads non couvert)\n")
+    stats.stream = stream
+    stats.sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+def stats_to_json(stats: pstats.Stats, sort: str = "cumulative", limit: int = 50) -> List[Dict[str, Any]]:
+    """Fonctions les plus coûteuses, triées selon `sort`"""
+    sort_field = {"cumulative": "cumtime", "tottime": "tottime", "ncalls": "ncalls"}[sort]
+    rows = [
+        {
+            "function": function,
+            "file": filename,
+            "line": line,
+            "ncalls": ncalls,
+            "primitive_calls": primitive_calls,
+            "tottime": round(tottime, 6),
+            "cumtime": round(cumtime, 6),
+        }
+        for (filename, line, function), (primitive_calls, ncalls, tottime, cumtime, _) in stats.stats.items()
+    ]
+    rows.sort(key=lambda row: row[sort_field], reverse=True)
+    return rows[:limit]
+
+
+class ProfilingMiddleware:
+    """Middleware ASGI : compte les requêtes terminées pendant une session de profilage"""
+
+    def __init__(self, app, session: ProfilingSession = profiling_session):
+        self.app = app
+        self.session = session
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if scope["type"] == "http" and self.session.active:
+                self.session.request_finished()
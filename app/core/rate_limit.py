@@ -0,0 +1,189 @@
+"""
+Limitation de débit par client (token bucket)
+
+Chaque client (clé d'API authentifiée, sinon adresse IP) dispose d'un seau
+par budget : "predict" pour les prédictions unitaires, "batch_rows" pour les
+lignes des lots (un lot de 10 000 lignes coûte 10 000 unités). Le stockage
+des seaux est interchangeable : `InMemoryRateLimitStorage` pour un processus,
+une implémentation partagée (ex: Redis) peut être fournie via `RateLimitStorage`.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class Budget:
+    """Débit (`rate` unités par seconde) et capacité du seau (rafale maximale)"""
+    rate: float
+    capacity: float
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Résultat d'une demande d'unités"""
+    allowed: bool
+    remaining: float
+    retry_after: float
+
+
+class RateLimitStorage(ABC):
+    """Stockage des seaux"""
+
+    @abstractmethod
+    def consume(self, key: str, cost: float, budget: Budget) -> RateLimitResult:
+        """Retire `cost` unités du seau `key` si elles sont disponibles (opération atomique)"""
+
+    @abstractmethod
+    def refund(self, key: str, cost: float, budget: Budget) -> None:
+        """Rend `cost` unités au seau `key` (sans dépasser sa capacité)"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Réinitialise tous les seaux"""
+
+
+class InMemoryRateLimitStorage(RateLimitStorage):
+    """Seaux en mémoire du processus (les moins récemment utilisés sont oubliés au-delà de `max_keys`)"""
+
+    def __init__(self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # clé -> (unités, horodatage)
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, cost: float, budget: Budget) -> RateLimitResult:
+        now = self._clock()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (budget.capacity, now))
+            tokens = min(budget.capacity, tokens + (now - updated) * budget.rate)
+            if tokens >= cost:
+                tokens -= cost
+                result = RateLimitResult(True, tokens, 0.0)
+            else:
+                result = RateLimitResult(False, tokens, (cost - tokens) / budget.rate)
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return result
+
+    def refund(self, key: str, cost: float, budget: Budget) -> None:
+        now = self._clock()
+        with self._lock:
+            if key not in self._buckets:
+                return
+            tokens, updated = self._buckets[key]
+            tokens = min(budget.capacity, tokens + (now - updated) * budget.rate + cost)
+            self._buckets[key] = (tokens, now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class RateLimiter:
+    """Limiteur multi-budgets, avec comptage des unités acceptées et des refus"""
+
+    def __init__(self, storage: RateLimitStorage, budgets: Dict[str, Budget], enabled: bool = True):
+        self.storage = storage
+        self.budgets = budgets
+        self.enabled = enabled
+        self.accepted_units: Counter = Counter()
+        self.rejected_requests: Counter = Counter()
+
+    def check(self, budget_name: str, principal: str, cost: float = 1) -> RateLimitResult:
+        """Demande `cost` unités du budget pour le client"""
+        budget = self.budgets[budget_name]
+        result = self.storage.consume(f"{budget_name}:{principal}", cost, budget)
+        if result.allowed:
+            self.accepted_units[budget_name] += cost
+        else:
+            self.rejected_requests[budget_name] += 1
+        return result
+
+    def refund(self, budget_name: str, principal: str, cost: float = 1) -> None:
+        """Rend les unités d'une requête acceptée puis non servie (ex: refusée par l'admission)"""
+        self.storage.refund(f"{budget_name}:{principal}", cost, self.budgets[budget_name])
+        self.accepted_units[budget_name] -= cost
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Unités acceptées et requêtes refusées par budget"""
+        return {
+            name: {
+                "accepted_units": self.accepted_units[name],
+                "rejected_requests": self.rejected_requests[name],
+            }
+            for name in self.budgets
+        }
+
+
+rate_limiter = RateLimiter(
+    InMemoryRateLimitStorage(),
+    {
+        "predict": Budget(settings.RATE_LIMIT_PREDICT_PER_SECOND, settings.RATE_LIMIT_PREDICT_BURST),
+        "batch_rows": Budget(settings.RATE_LIMIT_BATCH_ROWS_PER_SECOND, settings.RATE_LIMIT_BATCH_ROWS_BURST),
+    },
+    enabled=settings.RATE_LIMIT_ENABLED
+)
+
+
+def client_principal(request: Request) -> str:
+    """Identité du client : clé d'API authentifiée, sinon adresse IP"""
+    principal = getattr(request.state, "principal", None)
+    if principal:
+        return principal
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def enforce_rate_limit(request: Request, budget_name: str, cost: float = 1) -> None:
+    """Lève une erreur 429 (ou 413 si le coût dépasse la capacité du seau) si le budget est épuisé"""
+    if not rate_limiter.enabled:
+        return
+    budget = rate_limiter.budgets[budget_name]
+    if cost > budget.capacity:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Requête trop volumineuse : {int(cost)} unités pour un maximum de {int(budget.capacity)}",
+        )
+    result = rate_limiter.check(budget_name, client_principal(request), cost)
+    if not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Limite de débit atteinte. Réessayez plus tard.",
+            headers={
+                "Retry-After": str(int(result.retry_after) + 1),
+                "RateLimit-Limit": str(int(budget.capacity)),
+                "RateLimit-Remaining": str(int(result.remaining)),
+            },
+        )
+
+
+def refund_rate_limit(request: Request, budget_name: str, cost: float = 1) -> None:
+    """Rend au client les unités prélevées par `enforce_rate_limit`"""
+    if rate_limiter.enabled:
+        rate_limiter.refund(budget_name, client_principal(request), cost)
+
+
+def rate_limit(budget_name: str, cost: float = 1) -> Callable:
+    """Dépendance FastAPI appliquant un budget à coût fixe"""
+    async def dependency(request: Request) -> None:
+        enforce_rate_limit(request, budget_name, cost)
+
+    return dependency
+
+
+def refund_on_reject(budget_name: str, cost: float = 1) -> Callable[[Request], None]:
+    """Rappel `on_reject` de `admission()` : la requête délestée ne consomme pas le budget"""
+    def refund(request: Request) -> None:
+        refund_rate_limit(request, budget_name, cost)
+
+    return refund
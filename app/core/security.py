@@ -1,18 +1,38 @@
 """
 Module de sécurité et authentification
 """
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from app.core.config import get_settings
+from app.core.token_cache import TokenCache
 
 settings = get_settings()
 
+# Payloads déjà vérifiés, conservés jusqu'à l'expiration du token
+token_cache = TokenCache(max_size=settings.TOKEN_CACHE_SIZE)
+
 # Configuration du hachage des mots de passe
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# (un hash d'un autre coût que BCRYPT_ROUNDS, plus faible ou plus élevé, est
+# recalculé à la connexion : baisser le coût s'applique aussi aux comptes existants)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# Pool dédié à bcrypt : une rafale de connexions n'occupe ni la boucle
+# d'événements ni le pool de threads des autres routes
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.BCRYPT_MAX_WORKERS, thread_name_prefix="bcrypt"
+)
 
 # Configuration OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -28,6 +48,25 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Vérifie un mot de passe dans le pool bcrypt
+
+    Returns:
+        (valide, nouveau hash si le coût a changé, sinon None)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash un mot de passe dans le pool bcrypt"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Crée un token JWT"""
     to_encode = data.copy()
@@ -43,12 +82,27 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def verify_token(token: str) -> Optional[dict]:
-    """Vérifie et décode un token JWT"""
+    """Vérifie et décode un token JWT (résultat mis en cache jusqu'à son expiration)"""
+    if token_cache.is_revoked(token):
+        return None
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
+    token_cache.put(token, payload)
+    return payload
+
+
+def revoke_token(token: str) -> None:
+    """Révoque un token : il est refusé jusqu'à son expiration"""
+    try:
+        expires_at = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        expires_at = None
+    token_cache.revoke(token, expires_at if isinstance(expires_at, (int, float)) else None)
 
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
@@ -0,0 +1,109 @@
+"""
+Cache des tokens JWT vérifiés
+
+Un client réutilise le même token pendant toute sa validité : le payload
+vérifié est conservé (clé : empreinte SHA-256 du token) jusqu'à son `exp`,
+ce qui évite de refaire la vérification HMAC et le décodage JSON.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def token_digest(token: str) -> str:
+    """Empreinte du token (le token lui-même n'est pas conservé)"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class TokenCache:
+    """
+    Cache LRU borné de payloads vérifiés, chaque entrée expirant au `exp` du token
+
+    Les tokens révoqués sont mémorisés jusqu'à leur expiration : ils sont
+    refusés même s'ils ne sont plus en cache.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Payload en cache, ou None (absent ou expiré)"""
+        digest = token_digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return dict(entry[0])
+
+    def put(self, token: str, payload: Dict[str, Any]) -> None:
+        """Met en cache un payload vérifié (ignoré sans `exp` numérique)"""
+        expires_at = payload.get("exp")
+        if self.max_size <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        digest = token_digest(token)
+        with self._lock:
+            if digest in self._revoked:
+                return
+            self._entries[digest] = (dict(payload), float(expires_at))
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def revoke(self, token: str, expires_at: Optional[float] = None) -> None:
+        """
+        Révoque un token
+
+        Args:
+            token: Token à révoquer
+            expires_at: Expiration du token (timestamp) ; par défaut celle de
+                l'entrée en cache, sinon la révocation est conservée une heure
+        """
+        digest = token_digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.pop(digest, None)
+            if expires_at is None:
+                expires_at = entry[1] if entry is not None else now + 3600
+            self._revoked = {d: exp for d, exp in self._revoked.items() if exp > now}
+            self._revoked[digest] = expires_at
+
+    def is_revoked(self, token: str) -> bool:
+        """Indique si le token a été révoqué (et n'a pas encore expiré)"""
+        with self._lock:
+            expires_at = self._revoked.get(token_digest(token))
+        return expires_at is not None and expires_at > time.time()
+
+    def clear(self) -> None:
+        """Vide le cache et les révocations"""
+        with self._lock:
+            self._entries.clear()
+            self._revoked.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Métriques du cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "revoked": len(self._revoked),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
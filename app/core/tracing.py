@@ -0,0 +1,264 @@
+"""
+Traces par requête : en-tête Server-Timing et journal des requêtes lentes
+
+Une fraction `TRACE_SAMPLE_RATE` des requêtes est tracée : les étapes
+instrumentées (`span()`, `record_span()`) sont enregistrées dans un arbre de
+spans propre à la requête (variable de contexte), renvoyé au client dans
+l'en-tête `Server-Timing`. Une requête plus lente que
+`SLOW_REQUEST_THRESHOLD_MS` est écrite dans le journal `app.slow_requests`
+(JSON), avec ses spans si elle a été tracée. Hors trace, les fonctions
+d'instrumentation ne font rien.
+
+Une trace conserve au plus `TRACE_MAX_SPANS` spans ; au-delà, et pour les
+étapes répétées à chaque ligne d'un lot (`aggregate_spans()`), seuls le
+nombre, le total et le maximum par nom de span sont conservés.
+"""
+import json
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+slow_request_logger = logger.patch(lambda record: record.update(name="app.slow_requests"))
+
+
+class Trace:
+    """
+    Spans d'une requête : (nom, début, durée, indice du parent)
+
+    Les spans non conservés (plafond atteint, mode agrégé) sont résumés dans
+    `stats` : nom -> [nombre, durée totale, durée maximale].
+    """
+    __slots__ = ("start", "spans", "attributes", "max_spans", "aggregating", "stats", "_stack")
+
+    def __init__(self, max_spans: Optional[int] = None):
+        self.start = time.perf_counter()
+        self.spans: List[List[Any]] = []
+        self.attributes: Dict[str, Any] = {}
+        self.max_spans = settings.TRACE_MAX_SPANS if max_spans is None else max_spans
+        self.aggregating = False
+        self.stats: Dict[str, List[float]] = {}
+        self._stack: List[int] = []
+
+    def _keeps_span(self) -> bool:
+        return not self.aggregating and len(self.spans) < self.max_spans
+
+    def open(self, name: str, start: float) -> int:
+        """Ouvre un span ; retourne -1 s'il n'est pas conservé (voir `aggregate`)"""
+        if not self._keeps_span():
+            return -1
+        parent = self._stack[-1] if self._stack else -1
+        self.spans.append([name, start, 0.0, parent])
+        index = len(self.spans) - 1
+        self._stack.append(index)
+        return index
+
+    def close(self, index: int, end: float) -> None:
+        span = self.spans[index]
+        span[2] = end - span[1]
+        if self._stack and self._stack[-1] == index:
+            self._stack.pop()
+
+    def add(self, name: str, start: float, end: float) -> None:
+        if not self._keeps_span():
+            self.aggregate(name, end - start)
+            return
+        parent = self._stack[-1] if self._stack else -1
+        self.spans.append([name, start, end - start, parent])
+
+    def aggregate(self, name: str, duration: float) -> None:
+        """Compte un span sans le conserver"""
+        stats = self.stats.get(name)
+        if stats is None:
+            self.stats[name] = [1, duration, duration]
+        else:
+            stats[0] += 1
+            stats[1] += duration
+            if duration > stats[2]:
+                stats[2] = duration
+
+    def server_timing(self) -> str:
+        """Valeur de l'en-tête Server-Timing (durées cumulées par nom de span, en ms)"""
+        totals: Dict[str, Tuple[float, int]] = {}
+        for name, _, duration, _ in self.spans:
+            total, count = totals.get(name, (0.0, 0))
+            totals[name] = (total + duration, count + 1)
+        for name, (count, duration, _) in self.stats.items():
+            total, previous = totals.get(name, (0.0, 0))
+            totals[name] = (total + duration, previous + count)
+        parts = []
+        for name, (total, count) in totals.items():
+            entry = f"{name};dur={total * 1000:.2f}"
+            if count > 1:
+                entry += f';desc="x{count}"'
+            parts.append(entry)
+        parts.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.2f}")
+        return ", ".join(parts)
+
+    def tree(self) -> List[Dict[str, Any]]:
+        """Spans avec profondeur et décalage depuis le début de la requête (ms)"""
+        depths: List[int] = []
+        result = []
+        for name, start, duration, parent in self.spans:
+            depth = depths[parent] + 1 if parent >= 0 else 0
+            depths.append(depth)
+            result.append({
+                "name": name,
+                "depth": depth,
+                "offset_ms": round((start - self.start) * 1000, 3),
+                "duration_ms": round(duration * 1000, 3),
+            })
+        return result
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Spans agrégés par nom (nombre, total et maximum en ms)"""
+        return [
+            {
+                "name": name,
+                "count": count,
+                "total_ms": round(total * 1000, 3),
+                "max_ms": round(maximum * 1000, 3),
+            }
+            for name, (count, total, maximum) in self.stats.items()
+        ]
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+class _Span:
+    __slots__ = ("trace", "name", "index", "start")
+
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.index = self.trace.open(self.name, self.start)
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        if self.index >= 0:
+            self.trace.close(self.index, end)
+        else:
+            self.trace.aggregate(self.name, end - self.start)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def current_trace() -> Optional[Trace]:
+    """Trace de la requête en cours (None si la requête n'est pas tracée)"""
+    return _current_trace.get()
+
+
+def span(name: str):
+    """Context manager chronométrant une étape de la requête tracée"""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return _Span(trace, name)
+
+
+def record_span(name: str, start: float, end: float) -> None:
+    """Enregistre une étape déjà chronométrée (`time.perf_counter()`)"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, start, end)
+
+
+@contextmanager
+def aggregate_spans():
+    """Agrège les spans ouverts dans le bloc (étapes répétées à chaque ligne d'un lot)"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    previous = trace.aggregating
+    trace.aggregating = True
+    try:
+        yield
+    finally:
+        trace.aggregating = previous
+
+
+def set_attribute(key: str, value: Any) -> None:
+    """Ajoute un attribut (taille de lot, version du modèle...) à la trace"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.attributes[key] = value
+
+
+class TracingMiddleware:
+    """Middleware ASGI : échantillonnage, en-tête Server-Timing, journal des requêtes lentes"""
+
+    def __init__(self, app, sample_rate: Optional[float] = None, slow_threshold_ms: Optional[float] = None):
+        self.app = app
+        self.sample_rate = settings.TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.slow_threshold = (
+            settings.SLOW_REQUEST_THRESHOLD_MS if slow_threshold_ms is None else slow_threshold_ms
+        ) / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        trace = Trace() if self.sample_rate > 0 and random.random() < self.sample_rate else None
+        token = _current_trace.set(trace)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if trace is not None:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_trace.reset(token)
+            duration = time.perf_counter() - start
+            if duration >= self.slow_threshold:
+                self._log_slow(scope, status_code, duration, trace)
+
+    @staticmethod
+    def _log_slow(scope, status_code: int, duration: float, trace: Optional[Trace]) -> None:
+        entry = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "sampled": trace is not None,
+        }
+        if trace is not None:
+            entry.update(trace.attributes)
+            entry["spans"] = trace.tree()
+            if trace.stats:
+                entry["span_stats"] = trace.summary()
+        slow_request_logger.warning("{}", json.dumps(entry, ensure_ascii=False, default=str))
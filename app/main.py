@@ -1,16 +1,26 @@
 """
 Application principale FastAPI
 """
+import asyncio
+
+from loguru import logger
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 
 from app.core.config import get_settings
-from app.api.routes import health, predict
+from app.api.routes import admin, auth, health, metrics, predict
+from app.core.metrics import MetricsMiddleware
+from app.core.tracing import TracingMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.logging_config import RequestIdMiddleware, setup_logging
 
 # Charger la configuration
 settings = get_settings()
 
+# Journalisation JSON asynchrone (remplace les sorties print)
+setup_logging(settings)
+
 # Créer l'application FastAPI
 app = FastAPI(
     title=settings.API_TITLE,
@@ -30,9 +40,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Durée et statut de chaque requête (exposés sur /metrics)
+app.add_middleware(MetricsMiddleware)
+
+# Server-Timing et journal des requêtes lentes
+app.add_middleware(TracingMiddleware)
+
+# Comptage des requêtes pendant une session de profilage
+app.add_middleware(ProfilingMiddleware)
+
+# Identifiant de requête (X-Request-ID) propagé dans les journaux : middleware le plus externe
+app.add_middleware(RequestIdMiddleware)
+
 # Inclure les routers
 app.include_router(health.router)
 app.include_router(predict.router)
+app.include_router(auth.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
 
 
 @app.get("/", include_in_schema=False)
@@ -41,31 +66,90 @@ async def root():
     return RedirectResponse(url="/docs")
 
 
+# Tâches de fond créées au démarrage (attributs de app.state), annulées à l'arrêt
+BACKGROUND_TASKS = ("health_check_task", "spool_replay_task", "sink_flush_task", "api_key_refresh_task")
+
+
 @app.on_event("startup")
 async def startup_event():
     """Actions à effectuer au démarrage de l'API"""
-    print("=" * 50)
-    print(f"🚀 Démarrage de {settings.API_TITLE}")
-    print(f"📖 Documentation: http://localhost:{settings.API_PORT}/docs")
-    print(f"🔍 Environnement: {settings.ENVIRONMENT}")
-    print("=" * 50)
+    logger.bind(environment=settings.ENVIRONMENT, docs=f"http://localhost:{settings.API_PORT}/docs").info(
+        "Démarrage de {}", settings.API_TITLE
+    )
     
     # Charger le modèle au démarrage
     from ml.model_loader import model_loader
-    print("\n📦 Chargement du modèle...")
+    logger.info("Chargement du modèle...")
     model_loaded = model_loader.load()
     if model_loaded:
-        print("✅ Modèle chargé avec succès")
+        logger.info("Modèle chargé avec succès")
     else:
-        print("⚠️  Le modèle n'a pas pu être chargé. Vous devrez le charger manuellement.")
-    print()
+        logger.warning("Le modèle n'a pas pu être chargé. Vous devrez le charger manuellement.")
+    
+    # Mise à niveau du schéma d'une base créée par une version antérieure
+    from app.models.database import engine, upgrade_schema
+    try:
+        await asyncio.to_thread(upgrade_schema, engine)
+    except Exception as e:
+        # Base injoignable : les écritures partent dans le spool jusqu'à son retour
+        logger.error("Mise à niveau du schéma impossible: {}", e)
+    
+    # État de santé des dépendances, rafraîchi en tâche de fond
+    from app.core.health import health_monitor, run_health_check_loop
+    app.state.health_check_task = asyncio.create_task(run_health_check_loop(
+        health_monitor, settings.HEALTH_CHECK_INTERVAL_SECONDS
+    ))
+    
+    # Surveillance du retard de la boucle d'événements
+    if settings.LOOP_MONITOR_ENABLED:
+        from app.core.loop_monitor import loop_monitor
+        loop_monitor.start()
+    
+    # Rejeu en tâche de fond des prédictions placées dans le spool local
+    from app.models.database import SessionLocal
+    from app.models.persistence import prediction_writer, run_replay_loop
+    app.state.spool_replay_task = asyncio.create_task(run_replay_loop(
+        prediction_writer, SessionLocal, settings.SPOOL_REPLAY_INTERVAL_SECONDS
+    ))
+    
+    # Écriture périodique des prédictions en attente (journal colonnaire inactif)
+    from app.models.persistence import prediction_sink, run_sink_flush_loop
+    app.state.sink_flush_task = asyncio.create_task(run_sink_flush_loop(
+        prediction_sink, settings.PREDICTION_LOG_FLUSH_INTERVAL_MS / 1000
+    ))
+    
+    # Rechargement périodique des clés d'API (toujours : les routes /admin exigent une clé admin)
+    from app.core.api_keys import api_key_store, run_api_key_refresh_loop
+    app.state.api_key_refresh_task = asyncio.create_task(run_api_key_refresh_loop(
+        api_key_store, SessionLocal, settings.API_KEY_REFRESH_SECONDS
+    ))
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Actions à effectuer à l'arrêt de l'API"""
-    print("\n👋 Arrêt de l'API...")
-    print("✅ Arrêt effectué")
+    logger.info("Arrêt de l'API...")
+    
+    # Arrêter les tâches de fond (et attendre leur fin), puis écrire sur disque
+    # les prédictions en attente
+    from app.models.persistence import prediction_writer, prediction_sink
+    tasks = []
+    for name in BACKGROUND_TASKS:
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
+            tasks.append(task)
+            setattr(app.state, name, None)
+    await asyncio.gather(*tasks, return_exceptions=True)
+    from app.core.loop_monitor import loop_monitor
+    loop_monitor.stop()
+    # Fermer le sink le plus externe une seule fois ; l'écrivain SQL (spool du
+    # rejeu) n'est fermé à part que s'il n'est pas déjà derrière ce sink
+    prediction_sink.close()
+    if prediction_sink.unwrap() is not prediction_writer:
+        prediction_writer.close()
+    logger.info("Arrêt effectué")
+    await logger.complete()
 
 
 if __name__ == "__main__":
@@ -74,7 +158,8 @@ if __name__ == "__main__":
         "app.main:app",
         host=settings.API_HOST,
         port=settings.API_PORT,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        log_config=None  # Journaux uvicorn redirigés vers loguru (setup_logging)
     )
 
 
@@ -0,0 +1,142 @@
+"""
+Agrégats des prédictions maintenus de façon incrémentale
+
+Chaque prédiction enregistrée incrémente la ligne (jour × département × poste ×
+version du modèle) de `prediction_daily_stats`. Les statistiques sont ensuite
+calculées à partir de cette table, dont la taille ne dépend pas du nombre de
+prédictions brutes.
+"""
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.database import PredictionDailyStats, dialect_insert
+
+STATS_DIMENSIONS = ("day", "department", "poste", "model_version")
+
+
+def record_prediction_stats(
+    db: Session,
+    prediction: int,
+    probability: float,
+    department: Optional[str] = None,
+    poste: Optional[str] = None,
+    model_version: Optional[str] = None,
+    created_at: Optional[datetime] = None,
+) -> None:
+    """
+    Incrémente les agrégats de la prédiction (sans commit)
+
+    Utilise un INSERT ... ON CONFLICT DO UPDATE pour rester correct sous
+    écritures concurrentes.
+    """
+    add_prediction_stats(db, [{
+        "day": (created_at or datetime.utcnow()).date(),
+        "department": department,
+        "poste": poste,
+        "model_version": model_version,
+        "count": 1,
+        "positive_count": 1 if prediction == 1 else 0,
+        "probability_sum": probability,
+    }])
+
+
+def add_prediction_stats(db: Session, rows: Sequence[Dict[str, Any]]) -> None:
+    """
+    Ajoute des totaux pré-agrégés aux lignes d'agrégats (sans commit)
+
+    Chaque ligne porte les dimensions (day, department, poste, model_version)
+    et les mesures à ajouter (count, positive_count, probability_sum). Les
+    chargements en masse regroupent leurs prédictions par dimension puis
+    exécutent un seul upsert paramétré pour toutes les lignes.
+    """
+    if not rows:
+        return
+    table = PredictionDailyStats.__table__
+    statement = dialect_insert(db)(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.day, table.c.department, table.c.poste, table.c.model_version],
+        set_={
+            "count": table.c.count + statement.excluded.count,
+            "positive_count": table.c.positive_count + statement.excluded.positive_count,
+            "probability_sum": table.c.probability_sum + statement.excluded.probability_sum,
+        },
+    )
+    db.execute(statement, [
+        {
+            **row,
+            "department": row.get("department") or "",
+            "poste": row.get("poste") or "",
+            "model_version": row.get("model_version") or "1.0.0",
+        }
+        for row in rows
+    ])
+
+
+def query_stats(
+    db: Session,
+    group_by: Sequence[str] = ("department",),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    department: Optional[str] = None,
+    poste: Optional[str] = None,
+    model_version: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Calcule les statistiques d'attrition depuis la table d'agrégats
+
+    Args:
+        db: Session SQLAlchemy
+        group_by: Dimensions de regroupement (parmi STATS_DIMENSIONS)
+        start_date: Premier jour inclus
+        end_date: Dernier jour inclus
+        department, poste, model_version: Filtres optionnels
+
+    Returns:
+        Liste de dictionnaires : dimensions, count, positive_count,
+        attrition_rate, mean_probability
+    """
+    unknown = [dim for dim in group_by if dim not in STATS_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Dimensions inconnues: {', '.join(unknown)}")
+
+    columns = [getattr(PredictionDailyStats, dim) for dim in group_by]
+    total = func.sum(PredictionDailyStats.count)
+    positives = func.sum(PredictionDailyStats.positive_count)
+    proba_sum = func.sum(PredictionDailyStats.probability_sum)
+    query = db.query(*columns, total, positives, proba_sum)
+
+    if start_date:
+        query = query.filter(PredictionDailyStats.day >= start_date)
+    if end_date:
+        query = query.filter(PredictionDailyStats.day <= end_date)
+    if department is not None:
+        query = query.filter(PredictionDailyStats.department == department)
+    if poste is not None:
+        query = query.filter(PredictionDailyStats.poste == poste)
+    if model_version is not None:
+        query = query.filter(PredictionDailyStats.model_version == model_version)
+    if columns:
+        query = query.group_by(*columns).order_by(*columns)
+
+    results = []
+    for row in query.all():
+        count, positive_count, probability_sum = row[-3:]
+        if not count:
+            continue
+        item = {}
+        for dim, value in zip(group_by, row):
+            if dim == "day":
+                item[dim] = value.isoformat()
+            else:
+                item[dim] = value or None
+        item.update({
+            "count": int(count),
+            "positive_count": int(positive_count),
+            "attrition_rate": positive_count / count,
+            "mean_probability": probability_sum / count,
+        })
+        results.append(item)
+    return results
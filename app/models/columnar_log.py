@@ -0,0 +1,291 @@
+"""
+Journal colonnaire des prédictions en ajout seul
+
+Alternative à la table `predictions` pour les déploiements qui n'ont besoin
+que d'une trace durable (audit, réentraînement). Chaque segment est un fichier
+binaire :
+- un en-tête de `HEADER_SIZE` octets (signature + schéma JSON) ;
+- des enregistrements de largeur fixe (dtype structuré numpy), lisibles par
+  `np.memmap` sans désérialisation.
+
+Le segment en cours d'écriture porte le suffixe `.active` ; il est renommé en
+`.bin` à la rotation. Les segments scellés peuvent être fusionnés par
+`compact_segments()`.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.models.compact_storage import CATEGORICAL_FIELDS, NUMERIC_FIELDS, INT_FIELDS
+
+MAGIC = b"PREDLOG1"
+HEADER_SIZE = 4096
+LAYOUT_VERSION = 1
+
+# Largeur fixe des chaînes (UTF-8, tronquées au-delà)
+CATEGORICAL_WIDTH = 32
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _build_dtype() -> np.dtype:
+    fields = [
+        ("created_at", "<i8"),       # microsecondes depuis l'epoch (UTC)
+        ("employee_id", "<i8"),      # -1 si absent
+        ("prediction", "i1"),
+        ("probability", "<f8"),
+        ("model_version", "S16"),
+        ("request_id", "S36"),
+    ]
+    fields += [(f"f_{name}", "<f8") for name in NUMERIC_FIELDS]
+    fields += [(f"c_{name}", f"S{CATEGORICAL_WIDTH}") for name in CATEGORICAL_FIELDS]
+    return np.dtype(fields)
+
+
+RECORD_DTYPE = _build_dtype()
+
+
+def _encode_str(value: Optional[str], width: int) -> bytes:
+    """Encode une chaîne en UTF-8 tronqué sans couper un caractère"""
+    if value is None:
+        return b""
+    encoded = value.encode("utf-8")
+    if len(encoded) <= width:
+        return encoded
+    return encoded[:width].decode("utf-8", errors="ignore").encode("utf-8")
+
+
+def _header() -> bytes:
+    schema = json.dumps({
+        "layout_version": LAYOUT_VERSION,
+        "descr": RECORD_DTYPE.descr,
+    }).encode("utf-8")
+    if len(MAGIC) + len(schema) + 1 > HEADER_SIZE:
+        raise ValueError("Schéma trop long pour l'en-tête")
+    return (MAGIC + schema).ljust(HEADER_SIZE - 1, b" ") + b"\n"
+
+
+def _read_dtype(path: Path) -> np.dtype:
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if not header.startswith(MAGIC) or len(header) < HEADER_SIZE:
+        raise ValueError(f"Segment invalide: {path}")
+    schema = json.loads(header[len(MAGIC):].strip())
+    return np.dtype([tuple(field) for field in schema["descr"]])
+
+
+class ColumnarPredictionLog:
+    """
+    Écrivain du journal colonnaire
+
+    Les enregistrements sont accumulés dans un tampon préalloué puis écrits par
+    blocs (`flush_records` enregistrements ou `flush_interval` secondes), avec
+    un fsync par bloc. Sans nouvel enregistrement, `flush_if_due()` (appelé
+    périodiquement par l'application) écrit le tampon une fois l'intervalle écoulé.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_max_records: int = 1_000_000,
+        flush_records: int = 256,
+        flush_interval: float = 1.0,
+    ):
+        self.directory = Path(directory)
+        self.segment_max_records = segment_max_records
+        self.flush_records = flush_records
+        self.flush_interval = flush_interval
+        self._buffer = np.zeros(flush_records, dtype=RECORD_DTYPE)
+        self._buffered = 0
+        self._segment_records = 0
+        self._file = None
+        self._path: Optional[Path] = None
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def append(self, record) -> None:
+        """Ajoute une prédiction (`PredictionRecord`) au journal"""
+        data = record.input_data
+        created_at = record.created_at
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+        row = (
+            (created_at - _EPOCH) // _MICROSECOND,
+            -1 if record.employee_id is None else record.employee_id,
+            record.prediction,
+            record.probability,
+            _encode_str(record.model_version, 16),
+            record.request_id.encode("ascii"),
+            *(np.nan if data.get(name) is None else float(data[name]) for name in NUMERIC_FIELDS),
+            *(_encode_str(data.get(name), CATEGORICAL_WIDTH) for name in CATEGORICAL_FIELDS),
+        )
+        with self._lock:
+            self._buffer[self._buffered] = row
+            self._buffered += 1
+            if self._buffered >= self.flush_records \
+                    or self._segment_records + self._buffered >= self.segment_max_records \
+                    or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    def _open_segment(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"segment-{time.time_ns()}-{os.getpid()}.active"
+        self._path = self.directory / name
+        self._file = open(self._path, "wb")
+        self._file.write(_header())
+        self._segment_records = 0
+
+    def _seal_segment(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._path.rename(self._path.with_suffix(".bin"))
+        self._file = None
+        self._path = None
+
+    def _flush(self) -> None:
+        if self._buffered:
+            if self._file is None:
+                self._open_segment()
+            self._file.write(self._buffer[:self._buffered].tobytes())
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._segment_records += self._buffered
+            self._buffered = 0
+            if self._segment_records >= self.segment_max_records:
+                self._seal_segment()
+        self._last_flush = time.monotonic()
+
+    def flush(self) -> None:
+        """Écrit le tampon dans le segment courant"""
+        with self._lock:
+            self._flush()
+
+    def flush_if_due(self) -> None:
+        """Écrit le tampon si `flush_interval` est écoulé depuis la dernière écriture"""
+        with self._lock:
+            if self._buffered and time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    def close(self) -> None:
+        """Écrit le tampon et scelle le segment courant"""
+        with self._lock:
+            self._flush()
+            if self._file is not None:
+                self._seal_segment()
+
+
+def list_segments(directory: str, include_active: bool = True) -> List[Path]:
+    """Segments du journal par ordre chronologique"""
+    directory = Path(directory)
+    if not directory.exists():
+        return []
+    paths = list(directory.glob("segment-*.bin"))
+    if include_active:
+        paths += list(directory.glob("segment-*.active"))
+    return sorted(paths, key=lambda p: p.stem)
+
+
+def read_segment(path: Path) -> np.ndarray:
+    """
+    Projette un segment en mémoire (lecture seule)
+
+    Un dernier enregistrement incomplet (écriture en cours) est ignoré.
+    """
+    dtype = _read_dtype(path)
+    count = (path.stat().st_size - HEADER_SIZE) // dtype.itemsize
+    if count <= 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def read_log(directory: str) -> np.ndarray:
+    """Charge l'ensemble du journal dans un seul tableau structuré"""
+    arrays = [read_segment(path) for path in list_segments(directory)]
+    arrays = [a for a in arrays if len(a)]
+    if not arrays:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.concatenate(arrays)
+
+
+def to_dicts(rows: np.ndarray) -> List[Dict[str, Any]]:
+    """Reconstruit les enregistrements (dont `input_data`) depuis un tableau du journal"""
+    results = []
+    for row in rows:
+        input_data = {}
+        for name in NUMERIC_FIELDS:
+            value = float(row[f"f_{name}"])
+            if not np.isnan(value):
+                input_data[name] = int(value) if name in INT_FIELDS else value
+        for name in CATEGORICAL_FIELDS:
+            value = row[f"c_{name}"]
+            if value:
+                input_data[name] = value.decode("utf-8")
+        employee_id = int(row["employee_id"])
+        prediction = int(row["prediction"])
+        results.append({
+            "request_id": row["request_id"].decode("ascii"),
+            "employee_id": None if employee_id < 0 else employee_id,
+            "input_data": input_data,
+            "prediction": prediction,
+            "probability": float(row["probability"]),
+            "class_name": "Attrition" if prediction == 1 else "Pas d'attrition",
+            "model_version": row["model_version"].decode("utf-8"),
+            "created_at": _EPOCH + int(row["created_at"]) * _MICROSECOND,
+        })
+    return results
+
+
+def compact_segments(directory: str, target_records: int = 1_000_000) -> Dict[str, int]:
+    """
+    Fusionne les segments scellés en segments de `target_records` enregistrements
+
+    Les doublons (même `request_id`) sont éliminés. Les nouveaux segments sont
+    écrits sous un nom temporaire puis renommés avant la suppression des sources.
+
+    Returns:
+        Statistiques : segments_in, segments_out, records, duplicates
+    """
+    sources = list_segments(directory, include_active=False)
+    if len(sources) < 2:
+        return {"segments_in": len(sources), "segments_out": len(sources), "records": 0, "duplicates": 0}
+
+    rows = np.concatenate([np.array(read_segment(path)) for path in sources])
+    _, first_index = np.unique(rows["request_id"], return_index=True)
+    unique_rows = rows[np.sort(first_index)]
+    unique_rows = unique_rows[np.argsort(unique_rows["created_at"], kind="stable")]
+
+    outputs = []
+    base = sources[0].stem
+    for i, start in enumerate(range(0, len(unique_rows), target_records)):
+        chunk = unique_rows[start:start + target_records]
+        tmp = Path(directory) / f"{base}-c{i:04d}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_header())
+            f.write(chunk.astype(RECORD_DTYPE).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        outputs.append(tmp)
+
+    finals = []
+    for tmp in outputs:
+        final = tmp.with_suffix(".bin")
+        os.replace(tmp, final)
+        finals.append(final)
+    for path in sources:
+        if path not in finals:
+            path.unlink()
+
+    return {
+        "segments_in": len(sources),
+        "segments_out": len(finals),
+        "records": len(unique_rows),
+        "duplicates": len(rows) - len(unique_rows),
+    }
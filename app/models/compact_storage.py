@@ -0,0 +1,279 @@
+"""
+Stockage compact des données d'entrée des prédictions
+
+Les données d'entrée sont encodées en un vecteur binaire :
+- un octet de version de format ;
+- un bloc de largeur fixe contenant les features numériques (float64, NaN = absent) ;
+- les features catégorielles en UTF-8 préfixées par leur longueur (0xFF = absent).
+
+Le vecteur est identifié par son empreinte SHA-256 : deux entrées identiques
+ne sont stockées qu'une seule fois dans `prediction_inputs`.
+"""
+import hashlib
+import math
+import struct
+import typing
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.database import CompactPrediction, Prediction, PredictionInput
+from app.models.schemas import PredictRequest
+
+LAYOUT_VERSION = 1
+
+# Champs stockés hors du vecteur (colonnes dédiées)
+_EXCLUDED_FIELDS = {"employee_id"}
+
+_ABSENT_STRING = 0xFF
+
+
+def _field_kind(annotation: Any) -> str:
+    """Retourne 'int', 'float' ou 'str' selon l'annotation du champ"""
+    args = [a for a in typing.get_args(annotation) if a is not type(None)]
+    base = args[0] if args else annotation
+    if base is int:
+        return "int"
+    if base is float:
+        return "float"
+    return "str"
+
+
+def _build_layout() -> Tuple[Tuple[str, str], ...]:
+    """Construit la disposition du vecteur à partir du schéma PredictRequest"""
+    return tuple(
+        (name, _field_kind(field.annotation))
+        for name, field in PredictRequest.model_fields.items()
+        if name not in _EXCLUDED_FIELDS
+    )
+
+
+INPUT_LAYOUT = _build_layout()
+NUMERIC_FIELDS = [name for name, kind in INPUT_LAYOUT if kind != "str"]
+CATEGORICAL_FIELDS = [name for name, kind in INPUT_LAYOUT if kind == "str"]
+INT_FIELDS = {name for name, kind in INPUT_LAYOUT if kind == "int"}
+_NUMERIC_STRUCT = struct.Struct(f"<B{len(NUMERIC_FIELDS)}d")
+
+
+def pack_input(data: Dict[str, Any]) -> bytes:
+    """
+    Encode les données d'entrée en vecteur binaire compact
+
+    Args:
+        data: Dictionnaire des données d'entrée (tel que stocké dans `input_data`)
+
+    Returns:
+        Vecteur binaire
+
+    Raises:
+        ValueError: Si les données ne respectent pas la disposition du vecteur
+    """
+    unknown = set(data) - {name for name, _ in INPUT_LAYOUT} - _EXCLUDED_FIELDS
+    if unknown:
+        raise ValueError(f"Champs inconnus: {', '.join(sorted(unknown))}")
+
+    numeric_values = []
+    for name in NUMERIC_FIELDS:
+        value = data.get(name)
+        if value is None:
+            numeric_values.append(math.nan)
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Valeur numérique attendue pour {name}")
+        else:
+            numeric_values.append(float(value))
+
+    parts = [_NUMERIC_STRUCT.pack(LAYOUT_VERSION, *numeric_values)]
+    for name in CATEGORICAL_FIELDS:
+        value = data.get(name)
+        if value is None:
+            parts.append(bytes([_ABSENT_STRING]))
+            continue
+        if not isinstance(value, str):
+            raise ValueError(f"Chaîne attendue pour {name}")
+        encoded = value.encode("utf-8")
+        if len(encoded) >= _ABSENT_STRING:
+            raise ValueError(f"Valeur trop longue pour {name}")
+        parts.append(bytes([len(encoded)]) + encoded)
+
+    return b"".join(parts)
+
+
+def unpack_input(vector: bytes) -> Dict[str, Any]:
+    """Reconstruit le dictionnaire d'entrée à partir du vecteur binaire"""
+    header = _NUMERIC_STRUCT.unpack_from(vector, 0)
+    if header[0] != LAYOUT_VERSION:
+        raise ValueError(f"Version de format non supportée: {header[0]}")
+
+    numeric = dict(zip(NUMERIC_FIELDS, header[1:]))
+    categorical = {}
+    offset = _NUMERIC_STRUCT.size
+    for name in CATEGORICAL_FIELDS:
+        length = vector[offset]
+        offset += 1
+        if length == _ABSENT_STRING:
+            continue
+        categorical[name] = vector[offset:offset + length].decode("utf-8")
+        offset += length
+
+    # Respecter l'ordre des champs du schéma
+    data = {}
+    for name, kind in INPUT_LAYOUT:
+        if kind == "str":
+            if name in categorical:
+                data[name] = categorical[name]
+        elif not math.isnan(numeric[name]):
+            data[name] = int(numeric[name]) if name in INT_FIELDS else numeric[name]
+    return data
+
+
+def input_digest(vector: bytes) -> str:
+    """Empreinte de contenu (SHA-256 hex) d'un vecteur"""
+    return hashlib.sha256(vector).hexdigest()
+
+
+def store_input(db: Session, data: Dict[str, Any]) -> str:
+    """
+    Enregistre un vecteur d'entrée s'il n'existe pas encore
+
+    Returns:
+        Empreinte du vecteur
+    """
+    vector = pack_input(data)
+    digest = input_digest(vector)
+    if db.get(PredictionInput, digest) is None:
+        db.add(PredictionInput(digest=digest, layout_version=LAYOUT_VERSION, vector=vector))
+        # Rendre le vecteur visible aux appels suivants de la même session
+        db.flush()
+    return digest
+
+
+def save_compact_prediction(
+    db: Session,
+    input_data: Dict[str, Any],
+    prediction: int,
+    probability: float,
+    class_name: str,
+    employee_id: Optional[int] = None,
+    model_version: str = "1.0.0",
+    created_at: Optional[datetime] = None,
+) -> CompactPrediction:
+    """Ajoute une prédiction au format compact dans la session (sans commit)"""
+    digest = store_input(db, input_data)
+    compact = CompactPrediction(
+        employee_id=employee_id,
+        input_digest=digest,
+        prediction=prediction,
+        probability=probability,
+        class_name=class_name,
+        model_version=model_version,
+        created_at=created_at or datetime.utcnow(),
+    )
+    db.add(compact)
+    return compact
+
+
+def read_input_data(db: Session, compact: CompactPrediction) -> Dict[str, Any]:
+    """
+    Reconstruit le dictionnaire `input_data` d'origine d'une prédiction compacte
+    """
+    stored = db.get(PredictionInput, compact.input_digest)
+    if stored is None:
+        raise ValueError(f"Vecteur d'entrée introuvable: {compact.input_digest}")
+    data = unpack_input(stored.vector)
+    if compact.employee_id is not None:
+        data = {"employee_id": compact.employee_id, **data}
+    return data
+
+
+def _iter_batches(db: Session, batch_size: int, after_id: int) -> Iterable[List[Prediction]]:
+    """Parcourt la table `predictions` par lots ordonnés par id"""
+    while True:
+        batch = (
+            db.query(Prediction)
+            .filter(Prediction.id > after_id)
+            .order_by(Prediction.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            return
+        # Mémoriser le dernier id avant que le lot ne soit commité/supprimé
+        after_id = batch[-1].id
+        yield batch
+
+
+def migrate_predictions(
+    db: Session,
+    batch_size: int = 1000,
+    delete_source: bool = False,
+) -> Dict[str, int]:
+    """
+    Migre la table `predictions` vers le stockage compact
+
+    La migration est idempotente : les lignes déjà migrées (via `legacy_id`)
+    sont ignorées. Les lignes dont `input_data` ne respecte pas la disposition
+    du vecteur restent dans `predictions`.
+
+    Args:
+        db: Session SQLAlchemy
+        batch_size: Nombre de lignes traitées par transaction
+        delete_source: Supprime les lignes migrées de `predictions`
+
+    Returns:
+        Statistiques : migrated, skipped, invalid, unique_inputs
+    """
+    stats = {"migrated": 0, "skipped": 0, "invalid": 0, "unique_inputs": 0}
+
+    for batch in _iter_batches(db, batch_size, after_id=0):
+        ids = [p.id for p in batch]
+        already = {
+            legacy_id for (legacy_id,) in
+            db.query(CompactPrediction.legacy_id).filter(CompactPrediction.legacy_id.in_(ids))
+        }
+
+        vectors = {}
+        rows = []
+        for p in batch:
+            if p.id in already:
+                stats["skipped"] += 1
+                if delete_source:
+                    db.delete(p)
+                continue
+            input_data = {k: v for k, v in (p.input_data or {}).items() if k not in _EXCLUDED_FIELDS}
+            try:
+                vector = pack_input(input_data)
+            except (ValueError, AttributeError):
+                stats["invalid"] += 1
+                continue
+            digest = input_digest(vector)
+            vectors[digest] = vector
+            rows.append((p, digest))
+
+        # Déduplication : un seul INSERT par vecteur inconnu
+        existing = {
+            digest for (digest,) in
+            db.query(PredictionInput.digest).filter(PredictionInput.digest.in_(list(vectors)))
+        } if vectors else set()
+        for digest, vector in vectors.items():
+            if digest not in existing:
+                db.add(PredictionInput(digest=digest, layout_version=LAYOUT_VERSION, vector=vector))
+                stats["unique_inputs"] += 1
+
+        for p, digest in rows:
+            db.add(CompactPrediction(
+                employee_id=p.employee_id,
+                input_digest=digest,
+                prediction=p.prediction,
+                probability=p.probability,
+                class_name=p.class_name,
+                created_at=p.created_at,
+                model_version=p.model_version,
+                legacy_id=p.id,
+            ))
+            if delete_source:
+                db.delete(p)
+        stats["migrated"] += len(rows)
+        db.commit()
+
+    return stats
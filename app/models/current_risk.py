@@ -0,0 +1,164 @@
+"""
+Table `current_risk` : dernier risque d'attrition connu par employé
+
+La table est mise à jour (upsert) à chaque prédiction. Les lectures par
+employé passent par la clé primaire et le top-k par l'index sur la probabilité,
+sans parcourir l'historique des prédictions.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.models.database import CurrentRisk, Prediction, dialect_insert
+
+
+def upsert_current_risk(
+    db: Session,
+    employee_id: int,
+    prediction: int,
+    probability: float,
+    class_name: str,
+    prediction_id: Optional[int] = None,
+    department: Optional[str] = None,
+    poste: Optional[str] = None,
+    model_version: Optional[str] = None,
+    updated_at: Optional[datetime] = None,
+) -> None:
+    """
+    Met à jour le risque courant d'un employé (sans commit)
+
+    Une prédiction plus ancienne que celle déjà enregistrée (ex: rejeu
+    différé) ne remplace pas la valeur courante.
+    """
+    upsert_current_risks(db, [{
+        "employee_id": employee_id,
+        "prediction_id": prediction_id,
+        "prediction": prediction,
+        "probability": probability,
+        "class_name": class_name,
+        "department": department,
+        "poste": poste,
+        "model_version": model_version,
+        "updated_at": updated_at,
+    }])
+
+
+def upsert_current_risks(db: Session, rows: Sequence[Dict[str, Any]]) -> None:
+    """
+    Met à jour le risque courant de plusieurs employés en une requête (sans commit)
+
+    Chaque ligne porte les colonnes de `current_risk` (un employé au plus une
+    fois par appel) ; même règle que `upsert_current_risk` pour les valeurs
+    plus anciennes.
+    """
+    if not rows:
+        return
+    table = CurrentRisk.__table__
+    statement = dialect_insert(db)(table)
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.employee_id],
+        set_={
+            "prediction_id": excluded.prediction_id,
+            "prediction": excluded.prediction,
+            "probability": excluded.probability,
+            "class_name": excluded.class_name,
+            "department": excluded.department,
+            "poste": excluded.poste,
+            "model_version": excluded.model_version,
+            "updated_at": excluded.updated_at,
+        },
+        where=table.c.updated_at <= excluded.updated_at,
+    )
+    db.execute(statement, [
+        {
+            **row,
+            "prediction_id": row.get("prediction_id"),
+            "department": row.get("department"),
+            "poste": row.get("poste"),
+            "model_version": row.get("model_version") or "1.0.0",
+            "updated_at": row.get("updated_at") or datetime.utcnow(),
+        }
+        for row in rows
+    ])
+
+
+def get_current_risks(db: Session, employee_ids: Sequence[int]) -> List[CurrentRisk]:
+    """Risque courant de plusieurs employés (une seule requête IN)"""
+    if not employee_ids:
+        return []
+    return (
+        db.query(CurrentRisk)
+        .filter(CurrentRisk.employee_id.in_(list(employee_ids)))
+        .order_by(CurrentRisk.employee_id)
+        .all()
+    )
+
+
+def get_top_risks(db: Session, k: int = 50, department: Optional[str] = None) -> List[CurrentRisk]:
+    """Employés au risque courant le plus élevé, filtrables par département"""
+    query = db.query(CurrentRisk)
+    if department is not None:
+        query = query.filter(CurrentRisk.department == department)
+    return query.order_by(CurrentRisk.probability.desc()).limit(k).all()
+
+
+def rebuild_current_risk(db: Session, batch_size: int = 5000) -> Dict[str, int]:
+    """
+    Reconstruit `current_risk` depuis l'historique `predictions`
+
+    Les employés sont traités par plages d'`employee_id` de `batch_size`
+    employés, avec un commit par plage : les transactions et les verrous
+    restent courts et une interruption garde les plages déjà validées.
+    Dans une plage, seule la prédiction la plus récente de chaque employé
+    est écrite (un upsert groupé).
+
+    Returns:
+        Statistiques : predictions (lignes lues), employees (employés distincts)
+    """
+    count = 0
+    employees = 0
+    lower = None
+    while True:
+        ids = db.query(Prediction.employee_id).filter(Prediction.employee_id.isnot(None))
+        if lower is not None:
+            ids = ids.filter(Prediction.employee_id > lower)
+        upper = (
+            ids.distinct()
+            .order_by(Prediction.employee_id)
+            .offset(batch_size - 1)
+            .limit(1)
+            .scalar()
+        )
+
+        rows = db.query(Prediction).filter(Prediction.employee_id.isnot(None))
+        if lower is not None:
+            rows = rows.filter(Prediction.employee_id > lower)
+        if upper is not None:
+            rows = rows.filter(Prediction.employee_id <= upper)
+        latest: Dict[int, Prediction] = {}
+        for p in rows.order_by(Prediction.created_at, Prediction.id).yield_per(batch_size):
+            latest[p.employee_id] = p
+            count += 1
+
+        upsert_current_risks(db, [
+            {
+                "employee_id": p.employee_id,
+                "prediction_id": p.id,
+                "prediction": p.prediction,
+                "probability": p.probability,
+                "class_name": p.class_name,
+                "department": (p.input_data or {}).get("department"),
+                "poste": (p.input_data or {}).get("poste"),
+                "model_version": p.model_version,
+                "updated_at": p.created_at,
+            }
+            for p in latest.values()
+        ])
+        db.commit()
+        employees += len(latest)
+        if upper is None:
+            break
+        lower = upper
+    return {"predictions": count, "employees": employees}
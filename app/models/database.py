@@ -1,24 +1,108 @@
 """
 Modèles de base de données SQLAlchemy
 """
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, JSON, Boolean
+from sqlalchemy import (
+    create_engine, event, inspect, text, Column, Integer, String, Float, DateTime, Date, JSON, Boolean,
+    LargeBinary, ForeignKey, Index
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import StaticPool
+from concurrent.futures import Future
 from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+import asyncio
+import queue
+import threading
+import time
+from fastapi import HTTPException
+from loguru import logger
 from app.core.config import get_settings
+from app.core.db_instrumentation import instrument_engine
 
 settings = get_settings()
 
+
+def _connect_args(url: str) -> dict:
+    """Options de connexion propres au pilote"""
+    if url.startswith("postgresql"):
+        # Ne pas bloquer une requête indéfiniment si le serveur ne répond pas,
+        # ni derrière une requête lente ou un verrou (paramètres de session)
+        return {
+            "connect_timeout": settings.DATABASE_CONNECT_TIMEOUT,
+            "options": (
+                f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS} "
+                f"-c lock_timeout={settings.DB_LOCK_TIMEOUT_MS}"
+            ),
+        }
+    if url.startswith("sqlite"):
+        # Sessions partagées entre threads (FastAPI) ; attente du verrou d'écriture
+        return {"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}
+    return {}
+
+
+def is_sqlite_file(url: str) -> bool:
+    """Indique si l'URL désigne une base SQLite sur fichier (hors mémoire)"""
+    return url.startswith("sqlite") and ":memory:" not in url and url.rstrip("/") not in ("sqlite:", "sqlite://")
+
+
+def sqlite_pragmas() -> List[Tuple[str, Any]]:
+    """Pragmas du profil SQLite, appliqués à chaque connexion"""
+    return [
+        ("journal_mode", settings.SQLITE_JOURNAL_MODE),
+        ("synchronous", settings.SQLITE_SYNCHRONOUS),
+        ("cache_size", -settings.SQLITE_CACHE_SIZE_KB),  # négatif : en Kio
+        ("mmap_size", settings.SQLITE_MMAP_SIZE),
+        ("busy_timeout", settings.SQLITE_BUSY_TIMEOUT_MS),
+        ("temp_store", "MEMORY"),
+    ]
+
+
+def configure_sqlite_engine(engine: Engine, pragmas: Optional[List[Tuple[str, Any]]] = None) -> Engine:
+    """Applique les pragmas du profil SQLite à chaque nouvelle connexion du moteur"""
+    pragmas = sqlite_pragmas() if pragmas is None else pragmas
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return engine
+
+
 # Créer le moteur SQLAlchemy
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,  # Vérifie les connexions avant de les utiliser
-    echo=settings.DEBUG   # Log les requêtes SQL en mode debug
+    echo=settings.SQL_ECHO,  # Journal de chaque requête SQL (diagnostic ponctuel)
+    connect_args=_connect_args(settings.DATABASE_URL)
 )
+instrument_engine(engine, "primary")
+if is_sqlite_file(settings.DATABASE_URL):
+    # WAL : les lectures du pool restent concurrentes de l'écrivain
+    configure_sqlite_engine(engine)
 
 # Créer la session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Moteur de la réplique en lecture (optionnel)
+read_engine = create_engine(
+    settings.DATABASE_READ_URL,
+    pool_pre_ping=True,
+    echo=settings.SQL_ECHO,
+    connect_args=_connect_args(settings.DATABASE_READ_URL)
+) if settings.DATABASE_READ_URL else None
+if read_engine is not None:
+    instrument_engine(read_engine, "replica")
+
+ReadSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=read_engine
+) if read_engine is not None else None
+
 # Classe de base pour les modèles
 Base = declarative_base()
 
@@ -30,6 +114,9 @@ class Prediction(Base):
     id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, nullable=True, index=True)
     
+    # Identifiant unique de la requête (rejeu du spool sans doublon)
+    request_id = Column(String(36), nullable=True, unique=True, index=True)
+    
     # Données d'entrée (stockées en JSON)
     input_data = Column(JSON, nullable=False)
     
@@ -39,13 +126,111 @@ class Prediction(Base):
     class_name = Column(String, nullable=False)   # "Attrition" ou "Pas d'attrition"
     
     # Métadonnées
+    # created_at est la clé de partitionnement sous PostgreSQL (voir
+    # scripts/create_db_partitioned.sql) : toujours renseignée côté client
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     model_version = Column(String, default="1.0.0")
     
+    # True : comptée dans prediction_daily_stats à l'écriture ; NULL : ligne écrite
+    # sans agrégat incrémental (version antérieure, import), comptée par rollup_days
+    aggregated = Column(Boolean, nullable=True)
+    
     def __repr__(self):
         return f"<Prediction(id={self.id}, employee_id={self.employee_id}, prediction={self.prediction})>"
 
 
+class AppliedRequest(Base):
+    """Requête sans ligne `predictions` déjà appliquée aux tables dérivées (rejeu sans doublon)"""
+    __tablename__ = "applied_requests"
+    
+    request_id = Column(String(36), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<AppliedRequest(request_id={self.request_id})>"
+
+
+class PredictionInput(Base):
+    """Vecteur d'entrée compact, dédupliqué par empreinte de contenu"""
+    __tablename__ = "prediction_inputs"
+    
+    # SHA-256 (hex) du vecteur binaire : deux entrées identiques partagent la même ligne
+    digest = Column(String(64), primary_key=True)
+    layout_version = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<PredictionInput(digest={self.digest[:12]}, layout_version={self.layout_version})>"
+
+
+class CompactPrediction(Base):
+    """Prédiction stockée avec une référence vers un vecteur d'entrée compact"""
+    __tablename__ = "compact_predictions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    employee_id = Column(Integer, nullable=True, index=True)
+    
+    # Référence vers le vecteur d'entrée dédupliqué
+    input_digest = Column(String(64), ForeignKey("prediction_inputs.digest"), nullable=False, index=True)
+    
+    # Résultats de la prédiction
+    prediction = Column(Integer, nullable=False)
+    probability = Column(Float, nullable=False)
+    class_name = Column(String, nullable=False)
+    
+    # Métadonnées
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    model_version = Column(String, default="1.0.0")
+    
+    # ID de la ligne d'origine dans `predictions` (migration idempotente)
+    legacy_id = Column(Integer, nullable=True, unique=True)
+    
+    def __repr__(self):
+        return f"<CompactPrediction(id={self.id}, employee_id={self.employee_id}, prediction={self.prediction})>"
+
+
+class PredictionDailyStats(Base):
+    """Agrégats journaliers des prédictions (conservés après expiration des données brutes)"""
+    __tablename__ = "prediction_daily_stats"
+    
+    # Dimensions ("" lorsque la valeur est inconnue)
+    day = Column(Date, primary_key=True)
+    department = Column(String(100), primary_key=True, default="")
+    poste = Column(String(100), primary_key=True, default="")
+    model_version = Column(String(20), primary_key=True, default="1.0.0")
+    
+    # Mesures
+    count = Column(Integer, nullable=False, default=0)
+    positive_count = Column(Integer, nullable=False, default=0)
+    probability_sum = Column(Float, nullable=False, default=0.0)
+    
+    def __repr__(self):
+        return f"<PredictionDailyStats(day={self.day}, department={self.department}, count={self.count})>"
+
+
+class CurrentRisk(Base):
+    """Dernier risque connu par employé (mis à jour à chaque prédiction)"""
+    __tablename__ = "current_risk"
+    __table_args__ = (
+        # Top-k par département : parcours de l'index dans l'ordre décroissant
+        Index("ix_current_risk_department_probability", "department", "probability"),
+    )
+    
+    employee_id = Column(Integer, primary_key=True)
+    prediction_id = Column(Integer, nullable=True)
+    prediction = Column(Integer, nullable=False)
+    probability = Column(Float, nullable=False, index=True)
+    class_name = Column(String, nullable=False)
+    department = Column(String(100), nullable=True)
+    poste = Column(String(100), nullable=True)
+    model_version = Column(String(20), default="1.0.0")
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<CurrentRisk(employee_id={self.employee_id}, probability={self.probability})>"
+
+
 class User(Base):
     """Modèle pour les utilisateurs de l'API (authentification)"""
     __tablename__ = "users"
@@ -58,10 +243,216 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+class ApiKey(Base):
+    """Clé d'API des clients machine (seule l'empreinte HMAC est stockée)"""
+    __tablename__ = "api_keys"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    key_prefix = Column(String(12), nullable=False)  # Début de la clé, pour l'identifier
+    key_digest = Column(String(64), unique=True, index=True, nullable=False)
+    scopes = Column(String, nullable=False, default="predict")  # Séparés par des virgules
+    quota_per_minute = Column(Integer, nullable=True)  # None = illimité
+    is_active = Column(Boolean, default=True, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 def create_tables():
-    """Crée toutes les tables dans la base de données"""
-    Base.metadata.create_all(bind=engine)
-    print("✅ Tables créées avec succès")
+    """Crée toutes les tables dans la base de données (et met à niveau les tables existantes)"""
+    upgrade_schema(engine)
+    logger.info("Tables créées avec succès")
+
+
+# Colonnes de `predictions` ajoutées après coup : (nom, type SQL, index unique)
+_UPGRADE_COLUMNS = (
+    ("request_id", "VARCHAR(36)", True),
+    ("aggregated", "BOOLEAN", False),
+)
+
+
+def upgrade_schema(bind: Engine) -> List[str]:
+    """
+    Met à niveau une base créée par une version antérieure (idempotent)
+
+    - crée les tables manquantes ;
+    - ajoute `predictions.request_id` et son index unique : sans cette colonne,
+      chaque insertion échoue et part dans le spool, dont le rejeu échoue aussi ;
+    - ajoute `predictions.aggregated` : les lignes existantes (NULL) restent à
+      compter par `rollup_days`.
+
+    Returns:
+        Modifications appliquées
+    """
+    applied = []
+    Base.metadata.create_all(bind=bind)
+    table = Prediction.__tablename__
+    columns = {column["name"] for column in inspect(bind).get_columns(table)}
+    for name, ddl, unique in _UPGRADE_COLUMNS:
+        if name in columns:
+            continue
+        with bind.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+            if unique:
+                connection.execute(text(
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{table}_{name} ON {table} ({name})"
+                ))
+        applied.append(f"{table}.{name}")
+        logger.warning("Schéma mis à niveau : colonne {}.{} ajoutée", table, name)
+    return applied
+
+
+class SQLiteWriteQueue:
+    """
+    Écrivain SQLite unique : les écritures sont mises en file et exécutées par
+    un thread sur une connexion dédiée
+
+    SQLite n'accepte qu'un écrivain à la fois ; plutôt que de laisser les
+    requêtes se disputer le verrou, le thread dépile jusqu'à `max_batch`
+    écritures et les valide en un seul commit (un seul fsync). Chaque écriture
+    s'exécute dans un SAVEPOINT : un échec n'annule que celle-ci.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_batch: int = 64,
+        pragmas: Optional[List[Tuple[str, Any]]] = None,
+        timeout: float = 5.0,
+        linger: float = 0.0
+    ):
+        self.url = url
+        self.max_batch = max_batch
+        self.timeout = timeout  # Attente maximale d'une écriture (file + commit)
+        self.linger = linger  # Attente d'autres écritures après la première d'un lot
+        self._engine = create_engine(
+            url,
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}
+        )
+        configure_sqlite_engine(self._engine, pragmas)
+        instrument_engine(self._engine, "sqlite_writer")
+
+        # Transactions gérées par SQLAlchemy (BEGIN IMMEDIATE) pour des SAVEPOINT fiables
+        @event.listens_for(self._engine, "connect")
+        def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(self._engine, "begin")
+        def _begin_immediate(conn):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+        self._session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self._engine)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.writes = 0
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, fn: Callable[[Session], Any]) -> Future:
+        """Met en file une écriture `fn(session)` ; le résultat est disponible après le commit"""
+        future: Future = Future()
+        self._ensure_started()
+        self._queue.put((fn, future))
+        return future
+
+    def execute(self, fn: Callable[[Session], Any], timeout: Optional[float] = None) -> Any:
+        """Exécute une écriture et attend son commit (bloquant : hors de la boucle d'événements)"""
+        return self.submit(fn).result(self.timeout if timeout is None else timeout)
+
+    async def execute_async(self, fn: Callable[[Session], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Exécute une écriture et attend son commit sans bloquer la boucle d'événements
+
+        Les écritures des requêtes concurrentes s'accumulent dans la file pendant
+        l'attente : l'écrivain les valide ensemble. Lève `TimeoutError` au-delà
+        de `timeout` (l'écriture est annulée si elle n'a pas encore commencé).
+        """
+        return await asyncio.wait_for(
+            asyncio.wrap_future(self.submit(fn)), self.timeout if timeout is None else timeout
+        )
+
+    def close(self) -> None:
+        """Termine les écritures en file puis arrête le thread"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+        self._engine.dispose()
+
+    def _next_batch(self) -> Tuple[list, bool]:
+        batch = [self._queue.get()]
+        # Un commit est souvent plus rapide que l'arrivée de la requête suivante :
+        # attendre `linger` secondes laisse aux écritures concurrentes le temps de
+        # rejoindre le lot (un commit pour toutes)
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.max_batch and batch[-1] is not None:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        stop = None in batch
+        return [job for job in batch if job is not None], stop
+
+    def _run(self) -> None:
+        session = self._session_factory()
+        try:
+            stop = False
+            while not stop:
+                batch, stop = self._next_batch()
+                if batch:
+                    self._write_batch(session, batch)
+        finally:
+            session.close()
+
+    def _write_batch(self, session: Session, batch: list) -> None:
+        done = []
+        for fn, future in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            savepoint = session.begin_nested()
+            try:
+                result = fn(session)
+                savepoint.commit()
+                done.append((future, result))
+            except Exception as exc:
+                savepoint.rollback()
+                future.set_exception(exc)
+        try:
+            session.commit()
+        except Exception as exc:
+            session.rollback()
+            for future, _ in done:
+                future.set_exception(exc)
+            return
+        self.batches += 1
+        self.writes += len(done)
+        for future, result in done:
+            future.set_result(result)
+
+
+# Écrivain dédié pour une base SQLite sur fichier (None sinon)
+sqlite_write_queue = SQLiteWriteQueue(
+    settings.DATABASE_URL,
+    max_batch=settings.SQLITE_WRITE_BATCH,
+    timeout=settings.SQLITE_WRITE_TIMEOUT_MS / 1000,
+    linger=settings.SQLITE_WRITE_LINGER_MS / 1000
+) if settings.SQLITE_WRITE_QUEUE and is_sqlite_file(settings.DATABASE_URL) else None
+
+
+def dialect_insert(db):
+    """Retourne la construction INSERT du dialecte de la session (supporte ON CONFLICT)"""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
 
 
 def get_db():
@@ -73,3 +464,75 @@ def get_db():
         db.close()
 
 
+class ReplicaUnavailableError(Exception):
+    """La réplique en lecture est indisponible et le repli est désactivé"""
+
+
+class ReadReplicaRouter:
+    """
+    Route les sessions de lecture vers la réplique, avec repli sur la primaire
+
+    Une réplique en échec est marquée indisponible pendant `retry_seconds`
+    pour ne pas payer un timeout de connexion à chaque requête.
+    """
+    
+    def __init__(
+        self,
+        primary_factory: Callable[[], Session],
+        replica_factory: Optional[Callable[[], Session]] = None,
+        fallback: bool = True,
+        retry_seconds: float = 30.0
+    ):
+        self.primary_factory = primary_factory
+        self.replica_factory = replica_factory
+        self.fallback = fallback
+        self.retry_seconds = retry_seconds
+        self._unavailable_until = 0.0
+    
+    def replica_available(self) -> bool:
+        """Indique si la réplique est configurée et n'est pas marquée en échec"""
+        return self.replica_factory is not None and time.monotonic() >= self._unavailable_until
+    
+    def _primary_or_raise(self) -> Session:
+        if not self.fallback:
+            raise ReplicaUnavailableError("Réplique en lecture indisponible")
+        return self.primary_factory()
+    
+    def session(self) -> Session:
+        """Ouvre une session de lecture"""
+        if self.replica_factory is None:
+            return self.primary_factory()
+        if not self.replica_available():
+            return self._primary_or_raise()
+        
+        db = self.replica_factory()
+        try:
+            # Emprunter une connexion (validée par pool_pre_ping)
+            db.connection()
+            return db
+        except Exception:
+            db.close()
+            self._unavailable_until = time.monotonic() + self.retry_seconds
+            return self._primary_or_raise()
+
+
+read_router = ReadReplicaRouter(
+    SessionLocal,
+    ReadSessionLocal,
+    fallback=settings.DATABASE_READ_FALLBACK,
+    retry_seconds=settings.DATABASE_READ_RETRY_SECONDS
+)
+
+
+def get_read_db():
+    """Dependency pour obtenir une session de lecture (réplique si configurée)"""
+    try:
+        db = read_router.session()
+    except ReplicaUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
@@ -0,0 +1,317 @@
+"""
+Partitionnement temporel de la table `predictions`, rétention et agrégats journaliers
+
+Sous PostgreSQL, `predictions` est partitionnée par mois sur `created_at`
+(voir scripts/create_db_partitioned.sql). Sous SQLite, qui ne connaît pas le
+partitionnement, chaque mois de la table unique joue le rôle d'une partition :
+la suppression d'une « partition » devient un DELETE sur l'intervalle du mois.
+
+Avant la suppression des données brutes, les agrégats journaliers sont écrits
+dans `prediction_daily_stats` pour les jours qui n'en ont pas encore.
+"""
+import gzip
+import json
+from collections import defaultdict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.aggregates import add_prediction_stats
+from app.models.database import AppliedRequest, Prediction, PredictionDailyStats
+
+PARTITIONED_TABLE = "predictions"
+DEFAULT_PARTITION = f"{PARTITIONED_TABLE}_default"
+ROLLUP_MARK_BATCH = 1000  # Lignes marquées `aggregated` par UPDATE
+
+
+def month_start(value: date) -> date:
+    """Premier jour du mois de `value`"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    """Premier jour du mois situé `months` mois après celui de `value`"""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Nom de la partition mensuelle, ex: predictions_y2026m03"""
+    return f"{PARTITIONED_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def parse_partition_name(name: str) -> Optional[date]:
+    """Retourne le mois d'une partition à partir de son nom (None si non conforme)"""
+    prefix = f"{PARTITIONED_TABLE}_y"
+    if not name.startswith(prefix) or len(name) != len(prefix) + 7:
+        return None
+    try:
+        return date(int(name[-7:-3]), int(name[-2:]), 1)
+    except ValueError:
+        return None
+
+
+def _month_bounds(month: date) -> Tuple[datetime, datetime]:
+    start = month_start(month)
+    end = add_months(start, 1)
+    return datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.min.time())
+
+
+class PostgresPartitionManager:
+    """
+    Gestion des partitions mensuelles natives PostgreSQL
+
+    La partition par défaut (`predictions_default`) reçoit les lignes écrites
+    avant la création de leur partition mensuelle : ces lignes sont déplacées
+    dans la partition à sa création, et la rétention purge aussi les mois
+    anciens restés dans la partition par défaut.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def partition_ddl(month: date) -> str:
+        """DDL de création de la partition d'un mois"""
+        start, end = _month_bounds(month)
+        return (
+            f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+            f"PARTITION OF {PARTITIONED_TABLE} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+
+    def ensure_partitions(self, start: date, months_ahead: int = 2) -> List[date]:
+        """
+        Crée les partitions du mois de `start` et des `months_ahead` mois suivants
+
+        Les lignes du mois déjà présentes dans la partition par défaut y sont
+        retirées puis réinsérées après la création, dans la même transaction
+        (PostgreSQL refuse la création tant que la partition par défaut
+        contient des lignes de l'intervalle).
+        """
+        months = [add_months(month_start(start), i) for i in range(months_ahead + 1)]
+        existing = set(self._attached_months())
+        has_default = self._has_default()
+        try:
+            for month in months:
+                if month in existing:
+                    continue
+                if has_default:
+                    self._create_from_default(month)
+                else:
+                    self.db.execute(text(self.partition_ddl(month)))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return months
+
+    def _create_from_default(self, month: date) -> None:
+        """Crée la partition d'un mois en y déplaçant les lignes de la partition par défaut"""
+        start, end = _month_bounds(month)
+        staging = f"{partition_name(month)}_staging"
+        self.db.execute(text(f"CREATE TEMP TABLE {staging} (LIKE {DEFAULT_PARTITION})"))
+        self.db.execute(text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE created_at >= :start AND created_at < :end RETURNING *) "
+            f"INSERT INTO {staging} SELECT * FROM moved"
+        ), {"start": start, "end": end})
+        self.db.execute(text(self.partition_ddl(month)))
+        self.db.execute(text(f"INSERT INTO {PARTITIONED_TABLE} SELECT * FROM {staging}"))
+        self.db.execute(text(f"DROP TABLE {staging}"))
+
+    def _has_default(self) -> bool:
+        return bool(self.db.execute(
+            text("SELECT to_regclass(:name) IS NOT NULL"), {"name": DEFAULT_PARTITION}
+        ).scalar())
+
+    def _attached_months(self) -> List[date]:
+        """Mois couverts par une partition mensuelle"""
+        rows = self.db.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :parent"
+        ), {"parent": PARTITIONED_TABLE})
+        months = [parse_partition_name(name) for (name,) in rows]
+        return [m for m in months if m is not None]
+
+    def _default_months(self) -> List[date]:
+        """Mois ayant des lignes dans la partition par défaut"""
+        if not self._has_default():
+            return []
+        rows = self.db.execute(text(
+            f"SELECT DISTINCT date_trunc('month', created_at) FROM {DEFAULT_PARTITION}"
+        ))
+        return [month_start(value) for (value,) in rows if value is not None]
+
+    def list_partitions(self) -> List[date]:
+        """Liste les mois couverts par une partition ou présents dans la partition par défaut"""
+        return sorted(set(self._attached_months()) | set(self._default_months()))
+
+    def drop_partition(self, month: date) -> None:
+        """Détache puis supprime la partition d'un mois, et purge le mois dans la partition par défaut"""
+        if month in self._attached_months():
+            name = partition_name(month)
+            self.db.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {name}"))
+            self.db.execute(text(f"DROP TABLE {name}"))
+        if self._has_default():
+            start, end = _month_bounds(month)
+            self.db.execute(text(
+                f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end"
+            ), {"start": start, "end": end})
+        self.db.commit()
+
+
+class SQLitePartitionManager:
+    """Équivalent SQLite : une « partition » est un mois de la table unique"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ensure_partitions(self, start: date, months_ahead: int = 2) -> List[date]:
+        """Rien à créer : la table unique accepte toutes les dates"""
+        return [add_months(month_start(start), i) for i in range(months_ahead + 1)]
+
+    def list_partitions(self) -> List[date]:
+        """Liste les mois contenant au moins une prédiction"""
+        rows = self.db.execute(text(
+            f"SELECT DISTINCT strftime('%Y-%m', created_at) FROM {PARTITIONED_TABLE}"
+        ))
+        return sorted(
+            date(int(value[:4]), int(value[5:7]), 1) for (value,) in rows if value
+        )
+
+    def drop_partition(self, month: date) -> None:
+        """Supprime les prédictions du mois"""
+        start, end = _month_bounds(month)
+        self.db.query(Prediction).filter(
+            Prediction.created_at >= start, Prediction.created_at < end
+        ).delete(synchronize_session=False)
+        self.db.commit()
+
+
+def get_partition_manager(db: Session):
+    """Retourne le gestionnaire de partitions adapté au moteur de la session"""
+    if db.get_bind().dialect.name == "postgresql":
+        return PostgresPartitionManager(db)
+    return SQLitePartitionManager(db)
+
+
+def rollup_days(db: Session, start: date, end: date) -> int:
+    """
+    Ajoute aux agrégats journaliers de [start, end) les lignes brutes qui n'y
+    sont pas encore comptées (`aggregated` NULL : écrites sans agrégat
+    incrémental), puis les marque, dans la même transaction. Un jour qui mêle
+    lignes anciennes et lignes déjà agrégées est donc complété sans doublon,
+    et l'opération est idempotente.
+
+    Returns:
+        Nombre de lignes d'agrégats mises à jour
+    """
+    totals: Dict[tuple, List[float]] = defaultdict(lambda: [0, 0, 0.0])
+    ids = []
+    rows = (
+        db.query(Prediction.id, Prediction.created_at, Prediction.input_data, Prediction.prediction,
+                 Prediction.probability, Prediction.model_version)
+        .filter(Prediction.created_at >= datetime.combine(start, datetime.min.time()),
+                Prediction.created_at < datetime.combine(end, datetime.min.time()),
+                Prediction.aggregated.is_not(True))
+        .yield_per(5000)
+    )
+    for prediction_id, created_at, input_data, prediction, probability, model_version in rows:
+        ids.append(prediction_id)
+        input_data = input_data or {}
+        key = (created_at.date(), input_data.get("department") or "", input_data.get("poste") or "",
+               model_version or "1.0.0")
+        bucket = totals[key]
+        bucket[0] += 1
+        bucket[1] += 1 if prediction == 1 else 0
+        bucket[2] += probability
+
+    add_prediction_stats(db, [
+        {
+            "day": day, "department": department, "poste": poste, "model_version": model_version,
+            "count": count, "positive_count": positives, "probability_sum": proba_sum,
+        }
+        for (day, department, poste, model_version), (count, positives, proba_sum) in totals.items()
+    ])
+    for i in range(0, len(ids), ROLLUP_MARK_BATCH):
+        db.query(Prediction).filter(Prediction.id.in_(ids[i:i + ROLLUP_MARK_BATCH])) \
+            .update({Prediction.aggregated: True}, synchronize_session=False)
+    db.commit()
+    return len(totals)
+
+
+def archive_month(db: Session, month: date, archive_dir: Path) -> Path:
+    """
+    Exporte les prédictions d'un mois dans un fichier JSON Lines compressé
+
+    Returns:
+        Chemin du fichier d'archive
+    """
+    archive_dir = Path(archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path = archive_dir / f"{partition_name(month)}.jsonl.gz"
+    start, end = _month_bounds(month)
+    rows = (
+        db.query(Prediction)
+        .filter(Prediction.created_at >= start, Prediction.created_at < end)
+        .order_by(Prediction.id)
+        .yield_per(5000)
+    )
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for p in rows:
+            f.write(json.dumps({
+                "id": p.id,
+                "employee_id": p.employee_id,
+                "input_data": p.input_data,
+                "prediction": p.prediction,
+                "probability": p.probability,
+                "class_name": p.class_name,
+                "created_at": p.created_at.isoformat(),
+                "model_version": p.model_version,
+            }) + "\n")
+    return path
+
+
+def apply_retention(
+    db: Session,
+    keep_months: int,
+    archive_dir: Optional[Path] = None,
+    today: Optional[date] = None,
+) -> Dict[str, list]:
+    """
+    Supprime (ou archive puis supprime) les partitions plus anciennes que `keep_months`
+
+    Le mois courant compte dans `keep_months`. Les agrégats journaliers des
+    partitions concernées sont calculés avant suppression ; les traces de
+    `applied_requests` de la même période sont purgées.
+
+    Returns:
+        Dictionnaire avec les mois supprimés (`dropped`) et les archives créées (`archives`)
+    """
+    if keep_months < 1:
+        raise ValueError("keep_months doit être supérieur ou égal à 1")
+
+    cutoff = add_months(month_start(today or date.today()), -(keep_months - 1))
+    manager = get_partition_manager(db)
+    result = {"dropped": [], "archives": []}
+
+    for month in manager.list_partitions():
+        if month >= cutoff:
+            continue
+        rollup_days(db, month, add_months(month, 1))
+        if archive_dir is not None:
+            result["archives"].append(archive_month(db, month, archive_dir))
+        manager.drop_partition(month)
+        result["dropped"].append(month)
+
+    db.query(AppliedRequest).filter(
+        AppliedRequest.created_at < datetime.combine(cutoff, datetime.min.time())
+    ).delete(synchronize_session=False)
+    db.commit()
+    return result
@@ -0,0 +1,648 @@
+"""
+Persistance des prédictions
+
+Les routes confient chaque prédiction à un `PredictionSink` :
+- `PredictionWriter` (sink "sql") : écriture en base protégée par un disjoncteur,
+  avec repli sur le spool local et rejeu différé ;
+- `ColumnarLogSink` (sink "columnar") : journal binaire en ajout seul, pour les
+  déploiements qui n'ont besoin que d'une trace d'audit.
+"""
+import asyncio
+import random
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import get_settings
+from app.models.aggregates import add_prediction_stats, record_prediction_stats
+from app.models.columnar_log import ColumnarPredictionLog
+from app.models.current_risk import upsert_current_risk, upsert_current_risks
+from app.models.database import AppliedRequest, Prediction, SessionLocal, SQLiteWriteQueue, sqlite_write_queue
+from app.models.spool import PredictionSpool
+
+settings = get_settings()
+
+
+@dataclass
+class PredictionRecord:
+    """Prédiction à persister"""
+    input_data: Dict[str, Any]
+    prediction: int
+    probability: float
+    class_name: str
+    employee_id: Optional[int] = None
+    model_version: str = "1.0.0"
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    request_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    # False : seuls les agrégats et le risque courant sont mis à jour (pas de ligne)
+    store_row: bool = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Représentation sérialisable en JSON"""
+        data = asdict(self)
+        data["created_at"] = self.created_at.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PredictionRecord":
+        """Reconstruit un enregistrement depuis `to_dict()`"""
+        data = dict(data)
+        data["created_at"] = datetime.fromisoformat(data["created_at"])
+        return cls(**data)
+
+
+def _update_derived_tables(db: Session, record: PredictionRecord, prediction_id: Optional[int]) -> None:
+    """Met à jour les agrégats et le risque courant d'une prédiction"""
+    department = record.input_data.get("department")
+    poste = record.input_data.get("poste")
+    record_prediction_stats(
+        db,
+        prediction=record.prediction,
+        probability=record.probability,
+        department=department,
+        poste=poste,
+        model_version=record.model_version,
+        created_at=record.created_at
+    )
+    if record.employee_id is not None:
+        upsert_current_risk(
+            db,
+            employee_id=record.employee_id,
+            prediction=record.prediction,
+            probability=record.probability,
+            class_name=record.class_name,
+            prediction_id=prediction_id,
+            department=department,
+            poste=poste,
+            model_version=record.model_version,
+            updated_at=record.created_at
+        )
+
+
+def save_prediction(db: Session, record: PredictionRecord) -> Optional[int]:
+    """
+    Ajoute une prédiction et met à jour les tables dérivées (sans commit)
+
+    Returns:
+        ID de la prédiction (None si seule la mise à jour des agrégats est demandée)
+    """
+    if not record.store_row:
+        # Trace du request_id : le rejeu ne recompte pas une écriture qui a abouti
+        db.add(AppliedRequest(request_id=record.request_id, created_at=record.created_at))
+        db.flush()
+        _update_derived_tables(db, record, None)
+        return None
+
+    db_prediction = Prediction(
+        request_id=record.request_id,
+        employee_id=record.employee_id,
+        input_data=record.input_data,
+        prediction=record.prediction,
+        probability=record.probability,
+        class_name=record.class_name,
+        model_version=record.model_version,
+        created_at=record.created_at,
+        aggregated=True
+    )
+    db.add(db_prediction)
+    db.flush()
+    _update_derived_tables(db, record, db_prediction.id)
+    return db_prediction.id
+
+
+def save_predictions_bulk(db: Session, records: List[PredictionRecord]) -> int:
+    """
+    Insère un lot de prédictions en une seule requête, sans doublon (sans commit)
+
+    Les enregistrements dont le `request_id` a déjà été appliqué sont ignorés ;
+    ceux sans ligne (`store_row=False`) ne mettent à jour que les tables
+    dérivées, leur `request_id` étant tracé dans `applied_requests`.
+
+    Returns:
+        Nombre de prédictions insérées
+    """
+    derived_only = _new_records(db, AppliedRequest.request_id, [r for r in records if not r.store_row])
+    if derived_only:
+        db.execute(insert(AppliedRequest), [
+            {"request_id": r.request_id, "created_at": r.created_at} for r in derived_only
+        ])
+        for record in derived_only:
+            _update_derived_tables(db, record, None)
+
+    new_records = _new_records(db, Prediction.request_id, [r for r in records if r.store_row])
+    if not new_records:
+        return 0
+
+    db.execute(insert(Prediction), [
+        {
+            "request_id": r.request_id,
+            "employee_id": r.employee_id,
+            "input_data": r.input_data,
+            "prediction": r.prediction,
+            "probability": r.probability,
+            "class_name": r.class_name,
+            "model_version": r.model_version,
+            "created_at": r.created_at,
+            "aggregated": True,
+        }
+        for r in new_records
+    ])
+    ids = dict(
+        db.query(Prediction.request_id, Prediction.id)
+        .filter(Prediction.request_id.in_([r.request_id for r in new_records]))
+    )
+    for record in new_records:
+        _update_derived_tables(db, record, ids.get(record.request_id))
+    return len(new_records)
+
+
+def _new_records(db: Session, column, records: List[PredictionRecord]) -> List[PredictionRecord]:
+    """Enregistrements dont le `request_id` est absent de `column` (et du lot lui-même)"""
+    if not records:
+        return []
+    seen = {
+        request_id for (request_id,) in
+        db.query(column).filter(column.in_([r.request_id for r in records]))
+    }
+    new_records = []
+    for record in records:
+        if record.request_id not in seen:
+            seen.add(record.request_id)
+            new_records.append(record)
+    return new_records
+
+
+class PredictionSink(ABC):
+    """Destination des prédictions à persister"""
+
+    @abstractmethod
+    def write(self, db: Session, record: PredictionRecord) -> Optional[int]:
+        """
+        Persiste une prédiction
+
+        Returns:
+            ID de la prédiction en base, ou None si elle n'en a pas
+        """
+
+    async def write_async(self, db: Session, record: PredictionRecord) -> Optional[int]:
+        """Variante pour les routes asynchrones (par défaut : `write`)"""
+        return self.write(db, record)
+
+    def flush(self) -> None:
+        """Écrit sur disque les données en attente depuis trop longtemps (appel périodique)"""
+
+    def close(self) -> None:
+        """Libère les ressources (écrit les données en attente)"""
+
+    def unwrap(self) -> "PredictionSink":
+        """Sink qui persiste réellement (sous les éventuels décorateurs)"""
+        return self
+
+
+class PredictionWriter(PredictionSink):
+    """
+    Sink SQL : écrit les prédictions en base ; bascule sur le spool lorsque le
+    disjoncteur est ouvert ou que l'écriture échoue
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        spool: PredictionSpool,
+        replay_batch_size: int = 500,
+        write_queue: Optional[SQLiteWriteQueue] = None,
+    ):
+        self.breaker = breaker
+        self.spool = spool
+        self.replay_batch_size = replay_batch_size
+        self.write_queue = write_queue
+        self.spooled_count = 0
+        self.replayed_count = 0
+
+    def write(self, db: Session, record: PredictionRecord) -> Optional[int]:
+        """
+        Persiste une prédiction
+
+        Returns:
+            ID de la prédiction, ou None si elle a été placée dans le spool
+        """
+        if not self.breaker.allow_request():
+            self._spool(record)
+            return None
+
+        start = time.perf_counter()
+        try:
+            if self._use_write_queue(db):
+                # SQLite : écriture regroupée par l'écrivain dédié (attente bornée)
+                prediction_id = self.write_queue.execute(lambda session: save_prediction(session, record))
+            else:
+                prediction_id = save_prediction(db, record)
+                db.commit()
+        except (SQLAlchemyError, TimeoutError):
+            return self._fail(db, record)
+
+        self.breaker.record_success(time.perf_counter() - start)
+        return prediction_id
+
+    async def write_async(self, db: Session, record: PredictionRecord) -> Optional[int]:
+        """
+        Persiste une prédiction depuis une route asynchrone
+
+        Le commit est attendu sans bloquer la boucle d'événements : avec
+        l'écrivain SQLite, les écritures des requêtes concurrentes sont validées
+        ensemble ; sinon l'écriture s'exécute dans un thread, dans sa propre
+        session. Au-delà du délai (`DB_WRITE_LATENCY_BUDGET_MS` hors SQLite), la
+        prédiction part dans le spool (le rejeu ignore son `request_id` si
+        l'écriture a fini par aboutir).
+        """
+        if not self.breaker.allow_request():
+            self._spool(record)
+            return None
+
+        start = time.perf_counter()
+        try:
+            if self._use_write_queue(db):
+                prediction_id = await self.write_queue.execute_async(lambda session: save_prediction(session, record))
+            else:
+                prediction_id = await asyncio.wait_for(
+                    asyncio.to_thread(self._write_detached, db.get_bind(), record),
+                    timeout=settings.DB_WRITE_LATENCY_BUDGET_MS / 1000
+                )
+        except (SQLAlchemyError, TimeoutError):
+            return self._fail(db, record)
+
+        self.breaker.record_success(time.perf_counter() - start)
+        return prediction_id
+
+    @staticmethod
+    def _write_detached(bind, record: PredictionRecord) -> Optional[int]:
+        # Session propre au thread : il peut finir après l'abandon de l'attente
+        session = Session(bind=bind)
+        try:
+            prediction_id = save_prediction(session, record)
+            session.commit()
+            return prediction_id
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _fail(self, db: Session, record: PredictionRecord) -> Optional[int]:
+        db.rollback()
+        self.breaker.record_failure()
+        self._spool(record)
+        return None
+
+    def _use_write_queue(self, db: Session) -> bool:
+        # L'écrivain ne sert que les sessions liées à sa propre base
+        return self.write_queue is not None \
+            and db.get_bind().url.render_as_string(hide_password=False) == self.write_queue.url
+
+    def flush(self) -> None:
+        self.spool.flush()
+
+    def close(self) -> None:
+        """Écrit sur disque les enregistrements en attente du spool"""
+        self.spool.close()
+        if self.write_queue is not None:
+            self.write_queue.close()
+
+    def _spool(self, record: PredictionRecord) -> None:
+        self.spool.append(record.to_dict())
+        self.spooled_count += 1
+
+    def replay(self, session_factory: Callable[[], Session]) -> int:
+        """
+        Charge les segments du spool en base (bloquant)
+
+        Un segment n'est supprimé qu'après le commit de tous ses lots ; en cas
+        d'interruption, le rejeu suivant ignore les prédictions déjà insérées.
+
+        Returns:
+            Nombre de prédictions insérées
+        """
+        if not self.spool.has_pending() or not self.breaker.allow_request():
+            return 0
+
+        self.spool.seal()
+        inserted = 0
+        db = session_factory()
+        try:
+            for segment in self.spool.segments():
+                batch = []
+                for data in self.spool.read_segment(segment):
+                    batch.append(PredictionRecord.from_dict(data))
+                    if len(batch) >= self.replay_batch_size:
+                        inserted += save_predictions_bulk(db, batch)
+                        db.commit()
+                        batch = []
+                if batch:
+                    inserted += save_predictions_bulk(db, batch)
+                    db.commit()
+                segment.unlink()
+        except SQLAlchemyError:
+            db.rollback()
+            self.breaker.record_failure()
+            return inserted
+        except Exception:
+            db.rollback()
+            self.breaker.record_failure()
+            raise
+        finally:
+            db.close()
+
+        self.breaker.record_success()
+        self.replayed_count += inserted
+        return inserted
+
+
+class DerivedTablesBuffer:
+    """
+    Mises à jour des agrégats et du risque courant regroupées en mémoire
+
+    Les mesures sont additionnées par dimension (jour, département, poste,
+    version) et seule la prédiction la plus récente de chaque employé est
+    gardée : `apply()` écrit le tout en une fois, quel que soit le nombre de
+    prédictions accumulées.
+    """
+
+    def __init__(self):
+        self.stats: Dict[tuple, List[float]] = {}
+        self.risks: Dict[int, PredictionRecord] = {}
+        self.records = 0
+
+    def add(self, record: PredictionRecord) -> None:
+        key = (
+            record.created_at.date(),
+            record.input_data.get("department") or "",
+            record.input_data.get("poste") or "",
+            record.model_version or "1.0.0",
+        )
+        totals = self.stats.setdefault(key, [0, 0, 0.0])
+        totals[0] += 1
+        totals[1] += 1 if record.prediction == 1 else 0
+        totals[2] += record.probability
+        self._keep_latest(record)
+        self.records += 1
+
+    def merge(self, other: "DerivedTablesBuffer") -> None:
+        """Réintègre des mises à jour non écrites (échec de la base)"""
+        for key, (count, positives, probability_sum) in other.stats.items():
+            totals = self.stats.setdefault(key, [0, 0, 0.0])
+            totals[0] += count
+            totals[1] += positives
+            totals[2] += probability_sum
+        for record in other.risks.values():
+            self._keep_latest(record)
+        self.records += other.records
+
+    def _keep_latest(self, record: PredictionRecord) -> None:
+        if record.employee_id is None:
+            return
+        current = self.risks.get(record.employee_id)
+        if current is None or current.created_at <= record.created_at:
+            self.risks[record.employee_id] = record
+
+    def apply(self, db: Session) -> None:
+        """Écrit les agrégats et le risque courant : un upsert groupé pour chacun (sans commit)"""
+        add_prediction_stats(db, [
+            {
+                "day": day, "department": department, "poste": poste, "model_version": model_version,
+                "count": count, "positive_count": positives, "probability_sum": probability_sum,
+            }
+            for (day, department, poste, model_version), (count, positives, probability_sum)
+            in self.stats.items()
+        ])
+        upsert_current_risks(db, [
+            {
+                "employee_id": record.employee_id,
+                "prediction": record.prediction,
+                "probability": record.probability,
+                "class_name": record.class_name,
+                "department": record.input_data.get("department"),
+                "poste": record.input_data.get("poste"),
+                "model_version": record.model_version,
+                "updated_at": record.created_at,
+            }
+            for record in self.risks.values()
+        ])
+
+
+class ColumnarLogSink(PredictionSink):
+    """
+    Sink colonnaire : ajoute les prédictions au journal binaire (sans ID en base)
+
+    Les agrégats journaliers et le risque courant restent en base : chaque
+    prédiction (conservée ou non) est ajoutée à un tampon en mémoire, écrit
+    en base par `flush()` (tâche de fond, hors de la boucle d'événements) en
+    une transaction, derrière un disjoncteur. En cas d'échec, le tampon est
+    conservé pour l'essai suivant. Sans `session_factory`, les tables
+    dérivées ne sont pas mises à jour.
+    """
+
+    def __init__(
+        self,
+        log: ColumnarPredictionLog,
+        session_factory: Optional[Callable[[], Session]] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.log = log
+        self.session_factory = session_factory
+        self.breaker = breaker or CircuitBreaker()
+        self._pending = DerivedTablesBuffer()
+        self._lock = threading.Lock()
+
+    def write(self, db: Session, record: PredictionRecord) -> Optional[int]:
+        if record.store_row:
+            self.log.append(record)
+        if self.session_factory is not None:
+            with self._lock:
+                self._pending.add(record)
+        return None
+
+    def flush(self) -> None:
+        self.log.flush_if_due()
+        self.flush_derived()
+
+    def flush_derived(self) -> int:
+        """
+        Écrit en base les mises à jour des tables dérivées en attente (bloquant)
+
+        Returns:
+            Nombre de prédictions prises en compte
+        """
+        with self._lock:
+            if not self._pending.records or not self.breaker.allow_request():
+                return 0
+            pending, self._pending = self._pending, DerivedTablesBuffer()
+
+        start = time.perf_counter()
+        db = self.session_factory()
+        try:
+            pending.apply(db)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            self.breaker.record_failure()
+            with self._lock:
+                self._pending.merge(pending)
+            logger.warning("Agrégats de {} prédictions non écrits: {}", pending.records, e)
+            return 0
+        finally:
+            db.close()
+
+        self.breaker.record_success(time.perf_counter() - start)
+        return pending.records
+
+    def close(self) -> None:
+        self.log.close()
+        if self.session_factory is not None:
+            self.flush_derived()
+
+
+class PersistencePolicy:
+    """
+    Détermine ce qui est conservé de chaque prédiction
+
+    - "full" : ligne complète avec `input_data`
+    - "score_only" : ligne sans les données d'entrée (seuls `department` et
+      `poste` sont conservés, pour les agrégats)
+    - "sampled" : ligne complète pour une fraction `sample_rate` des prédictions
+    - "threshold" : ligne complète si la probabilité atteint `threshold`
+
+    Les prédictions non conservées mettent quand même à jour les agrégats.
+    """
+
+    MODES = ("full", "score_only", "sampled", "threshold")
+    _DIMENSION_FIELDS = ("department", "poste")
+
+    def __init__(self, mode: str = "full", sample_rate: float = 1.0, threshold: float = 0.5,
+                 rng: Optional[random.Random] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Politique de persistance inconnue: {mode}")
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate doit être compris entre 0 et 1")
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self._rng = rng or random.Random()
+
+    def apply(self, record: PredictionRecord) -> PredictionRecord:
+        """Retourne l'enregistrement à transmettre au sink"""
+        if self.mode == "full":
+            return record
+        if self.mode == "score_only":
+            dimensions = {k: record.input_data[k] for k in self._DIMENSION_FIELDS if k in record.input_data}
+            return replace(record, input_data=dimensions)
+        if self.mode == "sampled":
+            keep = self._rng.random() < self.sample_rate
+        else:
+            keep = record.probability >= self.threshold
+        return record if keep else replace(record, store_row=False)
+
+
+class PolicySink(PredictionSink):
+    """Applique une politique de persistance avant de déléguer au sink"""
+
+    def __init__(self, sink: PredictionSink, policy: PersistencePolicy):
+        self.sink = sink
+        self.policy = policy
+
+    def write(self, db: Session, record: PredictionRecord) -> Optional[int]:
+        return self.sink.write(db, self.policy.apply(record))
+
+    async def write_async(self, db: Session, record: PredictionRecord) -> Optional[int]:
+        return await self.sink.write_async(db, self.policy.apply(record))
+
+    def flush(self) -> None:
+        self.sink.flush()
+
+    def close(self) -> None:
+        self.sink.close()
+
+    def unwrap(self) -> PredictionSink:
+        return self.sink.unwrap()
+
+
+async def run_replay_loop(
+    writer: PredictionWriter,
+    session_factory: Callable[[], Session],
+    interval: float
+) -> None:
+    """Tâche de fond : rejoue périodiquement le spool hors de la boucle d'événements"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            inserted = await asyncio.to_thread(writer.replay, session_factory)
+            if inserted:
+                logger.info("{} prédictions rejouées depuis le spool", inserted)
+        except Exception as e:
+            logger.error("Erreur lors du rejeu du spool: {}", e)
+
+
+async def run_sink_flush_loop(sink: PredictionSink, interval: float) -> None:
+    """Tâche de fond : écrit les données en attente d'un sink inactif, hors de la boucle d'événements"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(sink.flush)
+        except Exception as e:
+            logger.error("Erreur lors de l'écriture des prédictions en attente: {}", e)
+
+
+prediction_writer = PredictionWriter(
+    CircuitBreaker(
+        failure_threshold=settings.DB_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.DB_BREAKER_RESET_SECONDS,
+        slow_call_threshold=settings.DB_WRITE_LATENCY_BUDGET_MS / 1000
+    ),
+    PredictionSpool(
+        settings.PREDICTION_SPOOL_DIR,
+        fsync_batch=settings.SPOOL_FSYNC_BATCH,
+        fsync_interval=settings.SPOOL_FSYNC_INTERVAL_MS / 1000
+    ),
+    write_queue=sqlite_write_queue
+)
+
+
+def build_prediction_sink(name: str, policy: Optional[PersistencePolicy] = None) -> PredictionSink:
+    """Construit le sink configuré ("sql" ou "columnar"), avec sa politique de persistance"""
+    if name == "sql":
+        sink = prediction_writer
+    elif name == "columnar":
+        sink = ColumnarLogSink(
+            ColumnarPredictionLog(
+                settings.PREDICTION_LOG_DIR,
+                segment_max_records=settings.PREDICTION_LOG_SEGMENT_RECORDS,
+                flush_records=settings.PREDICTION_LOG_FLUSH_RECORDS,
+                flush_interval=settings.PREDICTION_LOG_FLUSH_INTERVAL_MS / 1000
+            ),
+            session_factory=SessionLocal,
+            breaker=CircuitBreaker(
+                failure_threshold=settings.DB_BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=settings.DB_BREAKER_RESET_SECONDS
+            )
+        )
+    else:
+        raise ValueError(f"Sink de prédictions inconnu: {name}")
+    if policy is None or policy.mode == "full":
+        return sink
+    return PolicySink(sink, policy)
+
+
+prediction_sink = build_prediction_sink(settings.PREDICTION_SINK, PersistencePolicy(
+    settings.PREDICTION_PERSISTENCE_POLICY,
+    sample_rate=settings.PREDICTION_SAMPLE_RATE,
+    threshold=settings.PREDICTION_PERSIST_THRESHOLD
+))
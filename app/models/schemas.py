@@ -106,6 +106,29 @@ class PredictionHistory(BaseModel):
         from_attributes = True
 
 
+class CurrentRiskResponse(BaseModel):
+    """Schéma pour le risque courant d'un employé"""
+    employee_id: int
+    prediction: int
+    probability: float
+    class_name: str
+    department: Optional[str] = None
+    poste: Optional[str] = None
+    model_version: Optional[str] = None
+    prediction_id: Optional[int] = None
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class TokenResponse(BaseModel):
+    """Schéma pour le token d'accès"""
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+
 class HealthResponse(BaseModel):
     """Schéma pour le health check"""
     status: str
@@ -113,6 +136,8 @@ class HealthResponse(BaseModel):
     model_loaded: bool
     database_connected: bool
     version: str
+    database_latency_ms: Optional[float] = None
+    checked_seconds_ago: Optional[float] = None  # Âge de l'état servi depuis le cache
 
 
 class ErrorResponse(BaseModel):
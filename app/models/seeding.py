@@ -0,0 +1,179 @@
+"""
+Chargement en masse de prédictions synthétiques
+
+Les employés générés par `ml.synthetic` sont insérés dans `predictions` par
+blocs, une transaction par bloc :
+- PostgreSQL : COPY ... FROM STDIN (CSV produit par pandas) ;
+- autres bases (SQLite) : executemany du pilote sur une requête préparée.
+
+Les données d'entrée sont sérialisées en JSON par `DataFrame.to_json`, sans
+passer par l'ORM. Les agrégats journaliers sont incrémentés par bloc (une
+ligne par jour × département × poste) ; `current_risk` se reconstruit ensuite
+avec scripts/rebuild_current_risk.py.
+"""
+import csv
+import io
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.models.aggregates import add_prediction_stats
+from app.models.database import Prediction
+from ml.synthetic import GeneratorProfile, iter_employee_chunks, synthetic_probability
+
+SEED_COLUMNS = (
+    "employee_id", "input_data", "prediction", "probability", "class_name", "created_at", "model_version"
+)
+
+Scorer = Callable[[pd.DataFrame], np.ndarray]
+
+
+@dataclass(frozen=True)
+class SeedProgress:
+    """Avancement du chargement après un bloc"""
+    inserted: int
+    total: int
+    elapsed: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.inserted / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def eta_seconds(self) -> float:
+        rate = self.rows_per_second
+        return (self.total - self.inserted) / rate if rate else 0.0
+
+
+def prediction_frame(
+    employees: pd.DataFrame,
+    probabilities: np.ndarray,
+    created_at: np.ndarray,
+    threshold: float = 0.5,
+    model_version: str = "1.0.0"
+) -> pd.DataFrame:
+    """Lignes de `predictions` (colonnes SEED_COLUMNS) pour un bloc d'employés"""
+    probabilities = np.asarray(probabilities, dtype=float)
+    predictions = (probabilities >= threshold).astype(np.int64)
+    # Format DateTime de SQLAlchemy sous SQLite, accepté tel quel par PostgreSQL
+    timestamps = pd.Series(np.datetime_as_string(created_at.astype("datetime64[us]"), unit="us"))
+    return pd.DataFrame({
+        "employee_id": employees["employee_id"].to_numpy(),
+        "input_data": employees.to_json(orient="records", lines=True, force_ascii=False).splitlines(),
+        "prediction": predictions,
+        "probability": np.round(probabilities, 6),
+        "class_name": np.where(predictions == 1, "Attrition", "Pas d'attrition"),
+        "created_at": timestamps.str.replace("T", " ", regex=False),
+        "model_version": model_version,
+    }, columns=list(SEED_COLUMNS))
+
+
+def _copy_chunk(db: Session, frame: pd.DataFrame) -> None:
+    """COPY FROM STDIN (psycopg2) d'un bloc au format CSV"""
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False, quoting=csv.QUOTE_MINIMAL)
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {Prediction.__tablename__} ({', '.join(SEED_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+
+def _executemany_chunk(db: Session, frame: pd.DataFrame) -> None:
+    """INSERT préparé exécuté une fois par ligne par le pilote (executemany)"""
+    connection = db.connection()
+    placeholder = "?" if connection.dialect.paramstyle == "qmark" else "%s"
+    statement = (
+        f"INSERT INTO {Prediction.__tablename__} ({', '.join(SEED_COLUMNS)}) "
+        f"VALUES ({', '.join([placeholder] * len(SEED_COLUMNS))})"
+    )
+    connection.exec_driver_sql(statement, list(frame.itertuples(index=False, name=None)))
+
+
+def _add_chunk_stats(db: Session, frame: pd.DataFrame, employees: pd.DataFrame) -> None:
+    """Incrémente les agrégats journaliers d'un bloc, regroupé par dimension"""
+    grouped = pd.DataFrame({
+        "day": pd.to_datetime(frame["created_at"]).dt.date,
+        "department": employees["department"].to_numpy(),
+        "poste": employees["poste"].to_numpy(),
+        "model_version": frame["model_version"],
+        "prediction": frame["prediction"],
+        "probability": frame["probability"],
+    }).groupby(["day", "department", "poste", "model_version"], dropna=False).agg(
+        count=("prediction", "size"),
+        positive_count=("prediction", "sum"),
+        probability_sum=("probability", "sum"),
+    ).reset_index()
+    add_prediction_stats(db, grouped.to_dict("records"))
+
+
+def seed_predictions(
+    db: Session,
+    rows: int,
+    chunk_size: int = 50_000,
+    employees: Optional[int] = None,
+    days: int = 90,
+    seed: Optional[int] = None,
+    threshold: float = 0.5,
+    model_version: str = "1.0.0",
+    profile: Optional[GeneratorProfile] = None,
+    scorer: Optional[Scorer] = None,
+    now: Optional[datetime] = None,
+    on_progress: Optional[Callable[[SeedProgress], None]] = None
+) -> Dict[str, int]:
+    """
+    Insère `rows` prédictions synthétiques (un commit par bloc)
+
+    Args:
+        db: Session SQLAlchemy
+        rows: Nombre de prédictions
+        chunk_size: Lignes par bloc (et par transaction)
+        employees: Nombre d'employés distincts (défaut : un par prédiction) ;
+            plusieurs prédictions par employé constituent un historique
+        days: Les dates de création couvrent les `days` derniers jours
+        seed: Graine (chargement reproductible)
+        threshold: Seuil de décision appliqué aux probabilités
+        model_version: Version enregistrée sur chaque ligne
+        profile: Distributions du générateur
+        scorer: Probabilités d'attrition d'un bloc (défaut : synthetic_probability)
+        now: Fin de la période couverte (défaut : maintenant)
+        on_progress: Appelé après chaque bloc
+
+    Returns:
+        Statistiques : inserted, chunks
+    """
+    rng = np.random.default_rng(seed)
+    employees = employees or rows
+    end = np.datetime64(now or datetime.utcnow(), "us")
+    span_us = int(days * 86_400 * 1_000_000)
+    write_chunk = _copy_chunk if db.get_bind().dialect.name == "postgresql" else _executemany_chunk
+
+    inserted = chunks = 0
+    start = time.perf_counter()
+    for chunk in iter_employee_chunks(rows, chunk_size, seed=seed, profile=profile):
+        if employees < rows:
+            chunk["employee_id"] = rng.integers(1, employees + 1, len(chunk))
+        probabilities = scorer(chunk) if scorer is not None else synthetic_probability(chunk, rng)
+        created_at = end - rng.integers(0, max(span_us, 1), len(chunk)).astype("timedelta64[us]")
+        frame = prediction_frame(chunk, probabilities, created_at, threshold, model_version)
+        try:
+            write_chunk(db, frame)
+            _add_chunk_stats(db, frame, chunk)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        inserted += len(frame)
+        chunks += 1
+        if on_progress is not None:
+            on_progress(SeedProgress(inserted, rows, time.perf_counter() - start))
+    return {"inserted": inserted, "chunks": chunks}
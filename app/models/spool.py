@@ -0,0 +1,105 @@
+"""
+Spool local des prédictions : fichier en ajout seul utilisé lorsque la base
+de données est lente ou indisponible
+
+Les enregistrements sont écrits en JSON Lines dans `current.jsonl`. Les fsync
+sont regroupés (tous les `fsync_batch` enregistrements ou toutes les
+`fsync_interval` secondes). Pour le rejeu, le fichier courant est scellé par
+renommage atomique en `segment-<horodatage>.jsonl`, puis chaque segment est
+chargé en base et supprimé.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+
+class PredictionSpool:
+    """Spool en ajout seul avec fsync groupés"""
+
+    CURRENT = "current.jsonl"
+
+    def __init__(self, directory: str, fsync_batch: int = 32, fsync_interval: float = 0.2):
+        self.directory = Path(directory)
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _open(self):
+        if self._file is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.directory / self.CURRENT, "a", encoding="utf-8")
+        return self._file
+
+    def _sync(self) -> None:
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Ajoute un enregistrement au spool"""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            f = self._open()
+            f.write(line)
+            # Transmis au système à chaque écriture (survit à un crash du processus),
+            # fsync groupé pour la durabilité en cas de panne machine
+            f.flush()
+            self._pending += 1
+            if self._pending >= self.fsync_batch \
+                    or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def flush(self) -> None:
+        """Force l'écriture sur disque des enregistrements en attente"""
+        with self._lock:
+            if self._file is not None and self._pending:
+                self._sync()
+
+    def close(self) -> None:
+        """Ferme le fichier courant"""
+        with self._lock:
+            if self._file is not None:
+                if self._pending:
+                    self._sync()
+                self._file.close()
+                self._file = None
+
+    def seal(self) -> None:
+        """Scelle le fichier courant en segment prêt pour le rejeu"""
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+            current = self.directory / self.CURRENT
+            if current.exists() and current.stat().st_size > 0:
+                current.rename(self.directory / f"segment-{time.time_ns()}.jsonl")
+
+    def segments(self) -> List[Path]:
+        """Segments scellés, du plus ancien au plus récent"""
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob("segment-*.jsonl"))
+
+    def has_pending(self) -> bool:
+        """Indique s'il reste des enregistrements à rejouer"""
+        current = self.directory / self.CURRENT
+        return bool(self.segments()) or (current.exists() and current.stat().st_size > 0)
+
+    @staticmethod
+    def read_segment(path: Path) -> Iterator[Dict[str, Any]]:
+        """Lit les enregistrements d'un segment (ignore les lignes tronquées ou illisibles)"""
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
@@ -9,7 +9,8 @@ if __name__ == "__main__":
     uvicorn.run(
         app,
         host="0.0.0.0",
-        port=7860
+        port=7860,
+        log_config=None  # Journaux uvicorn redirigés vers loguru (setup_logging)
     )
 
 
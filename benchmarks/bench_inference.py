@@ -0,0 +1,200 @@
+"""
+Microbenchmarks du chemin d'inférence
+
+Mesure `validate_input`, `prepare_features`, `ModelLoader.predict` et le
+scoring par lots (1, 10, 100, 10 000 lignes), puis compare le minimum des
+échantillons (le moins sensible au bruit de la machine) à la référence
+versionnée (benchmarks/baselines/inference.json). `score_rowwise` est le
+chemin actuel de /predict/batch ; `score_vectorized` est une piste non
+branchée sur l'API, mesurée pour chiffrer le gain d'un scoring vectorisé. Le script
+échoue (code 1) si un benchmark régresse au-delà de la tolérance, si un
+benchmark requis n'a pas pu s'exécuter (modèle qui ne prédit pas) ou s'il
+n'a pas de référence : un cas non mesuré ne passe jamais pour « sans régression ».
+
+Usage :
+    python benchmarks/bench_inference.py
+    python benchmarks/bench_inference.py --tolerance 0.3 --json resultats.json
+    python benchmarks/bench_inference.py --update-baseline
+    python benchmarks/bench_inference.py --allow-incomplete   # poste de développement
+"""
+import argparse
+import json
+import sys
+import warnings
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.models.schemas import PredictRequest
+from benchmarks.harness import compare, load_baseline, measure, print_report, save_baseline
+from ml.model_loader import model_loader
+from ml.preprocessor import AttritionPreprocessor
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "inference.json"
+BATCH_SIZES = (1, 10, 100, 10_000)
+ROWWISE_MAX_SIZE = 100  # Au-delà, la boucle ligne par ligne est trop lente pour être répétée
+# Champs catégoriels du modèle absents du schéma de l'API : `prepare_features`
+# les remplirait avec 0, que le OneHotEncoder du pipeline refuse
+MODEL_ONLY_FIELDS = {
+    "genre": "F",
+    "statut_marital": "Marié(e)",
+    "departement": "Consulting",
+    "domaine_etude": "Autre",
+}
+
+
+def sample_records(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Entrées d'exemple : l'exemple du schéma, valeurs numériques perturbées"""
+    example = PredictRequest.Config.schema_extra["example"]
+    rng = np.random.default_rng(seed)
+    ages = rng.integers(18, 65, count)
+    revenus = rng.normal(example["revenu_mensuel"], 15000, count).clip(1000)
+    anciennetes = rng.integers(0, 30, count)
+    return [
+        {**example, **MODEL_ONLY_FIELDS, "employee_id": i, "age": int(ages[i]), "revenu_mensuel": float(revenus[i]),
+         "annees_dans_l_entreprise": int(anciennetes[i])}
+        for i in range(count)
+    ]
+
+
+def score_vectorized(preprocessor: AttritionPreprocessor, records: List[Dict[str, Any]]) -> np.ndarray:
+    """Scoring vectorisé (hypothétique, non utilisé par l'API) : un DataFrame pour tout le lot"""
+    df = pd.DataFrame.from_records(records)
+    if preprocessor.feature_names:
+        df = df.reindex(columns=preprocessor.feature_names, fill_value=0)
+    return model_loader.model.predict_proba(df)[:, 1]
+
+
+def score_rowwise(preprocessor: AttritionPreprocessor, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Chemin actuel de /predict/batch : préparation et prédiction ligne par ligne"""
+    return [model_loader.predict(preprocessor.prepare_features(record)) for record in records]
+
+
+def model_available(preprocessor: AttritionPreprocessor) -> Tuple[bool, str]:
+    """Le modèle se charge et prédit (les versions de scikit-learn doivent correspondre)"""
+    if not model_loader.is_loaded() and not model_loader.load():
+        return False, "modèle introuvable"
+    try:
+        model_loader.predict(preprocessor.prepare_features(sample_records(1)[0]))
+    except ValueError as e:
+        return False, str(e)
+    return True, ""
+
+
+def required_benchmarks(sizes=BATCH_SIZES) -> List[str]:
+    """Noms des benchmarks attendus pour ces tailles de lot"""
+    names = ["validate_input", "prepare_features", "model_predict"]
+    for size in sizes:
+        names.append(f"score_vectorized[{size}]")
+        if size <= ROWWISE_MAX_SIZE:
+            names.append(f"score_rowwise[{size}]")
+    return names
+
+
+def incomplete(
+    required: List[str],
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]]
+) -> List[str]:
+    """Benchmarks requis non exécutés, et benchmarks exécutés sans référence"""
+    problems = [f"{name} (non exécuté)" for name in required if name not in results]
+    problems += [f"{name} (sans référence)" for name in results if name not in baseline]
+    return problems
+
+
+def build_benchmarks(sizes=BATCH_SIZES) -> Tuple[Dict[str, Callable[[], Any]], List[str]]:
+    """Benchmarks à exécuter, et avertissements sur ceux ignorés"""
+    preprocessor = AttritionPreprocessor()
+    record = sample_records(1)[0]
+    benchmarks: Dict[str, Callable[[], Any]] = {
+        "validate_input": lambda: preprocessor.validate_input(record),
+        "prepare_features": lambda: preprocessor.prepare_features(record),
+    }
+    skipped = []
+
+    available, reason = model_available(preprocessor)
+    if not available:
+        skipped.append(f"benchmarks du modèle ignorés : {reason}")
+        return benchmarks, skipped
+
+    features = preprocessor.prepare_features(record)
+    benchmarks["model_predict"] = lambda: model_loader.predict(features)
+    for size in sizes:
+        records = sample_records(size)
+        benchmarks[f"score_vectorized[{size}]"] = lambda records=records: score_vectorized(preprocessor, records)
+        if size <= ROWWISE_MAX_SIZE:
+            benchmarks[f"score_rowwise[{size}]"] = lambda records=records: score_rowwise(preprocessor, records)
+    return benchmarks, skipped
+
+
+def main(argv=None):
+    """Exécute les benchmarks et compare à la référence"""
+    parser = argparse.ArgumentParser(description="Microbenchmarks du chemin d'inférence")
+    parser.add_argument("--repeat", type=int, default=50, help="Échantillons par benchmark")
+    parser.add_argument("--warmup", type=int, default=3, help="Appels de préchauffage")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Régression tolérée (0.25 = +25 %%)")
+    parser.add_argument("--metric", choices=("min", "median", "p95"), default="min",
+                        help="Statistique comparée à la référence")
+    parser.add_argument("--sizes", default=",".join(map(str, BATCH_SIZES)), help="Tailles de lot")
+    parser.add_argument("--filter", default=None, help="Ne lancer que les benchmarks contenant ce texte")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Fichier de référence")
+    parser.add_argument("--update-baseline", action="store_true", help="Remplace la référence par ce run")
+    parser.add_argument("--json", type=Path, default=None, help="Écrit les résultats en JSON")
+    parser.add_argument("--allow-incomplete", action="store_true",
+                        help="Ne pas échouer sur un benchmark ignoré ou sans référence")
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore")  # Avertissements de version scikit-learn au chargement
+    sizes = tuple(int(size) for size in args.sizes.split(","))
+    benchmarks, skipped = build_benchmarks(sizes)
+    required = [name for name in required_benchmarks(sizes) if not args.filter or args.filter in name]
+    for message in skipped:
+        print(f"⚠️  {message}")
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, fn in benchmarks.items():
+        if args.filter and args.filter not in name:
+            continue
+        print(f"⏱️  {name}...", flush=True)
+        results[name] = measure(fn, repeat=args.repeat, warmup=args.warmup)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.update_baseline:
+        baseline = load_baseline(args.baseline)["results"]
+        baseline = {**baseline, **results}
+        save_baseline(args.baseline, baseline)
+        print(f"\n✅ Référence mise à jour : {args.baseline}")
+        problems = incomplete(required, results, baseline)
+        if problems and not args.allow_incomplete:
+            print(f"❌ Référence incomplète : {', '.join(problems)}")
+            return 1
+        return 0
+
+    baseline = load_baseline(args.baseline)["results"]
+    comparison = compare(results, baseline, args.tolerance, metric=args.metric)
+    print()
+    print_report(results, comparison, metric=args.metric)
+    status = 0
+    regressions = [row["name"] for row in comparison if row["regression"]]
+    if regressions:
+        print(f"\n❌ Régression au-delà de {args.tolerance:.0%} : {', '.join(regressions)}")
+        status = 1
+    problems = incomplete(required, results, baseline)
+    if problems:
+        print(f"\n{'⚠️ ' if args.allow_incomplete else '❌'} Benchmarks non jugés : {', '.join(problems)}")
+        if not args.allow_incomplete:
+            status = 1
+    if status == 0:
+        print("\n✅ Aucune régression")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
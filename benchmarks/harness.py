@@ -0,0 +1,152 @@
+"""
+Outils communs des benchmarks : mesure, résumé, comparaison à une référence
+
+Chaque mesure commence par un préchauffage, puis répète `repeat` échantillons
+de `number` appels (calibré pour qu'un échantillon dure au moins
+`min_sample_seconds`). Les durées rapportées sont par appel.
+"""
+import json
+import math
+import platform
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Percentile `q` (0-100) par rang le plus proche"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Médiane, p95, moyenne et minimum (secondes)"""
+    return {
+        "median": statistics.median(samples),
+        "p95": percentile(samples, 95),
+        "mean": statistics.fmean(samples),
+        "min": min(samples),
+        "runs": len(samples),
+    }
+
+
+def calibrate(fn: Callable[[], Any], min_sample_seconds: float) -> int:
+    """Nombre d'appels par échantillon pour atteindre `min_sample_seconds`"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_sample_seconds or number >= 1_000_000:
+            return number
+        number = max(number * 2, int(number * min_sample_seconds / max(elapsed, 1e-9)))
+
+
+def measure(
+    fn: Callable[[], Any],
+    repeat: int = 20,
+    warmup: int = 3,
+    min_sample_seconds: float = 0.02
+) -> Dict[str, float]:
+    """Chronomètre `fn` : préchauffage puis `repeat` échantillons, durées par appel"""
+    for _ in range(warmup):
+        fn()
+    number = calibrate(fn, min_sample_seconds)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    result = summarize(samples)
+    result["calls_per_run"] = number
+    return result
+
+
+def environment() -> Dict[str, str]:
+    """Machine et versions : une référence n'est comparable que sur le même environnement"""
+    import numpy
+    import pandas
+    import sklearn
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def load_baseline(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {"results": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path: Path, results: Dict[str, Dict[str, float]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+    metric: str = "median"
+) -> List[Dict[str, Any]]:
+    """
+    Compare chaque benchmark à la référence
+
+    Régression si la valeur dépasse la référence de plus de `tolerance`
+    (0.25 = +25 %). Un benchmark absent de la référence n'est pas jugé ici
+    (`baseline` à None) : c'est à l'appelant de le traiter comme un échec.
+    """
+    rows = []
+    for name, result in results.items():
+        reference = baseline.get(name, {}).get(metric)
+        ratio = result[metric] / reference if reference else None
+        rows.append({
+            "name": name,
+            "value": result[metric],
+            "baseline": reference,
+            "ratio": ratio,
+            "regression": ratio is not None and ratio > 1 + tolerance,
+        })
+    return rows
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.3f} s"
+
+
+def print_report(
+    results: Dict[str, Dict[str, float]],
+    comparison: List[Dict[str, Any]],
+    metric: str = "median"
+) -> None:
+    """Tableau minimum / médiane / p95, et référence de la statistique comparée"""
+    by_name = {row["name"]: row for row in comparison}
+    print(f"{'benchmark':<36} {'min':>12} {'médiane':>12} {'p95':>12} {f'réf. {metric}':>12} {'écart':>9}")
+    print("-" * 98)
+    for name, result in results.items():
+        row = by_name[name]
+        delta = f"{(row['ratio'] - 1) * 100:+.1f}%" if row["ratio"] is not None else "-"
+        flag = "  ❌" if row["regression"] else ""
+        print(
+            f"{name:<36} {format_duration(result['min']):>12} {format_duration(result['median']):>12} "
+            f"{format_duration(result['p95']):>12} {format_duration(row['baseline']):>12} {delta:>9}{flag}"
+        )
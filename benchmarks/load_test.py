@@ -0,0 +1,258 @@
+"""
+Test de charge en processus : latence en fonction de la concurrence
+
+Pilote `app.main:app` via un client ASGI asynchrone (httpx), sans serveur ni
+outil externe, sur une base SQLite temporaire. Pour chaque niveau de
+concurrence, `N` clients enchaînent des requêtes tirées selon le mélange
+demandé (single, batch, history, health) pendant `--duration` secondes. Le
+rapport donne débit et latences p50/p95/p99 par niveau (tableau et JSON).
+
+Client et application partagent la boucle d'événements : un appel bloquant
+côté serveur se voit directement sur les latences.
+
+Usage :
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --concurrency 1,8,32 --duration 5 --mix single=80,health=20
+    python benchmarks/load_test.py --stub-model --json charge.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import warnings
+from collections import Counter
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.harness import percentile
+
+DEFAULT_MIX = "single=70,batch=10,history=15,health=5"
+
+Scenario = Callable[[httpx.AsyncClient, "Payloads", random.Random], Awaitable[httpx.Response]]
+
+
+class Payloads:
+    """Corps de requêtes pré-générés (pas de génération pendant la mesure)"""
+
+    def __init__(self, batch_size: int, count: int = 1000):
+        from benchmarks.bench_inference import sample_records
+        self.records = sample_records(count)
+        self.batch_size = batch_size
+
+    def record(self, rng: random.Random) -> Dict[str, Any]:
+        return rng.choice(self.records)
+
+    def batch(self, rng: random.Random) -> List[Dict[str, Any]]:
+        start = rng.randrange(0, max(1, len(self.records) - self.batch_size))
+        return self.records[start:start + self.batch_size]
+
+
+async def _single(client, payloads, rng):
+    return await client.post("/predict/attrition", json=payloads.record(rng))
+
+
+async def _batch(client, payloads, rng):
+    return await client.post("/predict/attrition/batch", json=payloads.batch(rng))
+
+
+async def _history(client, payloads, rng):
+    return await client.get("/predict/history", params={"limit": 100})
+
+
+async def _health(client, payloads, rng):
+    return await client.get("/health")
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "single": _single,
+    "batch": _batch,
+    "history": _history,
+    "health": _health,
+}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """`single=70,health=30` -> poids par scénario"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Scénario inconnu: {name} (disponibles : {', '.join(SCENARIOS)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def _latency_summary(latencies: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    concurrency: int,
+    duration: float,
+    mix: Dict[str, float],
+    payloads: Payloads,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """`concurrency` clients en boucle fermée pendant `duration` secondes"""
+    names, weights = list(mix), list(mix.values())
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    statuses: Counter = Counter()
+    deadline = time.perf_counter() + duration
+
+    async def worker(index: int) -> None:
+        rng = random.Random(seed * 10_007 + index)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                response = await SCENARIOS[name](client, payloads, rng)
+                status = response.status_code
+            except Exception:
+                status = "exception"
+            latencies[name].append(time.perf_counter() - start)
+            statuses[status] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    all_latencies = [latency for values in latencies.values() for latency in values]
+    errors = sum(count for status, count in statuses.items() if status == "exception" or status >= 400)
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "requests": len(all_latencies),
+        "throughput_rps": round(len(all_latencies) / elapsed, 2) if elapsed else 0.0,
+        **_latency_summary(all_latencies),
+        "errors": errors,
+        "status_codes": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        "scenarios": {
+            name: {"requests": len(values), **_latency_summary(values)}
+            for name, values in latencies.items() if values
+        },
+    }
+
+
+def print_table(levels: List[Dict[str, Any]]) -> None:
+    """Courbe latence / concurrence"""
+    print(f"{'concurrence':>11} {'requêtes':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'erreurs':>8}")
+    print("-" * 70)
+    for level in levels:
+        print(
+            f"{level['concurrency']:>11} {level['requests']:>9} {level['throughput_rps']:>9.1f} "
+            f"{level['p50_ms']:>9.2f} {level['p95_ms']:>9.2f} {level['p99_ms']:>9.2f} {level['errors']:>8}"
+        )
+
+
+def _stub_predict(data) -> Dict[str, Any]:
+    return {
+        'prediction': 0,
+        'probability': 0.2,
+        'probability_class_0': 0.8,
+        'probability_class_1': 0.2,
+        'class_name': "Pas d'attrition",
+        'seuil_utilise': 0.5
+    }
+
+
+def configure_environment(db_path: Optional[Path] = None) -> None:
+    """
+    Base SQLite temporaire, sans limitation de débit (à appeler avant d'importer l'application)
+
+    `DATABASE_URL` est toujours remplacée : une variable exportée ne doit pas
+    envoyer le trafic de charge dans une vraie base.
+    """
+    db_path = db_path or Path(tempfile.mkdtemp(prefix="loadtest-")) / "loadtest.db"
+    database_url = f"sqlite:///{db_path}"
+    os.environ["DATABASE_URL"] = database_url
+    database = sys.modules.get("app.models.database")
+    if database is not None and database.engine.url.render_as_string(hide_password=False) != database_url:
+        raise RuntimeError(
+            f"Application déjà importée sur {database.engine.url!r} : "
+            "appeler configure_environment() avant d'importer app"
+        )
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")  # Un seul client : pas de limitation
+    os.environ.setdefault("LOG_LEVEL", "ERROR")  # Requêtes lentes attendues sous charge : pas de journal
+    warnings.filterwarnings("ignore")
+    print(f"🗄️  Base : {os.environ['DATABASE_URL']}")
+
+
+@asynccontextmanager
+async def running_app(stub_model: bool = False):
+    """Application démarrée (événements de démarrage compris) et client ASGI"""
+    from app.main import app
+    from app.models.database import create_tables
+    from ml.model_loader import model_loader
+
+    create_tables()
+    await app.router.startup()
+    if stub_model:
+        model_loader.model = model_loader.model or object()
+        model_loader.predict = _stub_predict
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+            yield client
+    finally:
+        await app.router.shutdown()
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    """Exécute chaque niveau de concurrence sur l'application démarrée"""
+    mix = parse_mix(args.mix)
+    payloads = Payloads(args.batch_size)
+    levels = []
+    async with running_app(args.stub_model) as client:
+        if args.warmup > 0:
+            await run_level(client, 1, args.warmup, mix, payloads, seed=-1)
+        for concurrency in args.concurrency:
+            print(f"⏱️  concurrence {concurrency}...", flush=True)
+            levels.append(await run_level(client, concurrency, args.duration, mix, payloads, seed=concurrency))
+    return levels
+
+
+def main():
+    """Exécute le test de charge"""
+    parser = argparse.ArgumentParser(description="Test de charge en processus (ASGI)")
+    parser.add_argument("--concurrency", default="1,4,16,64", help="Niveaux de concurrence")
+    parser.add_argument("--duration", type=float, default=10.0, help="Durée de chaque niveau (secondes)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Préchauffage (secondes, concurrence 1)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Poids des scénarios (défaut : {DEFAULT_MIX})")
+    parser.add_argument("--batch-size", type=int, default=50, help="Lignes par requête batch")
+    parser.add_argument("--db", type=Path, default=None, help="Fichier SQLite (temporaire par défaut)")
+    parser.add_argument("--stub-model", action="store_true",
+                        help="Remplace la prédiction par une réponse constante (coût de service seul)")
+    parser.add_argument("--json", type=Path, default=None, help="Écrit les résultats en JSON")
+    args = parser.parse_args()
+    args.concurrency = [int(level) for level in args.concurrency.split(",")]
+
+    # La configuration est lue à l'import de l'application : l'environnement d'abord
+    configure_environment(args.db)
+
+    levels = asyncio.run(run(args))
+
+    print()
+    print_table(levels)
+    if args.json:
+        args.json.write_text(json.dumps({"mix": parse_mix(args.mix), "levels": levels}, indent=2), encoding="utf-8")
+        print(f"\n✅ Résultats écrits dans {args.json}")
+
+
+if __name__ == "__main__":
+    main()
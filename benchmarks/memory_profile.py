@@ -0,0 +1,239 @@
+"""
+Profil mémoire par requête (tracemalloc)
+
+Chaque scénario (voir load_test.py) est exécuté en boucle sur l'application
+en processus, sous `tracemalloc` :
+- pic d'allocation par requête (mémoire tracée au pic moins mémoire au départ) ;
+- mémoire et blocs retenus par requête (différence de snapshots après `gc`) ;
+- croissance : pente de la mémoire retenue relevée à intervalles réguliers
+  (octets par requête), au-delà de `--max-growth` le scénario est signalé ;
+- sites d'allocation : les lignes les plus coûteuses au pic d'une requête
+  échantillonnée (DataFrames, copies de dictionnaires...) et celles qui
+  retiennent de la mémoire d'une itération à l'autre.
+
+Usage :
+    python benchmarks/memory_profile.py --stub-model
+    python benchmarks/memory_profile.py --scenarios batch --iterations 300 --json memoire.json
+"""
+import argparse
+import asyncio
+import gc
+import json
+import random
+import statistics
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.load_test import SCENARIOS, Payloads, configure_environment, running_app
+
+TRACE_FRAMES = 1  # Site d'allocation seul : tracemalloc nettement moins coûteux
+# Allocations de l'outillage exclues des rapports
+_IGNORED = (
+    tracemalloc.__file__, __file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>",
+    "<unknown>"
+)
+
+
+def _filtered(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+    return snapshot.filter_traces([tracemalloc.Filter(False, pattern) for pattern in _IGNORED])
+
+
+def _sites(stats: List[tracemalloc.StatisticDiff], top: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_kib": round(stat.size_diff / 1024, 2),
+            "blocks": stat.count_diff,
+        }
+        for stat in stats if stat.size_diff > 0
+    ][:top]
+
+
+def growth_slope(points: List[tuple]) -> float:
+    """Pente (moindres carrés) de la mémoire retenue en fonction du nombre de requêtes"""
+    if len(points) < 2:
+        return 0.0
+    xs, ys = zip(*points)
+    x_mean, y_mean = statistics.fmean(xs), statistics.fmean(ys)
+    denominator = sum((x - x_mean) ** 2 for x in xs)
+    return sum((x - x_mean) * (y - y_mean) for x, y in points) / denominator if denominator else 0.0
+
+
+class PeakSnapshot:
+    """
+    Snapshot tracemalloc au pic d'une requête
+
+    Un hook `sys.setprofile` relève la mémoire tracée au retour de chaque
+    fonction et prend un snapshot à chaque nouveau pic dépassant le précédent
+    de 25 % (et d'au moins `step` octets) : les objets temporaires de la
+    requête y sont encore vivants, pour un nombre de snapshots logarithmique.
+    """
+
+    def __init__(self, step: int = 16 * 1024):
+        self.step = step
+        self.start = 0
+        self.best = 0
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def _hook(self, frame, event, arg) -> None:
+        if event in ("return", "c_return"):
+            current = tracemalloc.get_traced_memory()[0]
+            if current - self.start > (self.best - self.start) * 1.25 + self.step:
+                self.best = current
+                self.snapshot = tracemalloc.take_snapshot()
+
+    def __enter__(self):
+        self.start = self.best = tracemalloc.get_traced_memory()[0]
+        sys.setprofile(self._hook)
+        return self
+
+    def __exit__(self, *exc):
+        sys.setprofile(None)
+        return False
+
+
+async def profile_scenario(
+    client,
+    name: str,
+    payloads: Payloads,
+    iterations: int = 200,
+    warmup: int = 50,
+    checkpoints: int = 10,
+    top: int = 10,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """Exécute `iterations` requêtes du scénario sous tracemalloc"""
+    scenario = SCENARIOS[name]
+    rng = random.Random(seed)
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start(TRACE_FRAMES)
+    try:
+        # Préchauffage : caches, imports paresseux, pools de connexions
+        for _ in range(warmup):
+            await scenario(client, payloads, rng)
+
+        # Sites d'allocation au pic d'une requête échantillonnée
+        gc.collect()
+        before_request = _filtered(tracemalloc.take_snapshot())
+        with PeakSnapshot() as peak:
+            await scenario(client, payloads, rng)
+        peak_sites = (
+            _sites(_filtered(peak.snapshot).compare_to(before_request, "lineno"), top)
+            if peak.snapshot is not None else []
+        )
+
+        gc.collect()
+        baseline = _filtered(tracemalloc.take_snapshot())
+        retained_start = tracemalloc.get_traced_memory()[0]
+        every = max(1, iterations // checkpoints)
+        peaks, statuses, points = [], {}, [(0, retained_start)]
+        for i in range(1, iterations + 1):
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            response = await scenario(client, payloads, rng)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            if i % every == 0:
+                gc.collect()
+                points.append((i, tracemalloc.get_traced_memory()[0]))
+
+        gc.collect()
+        final = _filtered(tracemalloc.take_snapshot())
+        diff = final.compare_to(baseline, "lineno")
+    finally:
+        if started_here:
+            tracemalloc.stop()
+
+    retained = sum(stat.size_diff for stat in diff)
+    blocks = sum(stat.count_diff for stat in diff)
+    return {
+        "scenario": name,
+        "iterations": iterations,
+        "status_codes": statuses,
+        "peak_kib_per_request": {
+            "median": round(statistics.median(peaks) / 1024, 2),
+            "max": round(max(peaks) / 1024, 2),
+        },
+        "retained_bytes_per_request": round(retained / iterations, 1),
+        "retained_blocks_per_request": round(blocks / iterations, 2),
+        "growth_bytes_per_request": round(growth_slope(points), 1),
+        "peak_sites": peak_sites,
+        "retained_sites": _sites(diff, top),
+    }
+
+
+def print_report(results: List[Dict[str, Any]], max_growth: float) -> None:
+    """Tableau par scénario, puis sites d'allocation"""
+    print(f"{'scénario':<10} {'pic KiB/req':>12} {'retenu o/req':>13} {'blocs/req':>10} {'croissance o/req':>17}")
+    print("-" * 66)
+    for result in results:
+        flag = "  ❌" if result["growth_bytes_per_request"] > max_growth else ""
+        print(
+            f"{result['scenario']:<10} {result['peak_kib_per_request']['median']:>12.1f} "
+            f"{result['retained_bytes_per_request']:>13.1f} {result['retained_blocks_per_request']:>10.2f} "
+            f"{result['growth_bytes_per_request']:>17.1f}{flag}"
+        )
+    for result in results:
+        print(f"\n📍 {result['scenario']} : sites au pic d'une requête")
+        for site in result["peak_sites"]:
+            print(f"   {site['size_kib']:>10.1f} KiB {site['blocks']:>7} blocs  {site['site']}")
+        if result["retained_sites"]:
+            print(f"   retenus après {result['iterations']} requêtes :")
+            for site in result["retained_sites"][:5]:
+                print(f"   {site['size_kib']:>10.1f} KiB {site['blocks']:>7} blocs  {site['site']}")
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    payloads = Payloads(args.batch_size)
+    results = []
+    async with running_app(args.stub_model) as client:
+        for name in args.scenarios:
+            print(f"🧠 {name}...", flush=True)
+            results.append(await profile_scenario(
+                client, name, payloads, iterations=args.iterations, warmup=args.warmup, top=args.top
+            ))
+    return results
+
+
+def main():
+    """Profil mémoire de chaque scénario ; code 1 si une croissance dépasse le seuil"""
+    parser = argparse.ArgumentParser(description="Profil mémoire par requête (tracemalloc)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Scénarios à profiler")
+    parser.add_argument("--iterations", type=int, default=200, help="Requêtes mesurées par scénario")
+    parser.add_argument("--warmup", type=int, default=50, help="Requêtes de préchauffage")
+    parser.add_argument("--batch-size", type=int, default=50, help="Lignes par requête batch")
+    parser.add_argument("--top", type=int, default=10, help="Sites d'allocation rapportés")
+    parser.add_argument("--max-growth", type=float, default=1024.0,
+                        help="Croissance tolérée (octets retenus par requête)")
+    parser.add_argument("--db", type=Path, default=None, help="Fichier SQLite (temporaire par défaut)")
+    parser.add_argument("--stub-model", action="store_true",
+                        help="Remplace la prédiction par une réponse constante")
+    parser.add_argument("--json", type=Path, default=None, help="Écrit les résultats en JSON")
+    args = parser.parse_args()
+    args.scenarios = [name.strip() for name in args.scenarios.split(",")]
+
+    configure_environment(args.db)
+    results = asyncio.run(run(args))
+
+    print()
+    print_report(results, args.max_growth)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\n✅ Résultats écrits dans {args.json}")
+
+    leaking = [r["scenario"] for r in results if r["growth_bytes_per_request"] > args.max_growth]
+    if leaking:
+        print(f"\n❌ Croissance au-delà de {args.max_growth:.0f} o/requête : {', '.join(leaking)}")
+        return 1
+    print("\n✅ Pas de croissance mémoire détectée")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 """
 Chargeur de modèle pour l'API
 """
+from loguru import logger
 import joblib
 import pickle
 from pathlib import Path
@@ -31,49 +32,51 @@ class ModelLoader:
             model_path = self.base_dir / "attrition_model_pipeline.pkl"
             if model_path.exists():
                 self.model = joblib.load(model_path)
-                print("✅ Modèle chargé avec succès")
+                logger.info("Modèle chargé depuis {}", model_path)
             else:
-                print(f"⚠️  Modèle non trouvé à {model_path}")
-                print("💡 Le modèle sera créé lors de l'utilisation avec des données d'exemple")
+                logger.warning(
+                    "Modèle non trouvé à {} : il sera créé lors de l'utilisation avec des données d'exemple",
+                    model_path
+                )
                 return False
             
             # Charger le préprocesseur
             preprocessor_path = self.base_dir / "preprocessor.pkl"
             if preprocessor_path.exists():
                 self.preprocessor = joblib.load(preprocessor_path)
-                print("✅ Préprocesseur chargé avec succès")
+                logger.debug("Préprocesseur chargé")
             
             # Charger les noms de features
             features_original_path = self.base_dir / "feature_names_original.pkl"
             if features_original_path.exists():
                 with open(features_original_path, 'rb') as f:
                     self.feature_names_original = pickle.load(f)
-                print("✅ Noms de features originaux chargés")
+                logger.debug("Noms de features originaux chargés")
             
             features_transformed_path = self.base_dir / "feature_names_transformed.pkl"
             if features_transformed_path.exists():
                 with open(features_transformed_path, 'rb') as f:
                     self.feature_names_transformed = pickle.load(f)
-                print("✅ Noms de features transformés chargés")
+                logger.debug("Noms de features transformés chargés")
             
             # Charger le seuil optimal
             seuil_path = self.base_dir / "seuil_info.pkl"
             if seuil_path.exists():
                 with open(seuil_path, 'rb') as f:
                     self.seuil_info = pickle.load(f)
-                print("✅ Informations de seuil chargées")
+                logger.debug("Informations de seuil chargées")
             
             # Charger les métadonnées
             metadata_path = self.base_dir / "model_metadata.pkl"
             if metadata_path.exists():
                 with open(metadata_path, 'rb') as f:
                     self.metadata = pickle.load(f)
-                print("✅ Métadonnées chargées")
+                logger.debug("Métadonnées chargées")
             
             return True
             
         except Exception as e:
-            print(f"❌ Erreur lors du chargement du modèle: {e}")
+            logger.exception("Erreur lors du chargement du modèle: {}", e)
             return False
     
     def predict(self, data: pd.DataFrame) -> Dict[str, Any]:
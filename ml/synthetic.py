@@ -0,0 +1,235 @@
+"""
+Générateur vectorisé d'employés synthétiques
+
+Produit des enregistrements au format `PredictRequest` par blocs numpy, sans
+boucle Python par ligne : quelques secondes suffisent pour un million de lignes.
+- valeurs numériques tirées selon la moyenne et l'écart-type des données
+  d'entraînement (StandardScaler du pipeline), bornées par le schéma ;
+- catégories issues du OneHotEncoder du pipeline ;
+- cohérence entre champs : expérience totale ≤ âge - 18, ancienneté ≤
+  expérience, poste actuel et dernière promotion ≤ ancienneté, revenu croissant
+  avec l'expérience.
+
+Sans modèle chargé, les profils relevés sur le pipeline actuel servent de
+valeurs par défaut.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.models.schemas import PredictRequest
+
+# (moyenne, écart-type) des données d'entraînement
+DEFAULT_NUMERIC: Dict[str, Tuple[float, float]] = {
+    "age": (37.0, 9.17),
+    "revenu_mensuel": (6544.0, 4651.8),
+    "nombre_heures_travailless": (80.0, 1.0),
+    "annee_experience_totale": (11.36, 7.80),
+    "annees_dans_l_entreprise": (7.05, 6.08),
+    "annees_dans_le_poste_actuel": (4.23, 3.57),
+    "annees_depuis_la_derniere_promotion": (2.18, 3.21),
+    "nombre_experiences_precedentes": (2.69, 2.49),
+    "distance_domicile_travail": (9.36, 8.18),
+    "satisfaction_employee_environnement": (2.72, 1.09),
+    "satisfaction_employee_equilibre_pro_perso": (2.76, 0.72),
+    "satisfaction_employee_nature_travail": (2.72, 1.11),
+    "heure_supplementaires": (0.29, 0.45),
+}
+
+# Catégories du OneHotEncoder (clé : nom du champ du schéma)
+DEFAULT_CATEGORIES: Dict[str, Tuple[str, ...]] = {
+    "statut_marital": ("Célibataire", "Divorcé(e)", "Marié(e)"),
+    "department": ("Commercial", "Consulting", "Ressources Humaines"),
+    "poste": (
+        "Assistant de Direction", "Cadre Commercial", "Consultant", "Directeur Technique", "Manager",
+        "Représentant Commercial", "Ressources Humaines", "Senior Manager", "Tech Lead",
+    ),
+    "frequence_deplacement": ("Aucun", "Frequent", "Occasionnel"),
+    "ayant_enfants": ("Oui",),
+}
+
+# Colonnes du pipeline nommées différemment dans le schéma
+_MODEL_COLUMNS = {"departement": "department"}
+
+# Poids relatif du revenu selon le poste
+_POSTE_INCOME = {
+    "Assistant de Direction": 0.6, "Représentant Commercial": 0.55, "Ressources Humaines": 0.8,
+    "Consultant": 0.9, "Cadre Commercial": 1.0, "Tech Lead": 1.3, "Manager": 1.5,
+    "Senior Manager": 2.0, "Directeur Technique": 2.3,
+}
+
+
+def schema_bounds() -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+    """Bornes (ge, le) des champs numériques de `PredictRequest`"""
+    bounds = {}
+    for name, info in PredictRequest.model_fields.items():
+        low = high = None
+        for constraint in info.metadata:
+            low = getattr(constraint, "ge", low)
+            high = getattr(constraint, "le", high)
+        if low is not None or high is not None:
+            bounds[name] = (low, high)
+    return bounds
+
+
+@dataclass
+class GeneratorProfile:
+    """Distributions utilisées par le générateur"""
+    numeric: Dict[str, Tuple[float, float]] = field(default_factory=lambda: dict(DEFAULT_NUMERIC))
+    categories: Dict[str, Tuple[str, ...]] = field(default_factory=lambda: dict(DEFAULT_CATEGORIES))
+
+    @classmethod
+    def from_model(cls, model: Any) -> "GeneratorProfile":
+        """
+        Relève moyennes, écarts-types et catégories sur le pipeline entraîné
+
+        Les champs introuvables dans le pipeline gardent leur valeur par défaut.
+        """
+        profile = cls()
+        steps = getattr(model, "steps", None) or [(None, model)]
+        for _, step in steps:
+            for _, transformer, columns in getattr(step, "transformers_", []):
+                # Le transformateur peut être un Pipeline (imputation puis encodage)
+                estimator = transformer.steps[-1][1] if hasattr(transformer, "steps") else transformer
+                if hasattr(estimator, "mean_") and hasattr(estimator, "scale_"):
+                    for column, mean, scale in zip(columns, estimator.mean_, estimator.scale_):
+                        if column in profile.numeric:
+                            profile.numeric[column] = (float(mean), float(scale))
+                elif hasattr(estimator, "categories_"):
+                    for column, values in zip(columns, estimator.categories_):
+                        column = _MODEL_COLUMNS.get(column, column)
+                        if column in profile.categories:
+                            profile.categories[column] = tuple(str(v) for v in values)
+        return profile
+
+
+def _gamma(rng: np.random.Generator, mean: float, std: float, size: int) -> np.ndarray:
+    """Tirage positif asymétrique (loi gamma) de moyenne et écart-type donnés"""
+    if mean <= 0:
+        return np.zeros(size)
+    std = max(std, 1e-6)
+    return rng.gamma((mean / std) ** 2, std ** 2 / mean, size)
+
+
+def generate_employees(
+    n: int,
+    seed: Optional[int] = None,
+    profile: Optional[GeneratorProfile] = None,
+    first_employee_id: int = 1,
+    rng: Optional[np.random.Generator] = None
+) -> pd.DataFrame:
+    """
+    Génère `n` employés (une ligne par employé, colonnes de `PredictRequest`)
+
+    Args:
+        n: Nombre de lignes
+        seed: Graine (ignorée si `rng` est fourni)
+        profile: Distributions (valeurs par défaut si absent)
+        first_employee_id: Premier identifiant (identifiants consécutifs)
+        rng: Générateur numpy partagé entre plusieurs appels
+    """
+    profile = profile or GeneratorProfile()
+    rng = rng or np.random.default_rng(seed)
+    num = profile.numeric
+    bounds = schema_bounds()
+
+    def bounded(name: str, values: np.ndarray) -> np.ndarray:
+        low, high = bounds.get(name, (None, None))
+        if low is None and high is None:
+            return values
+        return np.clip(values, low, high)
+
+    age = bounded("age", np.rint(rng.normal(*num["age"], n)).clip(18, 65)).astype(np.int64)
+
+    # Expérience ≥ ancienneté ≥ poste actuel, dans la limite de l'âge
+    experience = np.minimum(np.rint(_gamma(rng, *num["annee_experience_totale"], n)), age - 18)
+    tenure = np.minimum(np.rint(_gamma(rng, *num["annees_dans_l_entreprise"], n)), experience)
+    in_role = np.minimum(np.rint(_gamma(rng, *num["annees_dans_le_poste_actuel"], n)), tenure)
+    since_promotion = np.minimum(np.rint(_gamma(rng, *num["annees_depuis_la_derniere_promotion"], n)), tenure)
+    previous_jobs = np.minimum(
+        rng.poisson(num["nombre_experiences_precedentes"][0], n), np.maximum(experience - tenure, 0)
+    ).astype(np.int64)
+
+    poste = rng.choice(np.array(profile.categories["poste"], dtype=object), n)
+    # Poids normalisés : le revenu moyen reste celui des données d'entraînement
+    weights = {name: _POSTE_INCOME.get(name, 1.0) for name in profile.categories["poste"]}
+    income_factor = pd.Series(poste).map(weights).to_numpy() / np.mean(list(weights.values()))
+    experience_mean = num["annee_experience_totale"][0]
+    income = (
+        num["revenu_mensuel"][0] * income_factor
+        * np.exp(0.04 * (experience - experience_mean))
+        * rng.lognormal(0.0, 0.25, n)
+    )
+
+    df = pd.DataFrame({
+        "employee_id": np.arange(first_employee_id, first_employee_id + n, dtype=np.int64),
+        "age": age,
+        "statut_marital": rng.choice(np.array(profile.categories["statut_marital"], dtype=object), n),
+        "revenu_mensuel": bounded("revenu_mensuel", np.round(income.clip(1000), 2)),
+        "nombre_heures_travailless": bounded(
+            "nombre_heures_travailless", np.round(rng.normal(*num["nombre_heures_travailless"], n), 1)
+        ),
+        "annees_dans_l_entreprise": tenure,
+        "annees_dans_le_poste_actuel": in_role,
+        "annee_experience_totale": experience,
+        "poste": poste,
+        "department": rng.choice(np.array(profile.categories["department"], dtype=object), n),
+    })
+    for name in (
+        "satisfaction_employee_environnement",
+        "satisfaction_employee_equilibre_pro_perso",
+        "satisfaction_employee_nature_travail",
+    ):
+        df[name] = bounded(name, np.rint(rng.normal(*num[name], n)).clip(1, 4))
+    df["heure_supplementaires"] = (rng.random(n) < num["heure_supplementaires"][0]).astype(np.int64)
+    df["nombre_experiences_precedentes"] = previous_jobs
+    df["annees_depuis_la_derniere_promotion"] = since_promotion
+    df["distance_domicile_travail"] = bounded(
+        "distance_domicile_travail", np.rint(_gamma(rng, *num["distance_domicile_travail"], n)).clip(1)
+    )
+    df["frequence_deplacement"] = rng.choice(np.array(profile.categories["frequence_deplacement"], dtype=object), n)
+    df["ayant_enfants"] = rng.choice(np.array(profile.categories["ayant_enfants"], dtype=object), n)
+    return df[list(PredictRequest.model_fields)]
+
+
+def iter_employee_chunks(
+    n: int,
+    chunk_size: int = 50_000,
+    seed: Optional[int] = None,
+    profile: Optional[GeneratorProfile] = None
+) -> Iterator[pd.DataFrame]:
+    """Génère `n` employés par blocs de `chunk_size` lignes (mémoire bornée)"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, n, chunk_size):
+        yield generate_employees(
+            min(chunk_size, n - start), profile=profile, first_employee_id=start + 1, rng=rng
+        )
+
+
+def synthetic_probability(df: pd.DataFrame, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Probabilité d'attrition plausible sans modèle (régression logistique à la main)
+
+    Heures supplémentaires, faible satisfaction, faible revenu, faible
+    ancienneté et trajet long augmentent le risque ; un bruit aléatoire évite
+    des probabilités identiques pour des profils proches.
+    """
+    rng = rng or np.random.default_rng()
+    satisfaction = df[[
+        "satisfaction_employee_environnement",
+        "satisfaction_employee_equilibre_pro_perso",
+        "satisfaction_employee_nature_travail",
+    ]].mean(axis=1).to_numpy()
+    logit = (
+        -1.6
+        + 1.2 * df["heure_supplementaires"].to_numpy()
+        - 0.6 * (satisfaction - 2.75)
+        - 0.5 * np.log(df["revenu_mensuel"].to_numpy() / 6500.0)
+        - 0.08 * (df["annees_dans_l_entreprise"].to_numpy() - 7)
+        + 0.03 * (df["distance_domicile_travail"].to_numpy() - 9)
+        - 0.02 * (df["age"].to_numpy() - 37)
+        + rng.normal(0.0, 0.5, len(df))
+    )
+    return 1.0 / (1.0 + np.exp(-logit))
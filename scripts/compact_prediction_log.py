@@ -0,0 +1,39 @@
+"""
+Script de compaction du journal colonnaire des prédictions
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import get_settings
+from app.models.columnar_log import compact_segments
+
+
+def main():
+    """Fusionne les segments scellés du journal et supprime les doublons"""
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dir", default=settings.PREDICTION_LOG_DIR,
+                        help=f"Répertoire du journal (défaut: {settings.PREDICTION_LOG_DIR})")
+    parser.add_argument("--target-records", type=int, default=settings.PREDICTION_LOG_SEGMENT_RECORDS,
+                        help="Nombre d'enregistrements par segment compacté")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Compaction du journal des prédictions")
+    print("=" * 50)
+
+    try:
+        stats = compact_segments(args.dir, target_records=args.target_records)
+        print(f"\n✅ {stats['segments_in']} segments -> {stats['segments_out']}")
+        print(f"   {stats['records']} enregistrements, {stats['duplicates']} doublons supprimés")
+    except Exception as e:
+        print(f"\n❌ Erreur lors de la compaction: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
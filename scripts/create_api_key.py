@@ -0,0 +1,40 @@
+"""
+Script de création d'une clé d'API pour un client machine
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.models.database import SessionLocal, create_tables
+from app.core.api_keys import create_api_key
+
+
+def main():
+    """Crée une clé et l'affiche une seule fois"""
+    parser = argparse.ArgumentParser(description="Création d'une clé d'API")
+    parser.add_argument("name", help="Nom du client")
+    parser.add_argument("--scopes", default="predict", help="Scopes séparés par des virgules")
+    parser.add_argument("--quota", type=int, default=None, help="Requêtes autorisées par minute")
+    args = parser.parse_args()
+
+    create_tables()
+
+    db = SessionLocal()
+    try:
+        row, key = create_api_key(db, args.name, args.scopes.split(","), args.quota)
+        print(f"\n✅ Clé créée pour '{row.name}' (id={row.id}, scopes={row.scopes})")
+        print(f"🔑 {key}")
+        print("⚠️  Conservez cette clé : elle ne pourra pas être affichée à nouveau.")
+    except Exception as e:
+        db.rollback()
+        print(f"\n❌ Erreur lors de la création de la clé: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
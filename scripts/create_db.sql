@@ -10,12 +10,14 @@
 CREATE TABLE IF NOT EXISTS predictions (
     id SERIAL PRIMARY KEY,
     employee_id INTEGER,
+    request_id VARCHAR(36) UNIQUE,
     input_data JSONB NOT NULL,
     prediction INTEGER NOT NULL,
     probability DOUBLE PRECISION NOT NULL,
     class_name VARCHAR(50) NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
-    model_version VARCHAR(20) DEFAULT '1.0.0'
+    model_version VARCHAR(20) DEFAULT '1.0.0',
+    aggregated BOOLEAN
 );
 
 -- Index pour améliorer les performances
@@ -23,6 +25,72 @@ CREATE INDEX IF NOT EXISTS idx_predictions_employee_id ON predictions(employee_i
 CREATE INDEX IF NOT EXISTS idx_predictions_created_at ON predictions(created_at);
 CREATE INDEX IF NOT EXISTS idx_predictions_prediction ON predictions(prediction);
 
+-- Colonne ajoutée pour le rejeu du spool (bases créées avant son introduction)
+ALTER TABLE predictions ADD COLUMN IF NOT EXISTS request_id VARCHAR(36) UNIQUE;
+-- Lignes déjà comptées dans prediction_daily_stats (NULL : à compter par le rollup)
+ALTER TABLE predictions ADD COLUMN IF NOT EXISTS aggregated BOOLEAN;
+
+-- Stockage compact : vecteurs d'entrée dédupliqués par empreinte SHA-256
+CREATE TABLE IF NOT EXISTS prediction_inputs (
+    digest VARCHAR(64) PRIMARY KEY,
+    layout_version INTEGER NOT NULL,
+    vector BYTEA NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+-- Stockage compact : prédictions référençant un vecteur d'entrée
+CREATE TABLE IF NOT EXISTS compact_predictions (
+    id SERIAL PRIMARY KEY,
+    employee_id INTEGER,
+    input_digest VARCHAR(64) NOT NULL REFERENCES prediction_inputs(digest),
+    prediction INTEGER NOT NULL,
+    probability DOUBLE PRECISION NOT NULL,
+    class_name VARCHAR(50) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    model_version VARCHAR(20) DEFAULT '1.0.0',
+    legacy_id INTEGER UNIQUE
+);
+
+CREATE INDEX IF NOT EXISTS idx_compact_predictions_employee_id ON compact_predictions(employee_id);
+CREATE INDEX IF NOT EXISTS idx_compact_predictions_input_digest ON compact_predictions(input_digest);
+CREATE INDEX IF NOT EXISTS idx_compact_predictions_created_at ON compact_predictions(created_at);
+
+-- Agrégats journaliers des prédictions (conservés après la rétention)
+CREATE TABLE IF NOT EXISTS prediction_daily_stats (
+    day DATE NOT NULL,
+    department VARCHAR(100) NOT NULL DEFAULT '',
+    poste VARCHAR(100) NOT NULL DEFAULT '',
+    model_version VARCHAR(20) NOT NULL DEFAULT '1.0.0',
+    count INTEGER NOT NULL DEFAULT 0,
+    positive_count INTEGER NOT NULL DEFAULT 0,
+    probability_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, department, poste, model_version)
+);
+
+-- Dernier risque connu par employé (mis à jour à chaque prédiction)
+CREATE TABLE IF NOT EXISTS current_risk (
+    employee_id INTEGER PRIMARY KEY,
+    prediction_id INTEGER,
+    prediction INTEGER NOT NULL,
+    probability DOUBLE PRECISION NOT NULL,
+    class_name VARCHAR(50) NOT NULL,
+    department VARCHAR(100),
+    poste VARCHAR(100),
+    model_version VARCHAR(20) DEFAULT '1.0.0',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_current_risk_probability ON current_risk(probability);
+CREATE INDEX IF NOT EXISTS ix_current_risk_department_probability ON current_risk(department, probability);
+
+-- Requêtes sans ligne dans predictions déjà appliquées aux agrégats (rejeu sans doublon)
+CREATE TABLE IF NOT EXISTS applied_requests (
+    request_id VARCHAR(36) PRIMARY KEY,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_applied_requests_created_at ON applied_requests(created_at);
+
 -- Table pour les utilisateurs (authentification)
 CREATE TABLE IF NOT EXISTS users (
     id SERIAL PRIMARY KEY,
@@ -37,6 +105,18 @@ CREATE TABLE IF NOT EXISTS users (
 CREATE INDEX IF NOT EXISTS idx_users_username ON users(username);
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 
+-- Table des clés d'API (empreinte HMAC-SHA256 uniquement)
+CREATE TABLE IF NOT EXISTS api_keys (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    key_prefix VARCHAR(12) NOT NULL,
+    key_digest VARCHAR(64) UNIQUE NOT NULL,
+    scopes VARCHAR(255) NOT NULL DEFAULT 'predict',
+    quota_per_minute INTEGER,
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Commentaires pour la documentation
 COMMENT ON TABLE predictions IS 'Stocke toutes les prédictions d''attrition';
 COMMENT ON COLUMN predictions.input_data IS 'Données d''entrée au format JSON';
@@ -0,0 +1,37 @@
+-- Script SQL pour créer la table `predictions` partitionnée par mois (PostgreSQL >= 11)
+--
+-- À exécuter à la place de la section `predictions` de create_db.sql, sur une base neuve :
+--   \i scripts/create_db_partitioned.sql
+--   \i scripts/create_db.sql          -- crée les autres tables (predictions existe déjà)
+--
+-- Les partitions mensuelles sont ensuite créées et supprimées par :
+--   python scripts/manage_partitions.py --ensure-ahead 2 --keep-months 12
+
+-- Table parente : la clé de partitionnement doit faire partie de la clé primaire
+CREATE TABLE IF NOT EXISTS predictions (
+    id BIGSERIAL NOT NULL,
+    employee_id INTEGER,
+    request_id VARCHAR(36),
+    input_data JSONB NOT NULL,
+    prediction INTEGER NOT NULL,
+    probability DOUBLE PRECISION NOT NULL,
+    class_name VARCHAR(50) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    model_version VARCHAR(20) DEFAULT '1.0.0',
+    aggregated BOOLEAN,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Partition par défaut : reçoit les lignes hors des partitions mensuelles existantes
+CREATE TABLE IF NOT EXISTS predictions_default PARTITION OF predictions DEFAULT;
+
+-- Index déclarés sur la table parente (propagés à chaque partition)
+CREATE INDEX IF NOT EXISTS idx_predictions_id ON predictions(id);
+CREATE INDEX IF NOT EXISTS idx_predictions_employee_id ON predictions(employee_id);
+CREATE INDEX IF NOT EXISTS idx_predictions_created_at ON predictions(created_at);
+CREATE INDEX IF NOT EXISTS idx_predictions_prediction ON predictions(prediction);
+-- Unicité impossible sans la clé de partitionnement : index simple, le rejeu du spool
+-- vérifie l'existence des request_id avant insertion
+CREATE INDEX IF NOT EXISTS idx_predictions_request_id ON predictions(request_id);
+
+COMMENT ON TABLE predictions IS 'Prédictions d''attrition, partitionnées par mois sur created_at';
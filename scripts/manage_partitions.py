@@ -0,0 +1,59 @@
+"""
+Script de maintenance des partitions de la table `predictions`
+
+- crée les partitions mensuelles à venir (PostgreSQL)
+- calcule les agrégats journaliers des mois expirés
+- archive (optionnel) puis supprime les partitions expirées
+"""
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.models.database import SessionLocal
+from app.models.partitioning import apply_retention, get_partition_manager
+
+
+def main():
+    """Applique la politique de partitionnement et de rétention"""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ensure-ahead", type=int, default=2,
+                        help="Nombre de partitions futures à créer (défaut: 2)")
+    parser.add_argument("--keep-months", type=int, default=None,
+                        help="Nombre de mois de données brutes à conserver (mois courant inclus)")
+    parser.add_argument("--archive-dir", type=Path, default=None,
+                        help="Répertoire d'archivage des partitions avant suppression")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print("=" * 50)
+        print("Maintenance des partitions de predictions")
+        print("=" * 50)
+
+        months = get_partition_manager(db).ensure_partitions(date.today(), args.ensure_ahead)
+        print(f"\n✅ Partitions prêtes jusqu'à {months[-1]:%Y-%m}")
+
+        if args.keep_months is not None:
+            result = apply_retention(db, args.keep_months, archive_dir=args.archive_dir)
+            for month in result["dropped"]:
+                print(f"🗑️  Partition {month:%Y-%m} agrégée et supprimée")
+            for path in result["archives"]:
+                print(f"📦 Archive: {path}")
+            if not result["dropped"]:
+                print("✅ Aucune partition expirée")
+
+    except Exception as e:
+        db.rollback()
+        print(f"\n❌ Erreur lors de la maintenance: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Script de migration de la table `predictions` vers le stockage compact
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.models.database import SessionLocal, create_tables
+from app.models.compact_storage import migrate_predictions
+
+
+def main():
+    """Migre les prédictions existantes vers `compact_predictions`"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="Nombre de lignes par transaction (défaut: 1000)")
+    parser.add_argument("--delete-source", action="store_true",
+                        help="Supprime les lignes migrées de la table predictions")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Migration vers le stockage compact")
+    print("=" * 50)
+
+    # S'assurer que les nouvelles tables existent
+    create_tables()
+
+    db = SessionLocal()
+    try:
+        stats = migrate_predictions(db, batch_size=args.batch_size, delete_source=args.delete_source)
+        print(f"\n✅ {stats['migrated']} prédictions migrées")
+        print(f"   {stats['unique_inputs']} vecteurs d'entrée distincts créés")
+        print(f"   {stats['skipped']} déjà migrées, {stats['invalid']} non conformes (conservées)")
+    except Exception as e:
+        db.rollback()
+        print(f"\n❌ Erreur lors de la migration: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
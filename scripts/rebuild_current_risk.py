@@ -0,0 +1,36 @@
+"""
+Script de reconstruction de la table `current_risk` depuis l'historique
+"""
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.models.database import SessionLocal, create_tables
+from app.models.current_risk import rebuild_current_risk
+
+
+def main():
+    """Recalcule le risque courant de chaque employé"""
+    print("=" * 50)
+    print("Reconstruction de current_risk")
+    print("=" * 50)
+
+    create_tables()
+
+    db = SessionLocal()
+    try:
+        stats = rebuild_current_risk(db)
+        print(f"\n✅ {stats['predictions']} prédictions lues, "
+              f"{stats['employees']} employés mis à jour")
+    except Exception as e:
+        db.rollback()
+        print(f"\n❌ Erreur lors de la reconstruction: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,93 +1,104 @@
 """
-Script pour insérer des données d'exemple dans la base de données
+Script pour insérer des prédictions synthétiques dans la base de données
+
+Les employés sont générés par `ml.synthetic` (distributions et catégories du
+modèle) et chargés par blocs : COPY sous PostgreSQL, executemany en
+transactions sous SQLite.
+
+Usage :
+    python scripts/seed_data.py
+    python scripts/seed_data.py --rows 2000000 --employees 50000 --days 365
+    python scripts/seed_data.py --rows 100000 --score-with-model
 """
+import argparse
 import sys
+import warnings
 from pathlib import Path
-from datetime import datetime
 
 # Ajouter le répertoire parent au PYTHONPATH
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.models.database import SessionLocal, Prediction
-import json
+from app.models.database import SessionLocal, create_tables
+from app.models.seeding import SeedProgress, seed_predictions
+from ml.model_loader import model_loader
+from ml.preprocessor import AttritionPreprocessor
+from ml.synthetic import GeneratorProfile
+
+
+def model_scorer():
+    """Probabilités du pipeline entraîné, pour un bloc entier"""
+    preprocessor = AttritionPreprocessor()
+
+    def score(employees):
+        features = employees
+        if preprocessor.feature_names:
+            features = employees.reindex(columns=preprocessor.feature_names, fill_value=0)
+        return model_loader.model.predict_proba(features)[:, 1]
+
+    return score
+
+
+def print_progress(progress: SeedProgress) -> None:
+    print(
+        f"   {progress.inserted:>12,} / {progress.total:,} lignes "
+        f"({progress.inserted / progress.total:6.1%})  "
+        f"{progress.rows_per_second:>10,.0f} lignes/s  reste ~{progress.eta_seconds:.0f} s",
+        flush=True
+    )
+
 
 def main():
-    """Insère des données d'exemple"""
+    """Insère des prédictions synthétiques"""
+    parser = argparse.ArgumentParser(description="Insertion de prédictions synthétiques")
+    parser.add_argument("--rows", type=int, default=10_000, help="Nombre de prédictions (défaut: 10000)")
+    parser.add_argument("--chunk-size", type=int, default=50_000,
+                        help="Lignes par bloc et par transaction (défaut: 50000)")
+    parser.add_argument("--employees", type=int, default=None,
+                        help="Employés distincts (défaut: un par prédiction)")
+    parser.add_argument("--days", type=int, default=90, help="Période couverte en jours (défaut: 90)")
+    parser.add_argument("--seed", type=int, default=None, help="Graine pour un chargement reproductible")
+    parser.add_argument("--score-with-model", action="store_true",
+                        help="Probabilités calculées par le modèle (sinon formule synthétique)")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Insertion de prédictions synthétiques")
+    print("=" * 50)
+
+    warnings.filterwarnings("ignore")  # Avertissements de version scikit-learn au chargement
+    profile = GeneratorProfile()
+    threshold, model_version, scorer = 0.5, "1.0.0", None
+    if model_loader.load():
+        profile = GeneratorProfile.from_model(model_loader.model)
+        if model_loader.metadata:
+            model_version = model_loader.metadata.get("model_version", model_version)
+        if args.score_with_model:
+            if model_loader.seuil_info:
+                threshold = model_loader.seuil_info.get("seuil_optimal", threshold)
+            scorer = model_scorer()
+    elif args.score_with_model:
+        print("\n❌ Modèle introuvable : --score-with-model impossible")
+        sys.exit(1)
+
+    create_tables()
+
     db = SessionLocal()
-    
     try:
-        print("=" * 50)
-        print("Insertion de données d'exemple")
-        print("=" * 50)
-        
-        # Exemples de prédictions
-        examples = [
-            {
-                "employee_id": 1,
-                "input_data": {
-                    "age": 32,
-                    "revenu_mensuel": 75000,
-                    "nombre_heures_travailless": 45,
-                    "annees_dans_l_entreprise": 5,
-                    "annees_dans_le_poste_actuel": 2,
-                    "annee_experience_totale": 8,
-                    "poste": "Consultant",
-                    "department": "Consulting",
-                    "satisfaction_employee_environnement": 3.5,
-                    "satisfaction_employee_equilibre_pro_perso": 3.0,
-                    "satisfaction_employee_nature_travail": 4.0,
-                    "heure_supplementaires": 1,
-                    "nombre_experiences_precedentes": 2,
-                    "annees_depuis_la_derniere_promotion": 2.5,
-                    "distance_domicile_travail": 10,
-                    "frequence_deplacement": "Rare",
-                    "ayant_enfants": "Oui"
-                },
-                "prediction": 1,
-                "probability": 0.85,
-                "class_name": "Attrition"
-            },
-            {
-                "employee_id": 2,
-                "input_data": {
-                    "age": 45,
-                    "revenu_mensuel": 95000,
-                    "nombre_heures_travailless": 40,
-                    "annees_dans_l_entreprise": 10,
-                    "annees_dans_le_poste_actuel": 5,
-                    "annee_experience_totale": 15,
-                    "poste": "Manager",
-                    "department": "Sales",
-                    "satisfaction_employee_environnement": 4.5,
-                    "satisfaction_employee_equilibre_pro_perso": 4.0,
-                    "satisfaction_employee_nature_travail": 4.5,
-                    "heure_supplementaires": 0,
-                    "nombre_experiences_precedentes": 1,
-                    "annees_depuis_la_derniere_promotion": 1.0,
-                    "distance_domicile_travail": 5,
-                    "frequence_deplacement": "Non",
-                    "ayant_enfants": "Non"
-                },
-                "prediction": 0,
-                "probability": 0.15,
-                "class_name": "Pas d'attrition"
-            }
-        ]
-        
-        for example in examples:
-            prediction = Prediction(
-                employee_id=example["employee_id"],
-                input_data=example["input_data"],
-                prediction=example["prediction"],
-                probability=example["probability"],
-                class_name=example["class_name"],
-                model_version="1.0.0"
-            )
-            db.add(prediction)
-        
-        db.commit()
-        print(f"\n✅ {len(examples)} exemples insérés avec succès")
-        
+        stats = seed_predictions(
+            db,
+            rows=args.rows,
+            chunk_size=args.chunk_size,
+            employees=args.employees,
+            days=args.days,
+            seed=args.seed,
+            threshold=threshold,
+            model_version=model_version,
+            profile=profile,
+            scorer=scorer,
+            on_progress=print_progress
+        )
+        print(f"\n✅ {stats['inserted']:,} prédictions insérées en {stats['chunks']} blocs")
+        print("   Risque courant : python scripts/rebuild_current_risk.py")
     except Exception as e:
         db.rollback()
         print(f"\n❌ Erreur lors de l'insertion: {e}")
@@ -98,15 +109,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
-
-
-
-
-
-
-
-
-
-
-
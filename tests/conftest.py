@@ -8,7 +8,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
-from app.models.database import Base, get_db
+from app.models.database import Base, get_db, get_read_db
+from app.core.rate_limit import rate_limiter
 from app.core.config import Settings
 
 # Base de données de test : PostgreSQL en CI/CD, SQLite en local
@@ -48,6 +49,8 @@ def client(db):
             pass
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    rate_limiter.storage.clear()
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
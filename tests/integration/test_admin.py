@@ -0,0 +1,83 @@
+"""
+Tests d'intégration pour les routes d'administration
+"""
+import pytest
+from unittest.mock import patch
+
+from app.core import api_keys
+from app.api.routes import admin
+
+
+@pytest.fixture
+def admin_key(db):
+    """Clé d'API de scope admin et profilage activé"""
+    _, key = api_keys.create_api_key(db, "ops", scopes=["admin"])
+    _, predict_key = api_keys.create_api_key(db, "client", scopes=["predict"])
+    api_keys.api_key_store.refresh(lambda: db)
+    with patch.object(admin.settings, "PROFILING_ENABLED", True):
+        yield key, predict_key
+    api_keys.api_key_store.load([])
+
+
+def test_profile_requires_admin_key(client, admin_key):
+    """Test de l'accès réservé aux clés admin"""
+    _, predict_key = admin_key
+
+    assert client.post("/admin/profile").status_code == 401
+    assert client.post("/admin/profile", headers={"X-API-Key": predict_key}).status_code == 403
+
+
+def test_profile_json(client, admin_key):
+    """Test d'une session de profilage courte (format JSON)"""
+    key, _ = admin_key
+    response = client.post(
+        "/admin/profile",
+        params={"seconds": 0.05, "limit": 5},
+        headers={"X-API-Key": key}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["requests_profiled"] == 0
+    assert data["coverage"] == "event_loop_thread"
+    assert len(data["functions"]) <= 5
+
+
+def test_profile_text_and_validation(client, admin_key):
+    """Test du format pstats et des paramètres invalides"""
+    key, _ = admin_key
+    headers = {"X-API-Key": key}
+
+    response = client.post("/admin/profile", params={"seconds": 0.01, "format": "text"}, headers=headers)
+    assert response.status_code == 200
+    assert "function calls" in response.text
+    assert response.text.startswith("Threads profilés : event_loop_thread")
+
+    assert client.post("/admin/profile", params={"sort": "bogus"}, headers=headers).status_code == 400
+    assert client.post("/admin/profile", params={"seconds": 10_000}, headers=headers).status_code == 400
+
+
+def test_profile_disabled(client, admin_key):
+    """Test du 404 lorsque le profilage est désactivé"""
+    key, _ = admin_key
+    with patch.object(admin.settings, "PROFILING_ENABLED", False):
+        assert client.post("/admin/profile", headers={"X-API-Key": key}).status_code == 404
+
+
+def test_query_fingerprints(client, admin_key):
+    """Test de la lecture et de la remise à zéro des empreintes SQL"""
+    key, _ = admin_key
+    headers = {"X-API-Key": key}
+
+    with patch.object(admin.query_stats, "_stats", {}):
+        admin.query_stats.observe("SELECT * FROM predictions WHERE id = 1", 0.002)
+        admin.query_stats.observe("SELECT * FROM predictions WHERE id = 2", 0.004)
+
+        response = client.get("/admin/queries", params={"reset": True}, headers=headers)
+        assert response.status_code == 200
+        [row] = response.json()["fingerprints"]
+        assert row["query"] == "SELECT * FROM predictions WHERE id = ?"
+        assert row["count"] == 2
+
+        assert client.get("/admin/queries", headers=headers).json()["fingerprints"] == []
+        assert client.get("/admin/queries", params={"sort": "bogus"}, headers=headers).status_code == 422
@@ -0,0 +1,88 @@
+"""
+Tests d'intégration pour l'endpoint /token
+"""
+import pytest
+from unittest.mock import patch
+
+from app.api.routes.auth import login_limiter
+from app.core.security import verify_token
+from app.models.database import User
+
+
+def _verify_and_update(plain, hashed):
+    """Simule bcrypt : le hash vaut "hash:<mot de passe>" ; "old:" déclenche un rehash"""
+    if hashed == f"hash:{plain}":
+        return True, None
+    if hashed == f"old:{plain}":
+        return True, f"hash:{plain}"
+    return False, None
+
+
+@pytest.fixture
+def user(db):
+    """Utilisateur de test (bcrypt simulé)"""
+    user = User(username="alice", email="alice@example.com", hashed_password="hash:secret")
+    db.add(user)
+    db.commit()
+    login_limiter._failures.clear()
+    with patch("app.core.security.pwd_context") as pwd_context:
+        pwd_context.verify_and_update.side_effect = _verify_and_update
+        pwd_context.hash.side_effect = lambda password: f"hash:{password}"
+        yield user
+    login_limiter._failures.clear()
+
+
+def test_token_success(client, user):
+    """Test de l'émission d'un token valide"""
+    response = client.post("/token", data={"username": "alice", "password": "secret"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["token_type"] == "bearer"
+    assert verify_token(data["access_token"])["sub"] == "alice"
+
+
+def test_token_wrong_password(client, user):
+    """Test avec un mot de passe incorrect"""
+    response = client.post("/token", data={"username": "alice", "password": "wrong"})
+
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+def test_token_unknown_user(client, user):
+    """Test avec un utilisateur inconnu"""
+    response = client.post("/token", data={"username": "bob", "password": "secret"})
+    assert response.status_code == 401
+
+
+def test_token_inactive_user(client, db, user):
+    """Test avec un utilisateur désactivé"""
+    user.is_active = False
+    db.commit()
+
+    response = client.post("/token", data={"username": "alice", "password": "secret"})
+    assert response.status_code == 401
+
+
+def test_token_rehash_on_login(client, db, user):
+    """Test du recalcul du hash lorsque le facteur de coût a changé"""
+    user.hashed_password = "old:secret"
+    db.commit()
+
+    response = client.post("/token", data={"username": "alice", "password": "secret"})
+
+    assert response.status_code == 200
+    db.refresh(user)
+    assert user.hashed_password == "hash:secret"
+
+
+def test_token_failed_attempts_rate_limited(client, user):
+    """Test du blocage après trop d'échecs"""
+    for _ in range(5):
+        assert client.post("/token", data={"username": "alice", "password": "wrong"}).status_code == 401
+
+    response = client.post("/token", data={"username": "alice", "password": "secret"})
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
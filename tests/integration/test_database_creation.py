@@ -9,10 +9,10 @@ from unittest.mock import patch
 def test_create_tables_function():
     """Test de la fonction create_tables()"""
     # Mock pour éviter de créer réellement les tables
-    with patch('app.models.database.Base.metadata.create_all') as mock_create:
+    with patch('app.models.database.upgrade_schema') as mock_upgrade:
         with patch('builtins.print'):
             create_tables()
-            mock_create.assert_called_once()
+            mock_upgrade.assert_called_once()
 
 
 def test_create_tables_with_engine():
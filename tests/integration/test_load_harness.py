@@ -0,0 +1,68 @@
+"""
+Tests d'intégration pour le test de charge en processus
+"""
+import os
+import httpx
+import pytest
+from unittest.mock import patch
+from sqlalchemy.orm import sessionmaker
+
+from app.core.rate_limit import rate_limiter
+from app.main import app
+from app.models.database import get_db, get_read_db
+from benchmarks.load_test import Payloads, _stub_predict, configure_environment, parse_mix, run_level
+from ml.model_loader import model_loader
+
+
+def test_parse_mix():
+    """Test de l'analyse du mélange de scénarios"""
+    assert parse_mix("single=70,health=30") == {"single": 70.0, "health": 30.0}
+    with pytest.raises(ValueError):
+        parse_mix("unknown=1")
+
+
+def test_configure_environment_overrides_database_url(tmp_path, monkeypatch):
+    """Test que la base de charge remplace un DATABASE_URL exporté"""
+    monkeypatch.setenv("DATABASE_URL", "postgresql://prod/ml_db")
+    db_path = tmp_path / "loadtest.db"
+
+    # L'application est déjà importée par les tests : refus plutôt qu'écrire ailleurs
+    with pytest.raises(RuntimeError):
+        configure_environment(db_path)
+    assert os.environ["DATABASE_URL"] == f"sqlite:///{db_path}"
+
+
+@pytest.mark.asyncio
+async def test_run_level_reports_latencies(db):
+    """Test d'un palier de concurrence court sur l'application en processus"""
+    # Une session par requête : les lignes des lots sont persistées dans un thread
+    session_factory = sessionmaker(bind=db.get_bind())
+
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    transport = httpx.ASGITransport(app=app)
+    try:
+        with patch.object(model_loader, "is_loaded", return_value=True), \
+                patch.object(model_loader, "predict", side_effect=_stub_predict), \
+                patch.object(rate_limiter, "enabled", False):
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+                level = await run_level(
+                    client, concurrency=2, duration=0.3,
+                    mix=parse_mix("single=2,batch=1,history=1,health=1"), payloads=Payloads(batch_size=3, count=10)
+                )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert level["concurrency"] == 2
+    assert level["requests"] > 0
+    assert level["errors"] == 0, level["status_codes"]
+    assert level["throughput_rps"] > 0
+    assert level["p50_ms"] <= level["p95_ms"] <= level["p99_ms"]
+    assert set(level["scenarios"]) <= {"single", "batch", "history", "health"}
@@ -191,3 +191,308 @@ def test_predict_batch_success_case(client, sample_prediction_data):
                     assert "prediction" in item or item.get("prediction") is not None
 
 
+
+
+def test_prediction_stats_updated_on_write(client, sample_prediction_data):
+    """Test que les statistiques sont mises à jour à chaque prédiction"""
+    with patch('ml.model_loader.model_loader.is_loaded', return_value=True):
+        with patch('ml.model_loader.model_loader.predict', return_value={
+            'prediction': 1,
+            'probability': 0.8,
+            'class_name': 'Attrition',
+            'probability_class_0': 0.2,
+            'probability_class_1': 0.8,
+            'seuil_utilise': 0.5
+        }):
+            for _ in range(2):
+                assert client.post("/predict/attrition", json=sample_prediction_data).status_code == 200
+    
+    response = client.get("/predict/stats?group_by=department,model_version")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["department"] == sample_prediction_data["department"]
+    assert data[0]["count"] == 2
+    assert data[0]["positive_count"] == 2
+    assert data[0]["attrition_rate"] == 1.0
+
+
+def test_prediction_stats_invalid_group_by(client):
+    """Test des statistiques avec une dimension invalide"""
+    response = client.get("/predict/stats?group_by=genre")
+    assert response.status_code == 400
+
+
+def test_current_risk_endpoints(client, sample_prediction_data):
+    """Test des endpoints de risque courant"""
+    for employee_id, probability in [(1, 0.4), (2, 0.9), (1, 0.6)]:
+        with patch('ml.model_loader.model_loader.is_loaded', return_value=True):
+            with patch('ml.model_loader.model_loader.predict', return_value={
+                'prediction': int(probability >= 0.5),
+                'probability': probability,
+                'class_name': 'Attrition',
+                'probability_class_0': 1 - probability,
+                'probability_class_1': probability,
+                'seuil_utilise': 0.5
+            }):
+                payload = dict(sample_prediction_data, employee_id=employee_id)
+                assert client.post("/predict/attrition", json=payload).status_code == 200
+    
+    response = client.get("/predict/risk/1")
+    assert response.status_code == 200
+    assert response.json()["probability"] == 0.6
+    assert response.json()["department"] == sample_prediction_data["department"]
+    
+    response = client.get("/predict/risk?employee_ids=1&employee_ids=2&employee_ids=3")
+    assert [r["employee_id"] for r in response.json()] == [1, 2]
+    
+    response = client.get(f"/predict/risk/top?k=1&department={sample_prediction_data['department']}")
+    assert [r["employee_id"] for r in response.json()] == [2]
+    
+    assert client.get("/predict/risk/999").status_code == 404
+
+
+@pytest.fixture
+def api_key_auth(db):
+    """Active l'authentification par clé d'API avec une clé valide"""
+    from app.core import api_keys
+
+    _, key = api_keys.create_api_key(db, "client", scopes=["predict"])
+    _, other_key = api_keys.create_api_key(db, "other", scopes=["stats"])
+    api_keys.api_key_store.refresh(lambda: db)
+    with patch.object(api_keys.settings, "API_KEY_AUTH_ENABLED", True):
+        yield key, other_key
+    api_keys.api_key_store.load([])
+
+
+def test_predict_api_key_required(client, api_key_auth):
+    """Test des réponses de l'API selon la clé fournie"""
+    key, other_key = api_key_auth
+
+    assert client.get("/predict/history").status_code == 401
+    assert client.get("/predict/history", headers={"X-API-Key": "sk_wrong"}).status_code == 401
+    assert client.get("/predict/history", headers={"X-API-Key": other_key}).status_code == 403
+    assert client.get("/predict/history", headers={"X-API-Key": key}).status_code == 200
+
+
+def test_predict_batch_rate_limited(client, sample_prediction_data):
+    """Test du décompte des lignes de lot et de la réponse 429"""
+    from app.core.rate_limit import Budget, rate_limiter
+
+    budgets = dict(rate_limiter.budgets)
+    rate_limiter.budgets["batch_rows"] = Budget(rate=0.001, capacity=3)
+    try:
+        with patch('ml.model_loader.model_loader.is_loaded', return_value=False), \
+                patch('ml.model_loader.model_loader.load', return_value=False):
+            assert client.post("/predict/attrition/batch", json=[sample_prediction_data] * 4).status_code == 413
+            assert client.post("/predict/attrition/batch", json=[sample_prediction_data] * 2).status_code == 200
+            response = client.post("/predict/attrition/batch", json=[sample_prediction_data] * 2)
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+    finally:
+        rate_limiter.budgets.update(budgets)
+
+
+def test_history_admission_rejected(client):
+    """Test du 503 lorsque la voie analytics est saturée"""
+    from app.core.admission import admission_controller
+
+    lane = admission_controller.lanes["analytics"]
+    saved = lane.max_concurrency, lane.max_queue
+    lane.max_concurrency, lane.max_queue = 0, 0
+    try:
+        response = client.get("/predict/history")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+    finally:
+        lane.max_concurrency, lane.max_queue = saved
+        lane.rejected = 0
+
+
+def test_admission_rejection_refunds_rate_limit(client, sample_prediction_data):
+    """Test qu'une requête délestée (503) ne consomme pas le budget de débit"""
+    from app.core.admission import admission_controller
+    from app.core.rate_limit import Budget, rate_limiter
+
+    budgets = dict(rate_limiter.budgets)
+    rate_limiter.budgets["predict"] = Budget(rate=0.001, capacity=1)
+    rate_limiter.budgets["batch_rows"] = Budget(rate=0.001, capacity=2)
+    lanes = [admission_controller.lanes[name] for name in ("interactive", "bulk")]
+    saved = [(lane.max_concurrency, lane.max_queue) for lane in lanes]
+    try:
+        for lane in lanes:
+            lane.max_concurrency, lane.max_queue = 0, 0
+        for _ in range(3):
+            assert client.post("/predict/attrition", json=sample_prediction_data).status_code == 503
+            assert client.post("/predict/attrition/batch", json=[sample_prediction_data] * 2).status_code == 503
+        for lane, (concurrency, queue) in zip(lanes, saved):
+            lane.max_concurrency, lane.max_queue = concurrency, queue
+
+        with patch('ml.model_loader.model_loader.is_loaded', return_value=False), \
+                patch('ml.model_loader.model_loader.load', return_value=False):
+            assert client.post("/predict/attrition/batch", json=[sample_prediction_data] * 2).status_code == 200
+        assert client.post("/predict/attrition", json=sample_prediction_data).status_code != 429
+    finally:
+        for lane, (concurrency, queue) in zip(lanes, saved):
+            lane.max_concurrency, lane.max_queue = concurrency, queue
+            lane.rejected = 0
+        rate_limiter.budgets.update(budgets)
+
+
+def test_metrics_endpoint(client, sample_prediction_data):
+    """Test de l'exposition des métriques après une prédiction"""
+    mock_result = {
+        'prediction': 1, 'probability': 0.8, 'probability_class_0': 0.2,
+        'probability_class_1': 0.8, 'class_name': 'Attrition', 'seuil_utilise': 0.5
+    }
+    with patch('ml.model_loader.model_loader.is_loaded', return_value=True), \
+            patch('ml.model_loader.model_loader.predict', return_value=mock_result):
+        assert client.post("/predict/attrition", json=sample_prediction_data).status_code == 200
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'predict_stage_duration_seconds_count{stage="model_predict"}' in text
+    assert 'http_requests_total{method="POST",route="/predict/attrition",status="200"}' in text
+    assert 'admission_queue_depth{lane="interactive"} 0' in text
+
+
+def test_predict_server_timing(client, sample_prediction_data):
+    """Test de l'en-tête Server-Timing sur une prédiction"""
+    mock_result = {
+        'prediction': 0, 'probability': 0.2, 'probability_class_0': 0.8,
+        'probability_class_1': 0.2, 'class_name': "Pas d'attrition", 'seuil_utilise': 0.5
+    }
+    with patch('ml.model_loader.model_loader.is_loaded', return_value=True), \
+            patch('ml.model_loader.model_loader.predict', return_value=mock_result):
+        response = client.post("/predict/attrition", json=sample_prediction_data)
+
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    for stage in ("validation", "prepare_features", "model_predict", "persist", "serialize", "total"):
+        assert f"{stage};dur=" in timing
+
+
+@pytest.mark.asyncio
+async def test_batch_does_not_starve_interactive(db, sample_prediction_data):
+    """Test de la latence interactive pendant le scoring d'un lot"""
+    import asyncio
+    import time
+
+    import httpx
+    from sqlalchemy.orm import sessionmaker
+
+    from app.core.rate_limit import rate_limiter
+    from app.main import app
+    from app.models.database import get_db
+
+    def busy_predict(features):
+        # Coût CPU du modèle (garde le GIL, contrairement à time.sleep)
+        end = time.perf_counter() + 0.002
+        while time.perf_counter() < end:
+            pass
+        return {
+            'prediction': 0, 'probability': 0.2, 'probability_class_0': 0.8,
+            'probability_class_1': 0.2, 'class_name': "Pas d'attrition", 'seuil_utilise': 0.5
+        }
+
+    session_factory = sessionmaker(bind=db.get_bind())
+
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    transport = httpx.ASGITransport(app=app)
+    try:
+        with patch('ml.model_loader.model_loader.is_loaded', return_value=True), \
+                patch('ml.model_loader.model_loader.predict', side_effect=busy_predict), \
+                patch.object(rate_limiter, "enabled", False):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                start = time.perf_counter()
+
+                async def timed(coro):
+                    response = await coro
+                    return response, time.perf_counter() - start
+
+                batch = asyncio.create_task(timed(
+                    client.post("/predict/attrition/batch", json=[sample_prediction_data] * 300)
+                ))
+                await asyncio.sleep(0.05)
+                sent = time.perf_counter() - start
+                single, single_done = await timed(client.post("/predict/attrition", json=sample_prediction_data))
+                batch_response, batch_done = await batch
+    finally:
+        app.dependency_overrides.clear()
+
+    assert single.status_code == 200
+    assert batch_response.status_code == 200
+    assert len(batch_response.json()) == 300
+    # La requête interactive se termine bien avant le lot, en temps borné
+    assert single_done - sent < 0.3
+    assert single_done < batch_done
+
+
+@pytest.mark.asyncio
+async def test_concurrent_predictions_group_committed(tmp_path, sample_prediction_data):
+    """Test du regroupement en un même commit des écritures de requêtes concurrentes"""
+    import asyncio
+
+    import httpx
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.api.routes import predict as predict_routes
+    from app.core.circuit_breaker import CircuitBreaker
+    from app.core.rate_limit import rate_limiter
+    from app.main import app
+    from app.models.database import Base, SQLiteWriteQueue, configure_sqlite_engine, get_db
+    from app.models.persistence import PredictionWriter
+    from app.models.spool import PredictionSpool
+
+    url = f"sqlite:///{tmp_path / 'group.db'}"
+    engine = configure_sqlite_engine(create_engine(url, connect_args={"check_same_thread": False}))
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    write_queue = SQLiteWriteQueue(url, linger=0.005)
+    writer = PredictionWriter(
+        CircuitBreaker(failure_threshold=5, reset_timeout=30),
+        PredictionSpool(str(tmp_path / "spool")),
+        write_queue=write_queue,
+    )
+
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    transport = httpx.ASGITransport(app=app)
+    try:
+        with patch('ml.model_loader.model_loader.is_loaded', return_value=True), \
+                patch('ml.model_loader.model_loader.predict', return_value={
+                    'prediction': 1, 'probability': 0.8, 'probability_class_0': 0.2,
+                    'probability_class_1': 0.8, 'class_name': 'Attrition', 'seuil_utilise': 0.5
+                }), \
+                patch.object(predict_routes, "prediction_sink", writer), \
+                patch.object(rate_limiter, "enabled", False):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                responses = await asyncio.gather(*(
+                    client.post("/predict/attrition", json=sample_prediction_data) for _ in range(50)
+                ))
+    finally:
+        app.dependency_overrides.clear()
+        writer.close()
+        engine.dispose()
+
+    assert all(response.status_code == 200 for response in responses)
+    assert len({response.json()["prediction_id"] for response in responses}) == 50
+    assert write_queue.writes == 50
+    assert write_queue.batches < write_queue.writes
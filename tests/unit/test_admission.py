@@ -0,0 +1,104 @@
+"""
+Tests unitaires pour le contrôle d'admission
+"""
+import asyncio
+import pytest
+
+from app.core.admission import AdmissionController, AdmissionRejected, Lane
+
+
+def _controller(total_slots=1, max_queue=2, max_wait=1.0):
+    return AdmissionController(
+        [
+            Lane("interactive", 0, max_concurrency=1, max_queue=max_queue, max_wait=max_wait),
+            Lane("bulk", 2, max_concurrency=1, max_queue=max_queue, max_wait=max_wait),
+        ],
+        total_slots=total_slots,
+    )
+
+
+@pytest.mark.asyncio
+async def test_admission_immediate_and_release():
+    """Test de l'admission directe et de la libération"""
+    controller = _controller()
+    await controller.acquire("interactive")
+
+    assert controller.stats()["interactive"]["active"] == 1
+    controller.release("interactive")
+    assert controller.active == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_full_rejected():
+    """Test du refus immédiat lorsque la file est pleine"""
+    controller = _controller(max_queue=1)
+    await controller.acquire("bulk")
+    waiting = asyncio.ensure_future(controller.acquire("bulk"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected):
+        await controller.acquire("bulk")
+    assert controller.stats()["bulk"]["rejected"] == 1
+    assert controller.stats()["bulk"]["queued"] == 1
+
+    controller.release("bulk")
+    await waiting
+    controller.release("bulk")
+
+
+@pytest.mark.asyncio
+async def test_wait_timeout():
+    """Test du refus après le délai d'attente maximal"""
+    controller = _controller(max_wait=0.01)
+    await controller.acquire("interactive")
+
+    with pytest.raises(AdmissionRejected):
+        await controller.acquire("interactive")
+
+    stats = controller.stats()["interactive"]
+    assert stats["timed_out"] == 1
+    assert stats["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_interactive_has_priority():
+    """Test qu'un emplacement libéré va d'abord à la voie interactive"""
+    controller = _controller(total_slots=1)
+    await controller.acquire("bulk")
+    order = []
+
+    async def run(lane):
+        await controller.acquire(lane)
+        order.append(lane)
+
+    bulk = asyncio.ensure_future(run("bulk"))
+    await asyncio.sleep(0)
+    interactive = asyncio.ensure_future(run("interactive"))
+    await asyncio.sleep(0)
+
+    controller.release("bulk")
+    await interactive
+    assert order == ["interactive"]
+
+    controller.release("interactive")
+    await bulk
+    assert order == ["interactive", "bulk"]
+    controller.release("bulk")
+    assert controller.active == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_removed():
+    """Test qu'une requête abandonnée quitte la file"""
+    controller = _controller()
+    await controller.acquire("interactive")
+    waiting = asyncio.ensure_future(controller.acquire("interactive"))
+    await asyncio.sleep(0)
+
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    controller.release("interactive")
+    assert controller.active == 0
+    assert controller.stats()["interactive"]["queued"] == 0
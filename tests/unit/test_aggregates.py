@@ -0,0 +1,61 @@
+"""
+Tests unitaires pour les agrégats incrémentaux des prédictions
+"""
+import pytest
+from datetime import date, datetime
+
+from app.models.database import PredictionDailyStats
+from app.models.aggregates import record_prediction_stats, query_stats
+
+
+def test_record_prediction_stats_increments(db):
+    """Test de l'incrément d'une même ligne d'agrégats"""
+    created_at = datetime(2026, 10, 1, 12)
+    record_prediction_stats(db, 1, 0.8, "Sales", "Manager", "1.0.0", created_at)
+    record_prediction_stats(db, 0, 0.3, "Sales", "Manager", "1.0.0", created_at)
+    db.commit()
+
+    row = db.query(PredictionDailyStats).one()
+    assert row.day == date(2026, 10, 1)
+    assert row.count == 2
+    assert row.positive_count == 1
+    assert abs(row.probability_sum - 1.1) < 1e-9
+
+
+def test_record_prediction_stats_missing_dimensions(db):
+    """Test avec département et poste absents"""
+    record_prediction_stats(db, 1, 0.9)
+    db.commit()
+
+    row = db.query(PredictionDailyStats).one()
+    assert row.department == ""
+    assert row.poste == ""
+    assert query_stats(db)[0]["department"] is None
+
+
+def test_query_stats_grouping_and_filters(db):
+    """Test des regroupements et filtres"""
+    record_prediction_stats(db, 1, 0.8, "Sales", "Manager", "1.0.0", datetime(2026, 10, 1))
+    record_prediction_stats(db, 0, 0.2, "Sales", "Consultant", "1.0.0", datetime(2026, 10, 2))
+    record_prediction_stats(db, 1, 0.9, "IT", "Consultant", "1.0.1", datetime(2026, 10, 2))
+    db.commit()
+
+    by_department = query_stats(db, group_by=["department"])
+    assert [item["department"] for item in by_department] == ["IT", "Sales"]
+    sales = by_department[1]
+    assert sales["count"] == 2
+    assert sales["attrition_rate"] == 0.5
+    assert abs(sales["mean_probability"] - 0.5) < 1e-9
+
+    filtered = query_stats(db, group_by=["day"], start_date=date(2026, 10, 2), model_version="1.0.0")
+    assert filtered == [{"day": "2026-10-02", "count": 1, "positive_count": 0,
+                         "attrition_rate": 0.0, "mean_probability": 0.2}]
+
+    overall = query_stats(db, group_by=[])
+    assert overall[0]["count"] == 3
+
+
+def test_query_stats_unknown_dimension(db):
+    """Test avec une dimension inconnue"""
+    with pytest.raises(ValueError):
+        query_stats(db, group_by=["genre"])
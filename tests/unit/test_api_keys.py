@@ -0,0 +1,50 @@
+"""
+Tests unitaires pour l'authentification par clé d'API
+"""
+from unittest.mock import patch
+
+from app.core.api_keys import ApiKeyStore, api_key_digest, create_api_key, generate_api_key
+from app.models.database import ApiKey
+
+
+def test_digest_is_hmac_not_plain():
+    """Test que l'empreinte ne contient pas la clé"""
+    key = generate_api_key()
+    digest = api_key_digest(key)
+
+    assert key.startswith("sk_")
+    assert len(digest) == 64
+    assert key not in digest
+    assert api_key_digest(key) == digest
+
+
+def test_create_and_refresh(db):
+    """Test de la création d'une clé et du rechargement de l'index"""
+    row, key = create_api_key(db, "batch-client", scopes=["predict", "stats"], quota_per_minute=10)
+    create_api_key(db, "disabled")
+    db.query(ApiKey).filter(ApiKey.name == "disabled").update({"is_active": False})
+    db.commit()
+
+    store = ApiKeyStore()
+    assert store.refresh(lambda: db) == 1
+
+    info = store.lookup(key)
+    assert info.id == row.id
+    assert info.scopes == frozenset({"predict", "stats"})
+    assert store.lookup("sk_unknown") is None
+    assert db.query(ApiKey).filter(ApiKey.key_digest == api_key_digest(key)).one().key_prefix == key[:12]
+
+
+def test_quota_per_minute(db):
+    """Test du quota par minute"""
+    _, key = create_api_key(db, "limited", quota_per_minute=2)
+    store = ApiKeyStore()
+    store.refresh(lambda: db)
+    info = store.lookup(key)
+
+    with patch("app.core.api_keys.time.time", return_value=120.0):
+        assert store.consume(info) == 0
+        assert store.consume(info) == 0
+        assert store.consume(info) == 60
+    with patch("app.core.api_keys.time.time", return_value=180.0):
+        assert store.consume(info) == 0
@@ -0,0 +1,80 @@
+"""
+Tests unitaires pour les outils de benchmark
+"""
+from unittest.mock import patch
+
+from benchmarks import bench_inference
+from benchmarks.harness import compare, load_baseline, measure, percentile, save_baseline, summarize
+
+
+def test_percentile_and_summary():
+    """Test du percentile (rang le plus proche) et du résumé"""
+    samples = [float(i) for i in range(1, 101)]
+
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 95) == 95.0
+    assert percentile([3.0], 95) == 3.0
+
+    summary = summarize(samples)
+    assert summary["median"] == 50.5
+    assert summary["p95"] == 95.0
+    assert summary["min"] == 1.0
+    assert summary["runs"] == 100
+
+
+def test_measure_reports_per_call_duration():
+    """Test de la calibration : durées par appel, plusieurs appels par échantillon"""
+    calls = []
+    result = measure(lambda: calls.append(1), repeat=5, warmup=2, min_sample_seconds=0.001)
+
+    assert result["runs"] == 5
+    assert result["calls_per_run"] > 1
+    assert 0 < result["median"] < 0.001
+    assert len(calls) >= 2 + 5 * result["calls_per_run"]
+
+
+def test_compare_flags_regressions(tmp_path):
+    """Test de la comparaison à une référence enregistrée"""
+    path = tmp_path / "baseline.json"
+    save_baseline(path, {"fast": {"median": 1.0}, "slow": {"median": 1.0}})
+    baseline = load_baseline(path)
+
+    assert "python" in baseline["environment"]
+    rows = {
+        row["name"]: row
+        for row in compare(
+            {"fast": {"median": 1.1}, "slow": {"median": 1.5}, "new": {"median": 2.0}},
+            baseline["results"],
+            tolerance=0.25
+        )
+    }
+    assert rows["fast"]["regression"] is False
+    assert rows["slow"]["regression"] is True
+    assert rows["new"]["baseline"] is None and rows["new"]["regression"] is False
+    assert load_baseline(tmp_path / "absent.json") == {"results": {}}
+
+
+def test_required_benchmarks_and_incomplete():
+    """Test de la détection des benchmarks requis ignorés ou sans référence"""
+    required = bench_inference.required_benchmarks((10, 1000))
+    assert required == [
+        "validate_input", "prepare_features", "model_predict",
+        "score_vectorized[10]", "score_rowwise[10]", "score_vectorized[1000]",
+    ]
+
+    results = {"validate_input": {"median": 1.0}, "prepare_features": {"median": 1.0}}
+    problems = bench_inference.incomplete(required, results, {"validate_input": {"median": 1.0}})
+    assert "model_predict (non exécuté)" in problems
+    assert "prepare_features (sans référence)" in problems
+    assert bench_inference.incomplete(["validate_input"], results, results) == []
+
+
+def test_bench_inference_fails_when_model_skipped(tmp_path):
+    """Test du code de sortie quand les benchmarks du modèle sont ignorés"""
+    baseline = tmp_path / "inference.json"
+    save_baseline(baseline, {"validate_input": {"median": 1.0}, "prepare_features": {"median": 1.0}})
+    argv = ["--repeat", "1", "--warmup", "0", "--sizes", "1", "--baseline", str(baseline)]
+
+    with patch.object(bench_inference, "model_available", return_value=(False, "indisponible")):
+        assert bench_inference.main(argv) == 1
+        assert bench_inference.main(argv + ["--allow-incomplete"]) == 0
@@ -0,0 +1,65 @@
+"""
+Tests unitaires pour le disjoncteur
+"""
+from unittest.mock import patch
+
+from app.core.circuit_breaker import CircuitBreaker
+
+
+def test_breaker_opens_after_threshold():
+    """Test de l'ouverture après N échecs consécutifs"""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    assert breaker.allow_request() is True
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow_request() is False
+
+
+def test_breaker_success_resets_failures():
+    """Test qu'un succès remet le compteur à zéro"""
+    breaker = CircuitBreaker(failure_threshold=2)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_half_open_single_trial():
+    """Test de l'état semi-ouvert après le délai"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    with patch("app.core.circuit_breaker.time.monotonic", return_value=100.0):
+        breaker.record_failure()
+    with patch("app.core.circuit_breaker.time.monotonic", return_value=111.0):
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_half_open_failure_reopens():
+    """Test qu'un échec en semi-ouvert rouvre le disjoncteur"""
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+    with patch("app.core.circuit_breaker.time.monotonic", return_value=100.0):
+        for _ in range(3):
+            breaker.record_failure()
+    with patch("app.core.circuit_breaker.time.monotonic", return_value=111.0):
+        assert breaker.allow_request() is True
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_breaker_slow_call_counts_as_failure():
+    """Test qu'un appel trop lent compte comme un échec"""
+    breaker = CircuitBreaker(failure_threshold=1, slow_call_threshold=0.5)
+
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_success(0.8)
+    assert breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,185 @@
+"""
+Tests unitaires pour le journal colonnaire des prédictions
+"""
+import asyncio
+import time
+import pytest
+from dataclasses import replace
+from datetime import datetime
+from unittest.mock import patch
+
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+
+from app.core.circuit_breaker import CircuitBreaker
+
+from app.models.columnar_log import (
+    ColumnarPredictionLog,
+    HEADER_SIZE,
+    RECORD_DTYPE,
+    list_segments,
+    read_segment,
+    read_log,
+    to_dicts,
+    compact_segments,
+)
+from app.models.database import CurrentRisk, PredictionDailyStats
+from app.models.persistence import (
+    PredictionRecord,
+    PredictionWriter,
+    ColumnarLogSink,
+    build_prediction_sink,
+    run_sink_flush_loop,
+)
+
+
+def _record(i, sample):
+    return PredictionRecord(
+        employee_id=i,
+        input_data={k: v for k, v in sample.items() if k != "employee_id"},
+        prediction=i % 2,
+        probability=0.1 * (i % 10),
+        class_name="Attrition" if i % 2 else "Pas d'attrition",
+        created_at=datetime(2026, 10, 19, 12, 0, i),
+    )
+
+
+def test_append_and_read_roundtrip(tmp_path, sample_prediction_data):
+    """Test de l'écriture puis de la relecture du journal"""
+    log = ColumnarPredictionLog(str(tmp_path), flush_records=4)
+    records = [_record(i, sample_prediction_data) for i in range(3)]
+    for record in records:
+        log.append(record)
+    log.close()
+
+    rows = to_dicts(read_log(str(tmp_path)))
+
+    assert len(rows) == 3
+    for row, record in zip(rows, records):
+        assert row["request_id"] == record.request_id
+        assert row["employee_id"] == record.employee_id
+        assert row["created_at"] == record.created_at
+        assert row["input_data"] == record.input_data
+        assert row["class_name"] == record.class_name
+
+
+def test_segment_rotation(tmp_path, sample_prediction_data):
+    """Test de la rotation des segments"""
+    log = ColumnarPredictionLog(str(tmp_path), segment_max_records=2, flush_records=8)
+    for i in range(5):
+        log.append(_record(i, sample_prediction_data))
+
+    # Deux segments scellés, le cinquième enregistrement est encore en tampon
+    assert len(list_segments(str(tmp_path), include_active=False)) == 2
+    log.close()
+    assert len(list_segments(str(tmp_path))) == 3
+    assert len(read_log(str(tmp_path))) == 5
+
+
+def test_read_segment_ignores_partial_record(tmp_path, sample_prediction_data):
+    """Test qu'un enregistrement incomplet en fin de segment est ignoré"""
+    log = ColumnarPredictionLog(str(tmp_path), flush_records=1)
+    log.append(_record(1, sample_prediction_data))
+    log.close()
+    path = list_segments(str(tmp_path))[0]
+    with open(path, "ab") as f:
+        f.write(b"\x00" * (RECORD_DTYPE.itemsize // 2))
+
+    assert path.stat().st_size > HEADER_SIZE + RECORD_DTYPE.itemsize
+    assert len(read_segment(path)) == 1
+
+
+def test_compact_segments_deduplicates(tmp_path, sample_prediction_data):
+    """Test de la compaction avec suppression des doublons"""
+    records = [_record(i, sample_prediction_data) for i in range(4)]
+    for batch in (records[:2], records[1:]):
+        log = ColumnarPredictionLog(str(tmp_path), flush_records=1)
+        for record in batch:
+            log.append(record)
+        log.close()
+
+    stats = compact_segments(str(tmp_path), target_records=10)
+
+    assert stats == {"segments_in": 2, "segments_out": 1, "records": 4, "duplicates": 1}
+    rows = to_dicts(read_log(str(tmp_path)))
+    assert [row["request_id"] for row in rows] == [r.request_id for r in records]
+
+
+def test_idle_log_flushed_with_fsync(tmp_path, sample_prediction_data):
+    """Test de l'écriture d'un journal inactif une fois l'intervalle écoulé, avec fsync"""
+    log = ColumnarPredictionLog(str(tmp_path), flush_records=100, flush_interval=0.01)
+    log.append(_record(1, sample_prediction_data))
+    log.flush_if_due()
+    assert len(read_log(str(tmp_path))) == 0
+
+    time.sleep(0.02)
+    with patch("app.models.columnar_log.os.fsync") as fsync:
+        log.flush_if_due()
+    assert fsync.call_count == 1
+    assert len(read_log(str(tmp_path))) == 1
+    log.close()
+
+
+@pytest.mark.asyncio
+async def test_sink_flush_loop(tmp_path, sample_prediction_data):
+    """Test de la tâche de fond qui écrit le tampon d'un sink inactif"""
+    sink = ColumnarLogSink(ColumnarPredictionLog(str(tmp_path), flush_records=100, flush_interval=0.01))
+    sink.log.append(_record(1, sample_prediction_data))
+    task = asyncio.create_task(run_sink_flush_loop(sink, 0.01))
+    try:
+        await asyncio.sleep(0.1)
+    finally:
+        task.cancel()
+    assert len(read_log(str(tmp_path))) == 1
+    sink.close()
+
+
+def test_columnar_sink(db, tmp_path, sample_prediction_data):
+    """Test du sink colonnaire : agrégats et risque courant écrits par lot au flush"""
+    sink = ColumnarLogSink(ColumnarPredictionLog(str(tmp_path)), session_factory=lambda: db)
+    dropped = replace(_record(2, sample_prediction_data), store_row=False)
+
+    with patch.object(db, "commit") as commit:
+        assert sink.write(db, _record(1, sample_prediction_data)) is None
+        assert sink.write(db, dropped) is None
+        commit.assert_not_called()
+    assert db.query(PredictionDailyStats).count() == 0
+
+    assert sink.flush_derived() == 2
+    sink.close()
+
+    assert len(read_log(str(tmp_path))) == 1
+    assert db.query(func.sum(PredictionDailyStats.count)).scalar() == 2
+    risk = db.query(CurrentRisk).filter_by(employee_id=2).one()
+    assert risk.prediction_id is None and risk.probability == dropped.probability
+
+
+def test_columnar_sink_keeps_updates_when_database_down(db, tmp_path, sample_prediction_data):
+    """Test du disjoncteur : tampon conservé pendant l'indisponibilité, écrit au retour"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    sink = ColumnarLogSink(ColumnarPredictionLog(str(tmp_path)), session_factory=lambda: db, breaker=breaker)
+    for i in range(3):
+        sink.write(db, _record(i, sample_prediction_data))
+
+    with patch.object(db, "commit", side_effect=OperationalError("commit", {}, Exception("down"))):
+        assert sink.flush_derived() == 0
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # Disjoncteur ouvert : aucune tentative, les mises à jour attendent
+    sink.write(db, _record(3, sample_prediction_data))
+    with patch.object(db, "execute") as execute:
+        assert sink.flush_derived() == 0
+        execute.assert_not_called()
+
+    breaker.record_success()
+    assert sink.flush_derived() == 4
+    assert db.query(func.sum(PredictionDailyStats.count)).scalar() == 4
+    assert db.query(CurrentRisk).count() == 4
+    sink.log.close()
+
+
+def test_build_prediction_sink():
+    """Test de la sélection du sink"""
+    assert isinstance(build_prediction_sink("sql"), PredictionWriter)
+    with pytest.raises(ValueError):
+        build_prediction_sink("kafka")
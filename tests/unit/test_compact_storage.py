@@ -0,0 +1,97 @@
+"""
+Tests unitaires pour le stockage compact des données d'entrée
+"""
+import pytest
+from app.models.database import Prediction, PredictionInput, CompactPrediction
+from app.models.compact_storage import (
+    pack_input,
+    unpack_input,
+    input_digest,
+    save_compact_prediction,
+    read_input_data,
+    migrate_predictions,
+)
+
+
+def _input_without_id(data):
+    return {k: v for k, v in data.items() if k != "employee_id"}
+
+
+def test_pack_unpack_roundtrip(sample_prediction_data):
+    """Test que le vecteur reconstruit le dictionnaire d'origine"""
+    data = _input_without_id(sample_prediction_data)
+    vector = pack_input(data)
+
+    assert unpack_input(vector) == data
+    assert len(vector) < len(str(data))
+
+
+def test_pack_partial_input():
+    """Test avec des champs optionnels absents"""
+    data = {"age": 40, "revenu_mensuel": 3000.0, "nombre_heures_travailless": 38.5,
+            "annees_dans_l_entreprise": 2.0, "poste": "Manager"}
+
+    restored = unpack_input(pack_input(data))
+
+    assert restored == data
+    assert isinstance(restored["age"], int)
+    assert "department" not in restored
+
+
+def test_pack_rejects_unknown_fields():
+    """Test qu'un champ hors disposition est refusé"""
+    with pytest.raises(ValueError):
+        pack_input({"age": 30, "revenu": 50000})
+
+
+def test_pack_rejects_wrong_types():
+    """Test qu'une valeur de mauvais type est refusée"""
+    with pytest.raises(ValueError):
+        pack_input({"age": "trente"})
+    with pytest.raises(ValueError):
+        pack_input({"poste": 12})
+
+
+def test_digest_identical_inputs(sample_prediction_data):
+    """Test que deux entrées identiques ont la même empreinte"""
+    data = _input_without_id(sample_prediction_data)
+    other = dict(data, age=33)
+
+    assert input_digest(pack_input(data)) == input_digest(pack_input(dict(data)))
+    assert input_digest(pack_input(data)) != input_digest(pack_input(other))
+
+
+def test_save_compact_prediction_deduplicates(db, sample_prediction_data):
+    """Test de la déduplication des vecteurs d'entrée"""
+    data = _input_without_id(sample_prediction_data)
+    first = save_compact_prediction(db, data, 1, 0.8, "Attrition", employee_id=1)
+    second = save_compact_prediction(db, data, 1, 0.8, "Attrition", employee_id=2)
+    db.commit()
+
+    assert first.input_digest == second.input_digest
+    assert db.query(PredictionInput).count() == 1
+    assert db.query(CompactPrediction).count() == 2
+    assert read_input_data(db, second) == {"employee_id": 2, **data}
+
+
+def test_migrate_predictions(db, sample_prediction_data):
+    """Test de la migration depuis la table predictions"""
+    for employee_id in (1, 2):
+        db.add(Prediction(employee_id=employee_id, input_data=sample_prediction_data,
+                          prediction=1, probability=0.8, class_name="Attrition"))
+    db.add(Prediction(employee_id=3, input_data={"age": 30, "revenu": 50000},
+                      prediction=0, probability=0.2, class_name="Pas d'attrition"))
+    db.commit()
+
+    stats = migrate_predictions(db, batch_size=2)
+
+    assert stats == {"migrated": 2, "skipped": 0, "invalid": 1, "unique_inputs": 1}
+    compact = db.query(CompactPrediction).filter(CompactPrediction.employee_id == 2).one()
+    assert read_input_data(db, compact) == dict(sample_prediction_data, employee_id=2)
+
+    # Une seconde exécution ne duplique rien
+    stats = migrate_predictions(db, delete_source=True)
+    assert stats["migrated"] == 0
+    assert stats["skipped"] == 2
+    assert db.query(CompactPrediction).count() == 2
+    assert db.query(Prediction).count() == 1
@@ -0,0 +1,101 @@
+"""
+Tests unitaires pour la table current_risk
+"""
+from datetime import datetime
+from unittest.mock import patch
+
+from app.models.database import CurrentRisk, Prediction
+from app.models.current_risk import (
+    upsert_current_risk,
+    upsert_current_risks,
+    get_current_risks,
+    get_top_risks,
+    rebuild_current_risk,
+)
+
+
+def test_upsert_current_risk_replaces_older(db):
+    """Test que la prédiction la plus récente remplace la précédente"""
+    upsert_current_risk(db, 1, 0, 0.2, "Pas d'attrition", updated_at=datetime(2026, 10, 1))
+    upsert_current_risk(db, 1, 1, 0.9, "Attrition", department="Sales", updated_at=datetime(2026, 10, 2))
+    db.commit()
+
+    risk = db.query(CurrentRisk).one()
+    assert risk.probability == 0.9
+    assert risk.department == "Sales"
+
+
+def test_upsert_current_risk_ignores_stale(db):
+    """Test qu'une prédiction plus ancienne est ignorée"""
+    upsert_current_risk(db, 1, 1, 0.9, "Attrition", updated_at=datetime(2026, 10, 2))
+    upsert_current_risk(db, 1, 0, 0.1, "Pas d'attrition", updated_at=datetime(2026, 10, 1))
+    db.commit()
+
+    assert db.query(CurrentRisk).one().probability == 0.9
+
+
+def test_upsert_current_risks_bulk(db):
+    """Test de l'upsert groupé : insertion, remplacement et valeur plus ancienne ignorée"""
+    upsert_current_risk(db, 1, 1, 0.9, "Attrition", updated_at=datetime(2026, 10, 2))
+    upsert_current_risk(db, 2, 0, 0.2, "Pas d'attrition", updated_at=datetime(2026, 10, 1))
+    upsert_current_risks(db, [
+        {"employee_id": 1, "prediction": 0, "probability": 0.1, "class_name": "Pas d'attrition",
+         "updated_at": datetime(2026, 10, 1)},
+        {"employee_id": 2, "prediction": 1, "probability": 0.8, "class_name": "Attrition",
+         "department": "IT", "updated_at": datetime(2026, 10, 3)},
+        {"employee_id": 3, "prediction": 1, "probability": 0.7, "class_name": "Attrition"},
+    ])
+    db.commit()
+
+    risks = {r.employee_id: r for r in db.query(CurrentRisk)}
+    assert risks[1].probability == 0.9
+    assert risks[2].probability == 0.8 and risks[2].department == "IT"
+    assert risks[3].model_version == "1.0.0"
+
+
+def test_get_current_risks_and_top(db):
+    """Test des lectures multi-employés et du top-k"""
+    for employee_id, probability, department in [(1, 0.3, "Sales"), (2, 0.9, "IT"),
+                                                  (3, 0.7, "Sales"), (4, 0.5, "Sales")]:
+        upsert_current_risk(db, employee_id, int(probability > 0.5), probability,
+                            "Attrition", department=department)
+    db.commit()
+
+    assert [r.employee_id for r in get_current_risks(db, [3, 1, 42])] == [1, 3]
+    assert get_current_risks(db, []) == []
+    assert [r.employee_id for r in get_top_risks(db, k=2)] == [2, 3]
+    assert [r.employee_id for r in get_top_risks(db, k=5, department="Sales")] == [3, 4, 1]
+
+
+def test_rebuild_current_risk(db):
+    """Test de la reconstruction depuis l'historique"""
+    for created_at, probability in [(datetime(2026, 10, 2), 0.8), (datetime(2026, 10, 1), 0.1)]:
+        db.add(Prediction(employee_id=7, input_data={"department": "IT"}, prediction=1,
+                          probability=probability, class_name="Attrition", created_at=created_at))
+    db.add(Prediction(employee_id=None, input_data={}, prediction=0,
+                      probability=0.2, class_name="Pas d'attrition"))
+    db.commit()
+
+    assert rebuild_current_risk(db) == {"predictions": 2, "employees": 1}
+    risk = db.query(CurrentRisk).one()
+    assert risk.probability == 0.8
+    assert risk.department == "IT"
+
+
+def test_rebuild_current_risk_commits_per_employee_range(db):
+    """Test de la reconstruction par plages d'employee_id (un commit par plage)"""
+    for employee_id in (3, 1, 8, 5, 1):
+        db.add(Prediction(employee_id=employee_id, input_data={"poste": "Dev"}, prediction=0,
+                          probability=employee_id / 10, class_name="Pas d'attrition",
+                          created_at=datetime(2026, 10, employee_id)))
+    db.add(Prediction(employee_id=1, input_data={}, prediction=1, probability=0.9,
+                      class_name="Attrition", created_at=datetime(2026, 10, 9)))
+    db.commit()
+
+    with patch.object(db, "commit", wraps=db.commit) as commit:
+        assert rebuild_current_risk(db, batch_size=2) == {"predictions": 6, "employees": 4}
+
+    # Plages {1, 3}, {5, 8} puis la dernière plage (vide)
+    assert commit.call_count == 3
+    risks = {r.employee_id: r.probability for r in db.query(CurrentRisk).all()}
+    assert risks == {1: 0.9, 3: 0.3, 5: 0.5, 8: 0.8}
@@ -131,9 +131,44 @@ def test_create_tables():
     from app.models.database import create_tables
     from unittest.mock import patch
     
-    with patch('app.models.database.Base.metadata.create_all') as mock_create:
+    with patch('app.models.database.upgrade_schema') as mock_upgrade:
         with patch('builtins.print'):
             create_tables()
-            # Vérifier que create_all a été appelé
-            mock_create.assert_called_once()
+            # Vérifier que la création / mise à niveau a été appelée
+            mock_upgrade.assert_called_once()
+
+
+def test_upgrade_schema_adds_request_id(tmp_path):
+    """Test de la mise à niveau d'une base créée avant la colonne request_id"""
+    from sqlalchemy import create_engine, inspect, text
+    from sqlalchemy.exc import IntegrityError
+    from sqlalchemy.orm import sessionmaker
+    from app.models.database import upgrade_schema
+    from app.models.persistence import PredictionRecord, save_prediction
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        # Schéma de predictions antérieur à request_id
+        conn.execute(text(
+            "CREATE TABLE predictions (id INTEGER PRIMARY KEY, employee_id INTEGER, "
+            "input_data JSON NOT NULL, prediction INTEGER NOT NULL, probability FLOAT NOT NULL, "
+            "class_name VARCHAR NOT NULL, created_at DATETIME NOT NULL, model_version VARCHAR)"
+        ))
+
+    assert upgrade_schema(engine) == ["predictions.request_id", "predictions.aggregated"]
+    assert upgrade_schema(engine) == []
+    assert {"request_id", "aggregated"} <= {c["name"] for c in inspect(engine).get_columns("predictions")}
+    assert "current_risk" in inspect(engine).get_table_names()
+
+    db = sessionmaker(bind=engine)()
+    record = PredictionRecord(input_data={"age": 30}, prediction=1, probability=0.9, class_name="Attrition")
+    assert save_prediction(db, record) is not None
+    db.commit()
+    with pytest.raises(IntegrityError):
+        db.execute(text(
+            "INSERT INTO predictions (request_id, input_data, prediction, probability, class_name, created_at) "
+            "VALUES (:request_id, '{}', 0, 0.1, 'x', '2026-10-19')"
+        ), {"request_id": record.request_id})
+    db.close()
+    engine.dispose()
 
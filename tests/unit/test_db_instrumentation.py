@@ -0,0 +1,142 @@
+"""
+Tests unitaires pour l'instrumentation des requêtes SQL
+"""
+import pytest
+from loguru import logger
+from sqlalchemy import create_engine, text
+
+from app.core.db_instrumentation import (
+    OTHER_FINGERPRINT,
+    QueryStats,
+    checkout_wait_seconds,
+    fingerprint,
+    fingerprint_id,
+    instrument_engine,
+    query_stats,
+)
+from app.core.metrics import registry
+from app.core.tracing import Trace, _current_trace
+
+
+def test_fingerprint_strips_literals_and_parameters():
+    """Test de la normalisation : littéraux, paramètres et espaces"""
+    assert fingerprint("SELECT * FROM predictions WHERE id = 42") == "SELECT * FROM predictions WHERE id = ?"
+    assert fingerprint("SELECT *\n  FROM t WHERE name = 'O''Brien' -- commentaire") == \
+        "SELECT * FROM t WHERE name = ?"
+    assert fingerprint("UPDATE t SET a = %(a)s WHERE id = :id_1") == "UPDATE t SET a = ? WHERE id = ?"
+    assert fingerprint("SELECT col1 FROM table2 WHERE x = -1.5") == "SELECT col1 FROM table2 WHERE x = ?"
+
+
+def test_fingerprint_collapses_lists():
+    """Test du repli des listes IN et des groupes VALUES"""
+    assert fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3)") == fingerprint("SELECT * FROM t WHERE id IN (?, ?)")
+    assert fingerprint("INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)") == \
+        "INSERT INTO t (a, b) VALUES (?+)+"
+
+
+def test_query_stats_aggregates_and_caps():
+    """Test de l'agrégation par empreinte et du plafond d'empreintes"""
+    stats = QueryStats(max_fingerprints=2)
+    for i in range(20):
+        stats.observe(f"SELECT * FROM t WHERE id = {i}", 0.001 * (i + 1))
+    stats.observe("SELECT 1 FROM u", 0.5)
+    stats.observe("DELETE FROM v", 0.1)
+
+    rows = {row["query"]: row for row in stats.snapshot()}
+    assert set(rows) == {"SELECT * FROM t WHERE id = ?", "SELECT ? FROM u", OTHER_FINGERPRINT}
+    by_id = rows["SELECT * FROM t WHERE id = ?"]
+    assert by_id["count"] == 20
+    assert by_id["total_ms"] == pytest.approx(210.0)
+    assert by_id["p95_ms"] == pytest.approx(19.0)
+    assert by_id["max_ms"] == pytest.approx(20.0)
+    assert rows[OTHER_FINGERPRINT]["count"] == 1
+    assert stats.snapshot(sort="count", limit=1)[0]["count"] == 20
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+    return engine
+
+
+def test_instrument_engine_counts_queries(engine):
+    """Test du chronométrage des requêtes, de l'attente du pool et des spans"""
+    stats = QueryStats()
+    instrument_engine(engine, "unit", stats=stats, slow_threshold_ms=10_000)
+    waits_before = sum(checkout_wait_seconds.labels("unit").counts)
+
+    trace = Trace()
+    token = _current_trace.set(trace)
+    try:
+        with engine.begin() as conn:
+            for i in range(3):
+                conn.execute(text("INSERT INTO t (name) VALUES (:name)"), {"name": f"n{i}"})
+                conn.execute(text("SELECT name FROM t WHERE id = :id"), {"id": i})
+    finally:
+        _current_trace.reset(token)
+
+    rows = {row["query"]: row["count"] for row in stats.snapshot()}
+    assert rows == {"INSERT INTO t (name) VALUES (?)": 3, "SELECT name FROM t WHERE id = ?": 3}
+    assert [s[0] for s in trace.spans] == ["db"] * 6
+    assert sum(checkout_wait_seconds.labels("unit").counts) == waits_before + 1
+
+    # dispose() recrée le pool : l'attente reste mesurée
+    engine.dispose()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert sum(checkout_wait_seconds.labels("unit").counts) == waits_before + 2
+
+
+def test_slow_query_logged_with_plan(engine):
+    """Test du journal des requêtes lentes avec plan d'exécution"""
+    stats = QueryStats()
+    instrument_engine(engine, "unit", stats=stats, slow_threshold_ms=0, explain_slow=True)
+
+    records = []
+    handler_id = logger.add(records.append, level="WARNING", format="{name} {message}")
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT name FROM t WHERE id = :id"), {"id": 7})
+    finally:
+        logger.remove(handler_id)
+
+    message = str(records[-1])
+    assert message.startswith("app.slow_queries ")
+    assert "SELECT name FROM t WHERE id = ?" in message
+    assert "Plan :" in message and "SEARCH" in message
+
+
+def test_metrics_exported():
+    """Test de l'export des statistiques sur /metrics"""
+    output = registry.render()
+    assert "# TYPE db_queries_total counter" in output
+    assert "# TYPE db_query_p95_seconds gauge" in output
+    assert "# TYPE db_pool_checkout_wait_seconds histogram" in output
+
+
+def test_metrics_labelled_by_fingerprint_id():
+    """Test des étiquettes bornées : identifiant court, sans texte SQL"""
+    query_stats.observe("SELECT * FROM metrics_label_test WHERE id = 3", 0.001)
+    output = registry.render()
+
+    label = fingerprint_id("SELECT * FROM metrics_label_test WHERE id = ?")
+    assert f'db_queries_total{{fingerprint="{label}"}}' in output
+    assert "metrics_label_test" not in output
+
+
+def test_slow_query_plan_disabled_by_default(engine):
+    """Test que le plan n'est pas demandé sans SQL_EXPLAIN_SLOW (même en DEBUG)"""
+    instrument_engine(engine, "unit", stats=QueryStats(), slow_threshold_ms=0)
+
+    records = []
+    handler_id = logger.add(records.append, level="WARNING", format="{name} {message}")
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT name FROM t WHERE id = :id"), {"id": 7})
+    finally:
+        logger.remove(handler_id)
+
+    assert "app.slow_queries" in str(records[-1])
+    assert "Plan :" not in str(records[-1])
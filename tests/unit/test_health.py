@@ -1,9 +1,12 @@
 """
 Tests unitaires pour les endpoints de health check
 """
+import time
 import pytest
+from unittest.mock import Mock
 from fastapi.testclient import TestClient
 from app.main import app
+from app.core.health import HealthMonitor
 
 
 @pytest.fixture
@@ -26,3 +29,32 @@ def test_health_endpoint(client):
     assert data["version"] == "1.0.0"
 
 
+
+
+@pytest.mark.asyncio
+async def test_health_monitor_probe_timeout():
+    """Test du timeout de la sonde base de données"""
+    monitor = HealthMonitor(lambda: True, lambda: time.sleep(0.5), timeout=0.05)
+    start = time.perf_counter()
+    status = await monitor.refresh()
+
+    assert time.perf_counter() - start < 0.4
+    assert status.model_loaded is True
+    assert status.database_connected is False
+    assert status.healthy is False
+
+
+@pytest.mark.asyncio
+async def test_health_monitor_cache_and_staleness():
+    """Test du cache : nouvelle sonde seulement si l'état a expiré"""
+    database_check = Mock()
+    monitor = HealthMonitor(lambda: True, database_check, max_age=60)
+
+    first = await monitor.current()
+    assert await monitor.current() is first
+    assert first.healthy and first.database_latency_ms is not None
+    assert database_check.call_count == 1
+
+    monitor.max_age = 0
+    await monitor.current()
+    assert database_check.call_count == 2
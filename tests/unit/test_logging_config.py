@@ -0,0 +1,69 @@
+"""
+Tests unitaires pour la journalisation (loguru)
+"""
+import json
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from loguru import logger
+
+from app.core.config import Settings, get_settings
+from app.core.logging_config import request_id_var, setup_logging
+from app.main import app
+
+
+@pytest.fixture
+def json_logs(capsys):
+    """Journalisation JSON synchrone vers la sortie capturée"""
+    def configure(**overrides):
+        setup_logging(Settings(LOG_JSON=True, LOG_QUEUE=False, **overrides))
+
+    yield configure, lambda: [json.loads(line) for line in capsys.readouterr().out.splitlines() if line]
+    setup_logging(get_settings())
+
+
+def test_json_output_with_request_id(json_logs):
+    """Test du format JSON, des champs liés et de l'identifiant de requête"""
+    configure, read = json_logs
+    configure()
+
+    token = request_id_var.set("abc123")
+    try:
+        logger.bind(batch_size=3).info("Lot traité")
+    finally:
+        request_id_var.reset(token)
+    logger.info("Hors requête")
+
+    first, second = read()
+    assert first["message"] == "Lot traité"
+    assert first["level"] == "INFO"
+    assert first["logger"] == __name__
+    assert first["request_id"] == "abc123"
+    assert first["batch_size"] == 3
+    assert second["request_id"] == "-"
+
+
+def test_stdlib_logging_intercepted_with_module_levels(json_logs):
+    """Test de la redirection de logging et des niveaux par module"""
+    configure, read = json_logs
+    configure(LOG_LEVEL="WARNING", LOG_LEVELS={"app.slow_queries": "DEBUG"})
+
+    logging.getLogger("app.slow_queries").debug("requête lente")
+    logging.getLogger("app.other").info("ignoré")
+    logging.getLogger("app.other").error("erreur")
+
+    entries = read()
+    assert [(e["logger"], e["message"]) for e in entries] == [
+        ("app.slow_queries", "requête lente"),
+        ("app.other", "erreur"),
+    ]
+
+
+def test_request_id_header():
+    """Test de la reprise et de la génération de l'en-tête X-Request-ID"""
+    client = TestClient(app)
+
+    assert client.get("/health/live", headers={"X-Request-ID": "req-42"}).headers["x-request-id"] == "req-42"
+    generated = client.get("/health/live").headers["x-request-id"]
+    assert len(generated) == 32
@@ -0,0 +1,41 @@
+"""
+Tests unitaires pour la limitation des échecs de connexion
+"""
+from unittest.mock import patch
+
+from app.core.login_limiter import FailedLoginLimiter
+
+
+def test_limiter_blocks_after_max_failures():
+    """Test du blocage après `max_failures` échecs"""
+    limiter = FailedLoginLimiter(max_failures=3, window=60)
+    keys = ["user:alice", "ip:1.2.3.4"]
+
+    for _ in range(3):
+        assert limiter.retry_after(keys) == 0
+        limiter.record_failure(keys)
+
+    assert limiter.retry_after(keys) > 0
+    assert limiter.retry_after(["ip:1.2.3.4"]) > 0
+    assert limiter.retry_after(["user:bob"]) == 0
+
+
+def test_limiter_window_expires():
+    """Test de l'expiration des échecs hors fenêtre"""
+    limiter = FailedLoginLimiter(max_failures=1, window=10)
+    with patch("app.core.login_limiter.time.monotonic", return_value=100.0):
+        limiter.record_failure(["user:alice"])
+        assert limiter.retry_after(["user:alice"]) == 10
+    with patch("app.core.login_limiter.time.monotonic", return_value=111.0):
+        assert limiter.retry_after(["user:alice"]) == 0
+
+
+def test_limiter_reset_and_bounded_keys():
+    """Test de la remise à zéro et de la borne mémoire"""
+    limiter = FailedLoginLimiter(max_failures=1, window=60, max_keys=2)
+    limiter.record_failure(["a"])
+    limiter.reset(["a"])
+    assert limiter.retry_after(["a"]) == 0
+
+    limiter.record_failure(["b", "c", "d"])
+    assert len(limiter._failures) == 2
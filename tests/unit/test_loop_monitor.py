@@ -0,0 +1,55 @@
+"""
+Tests unitaires pour la surveillance de la boucle d'événements
+"""
+import asyncio
+import time
+
+import pytest
+from loguru import logger
+
+from app.core.loop_monitor import LoopLagMonitor
+
+
+def _blocking_call(seconds):
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_lag_measured_without_blocking():
+    """Test de la mesure du retard sur une boucle libre"""
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.5)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+    finally:
+        monitor.stop()
+
+    assert monitor.running is False
+    assert monitor.blocked_count == 0
+    assert monitor.last_lag < 0.5
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_detected():
+    """Test de la détection d'un appel bloquant et de la pile journalisée"""
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.05)
+    records = []
+    handler_id = logger.add(
+        records.append, level="WARNING", format="{name} {message}",
+        filter=lambda record: record["name"] == "app.loop_monitor"
+    )
+    monitor.start()
+    try:
+        await asyncio.sleep(0.02)
+        _blocking_call(0.3)
+        await asyncio.sleep(0.05)
+    finally:
+        monitor.stop()
+        logger.remove(handler_id)
+
+    assert monitor.blocked_count == 1
+    assert monitor.max_lag >= 0.2
+    message = str(records[-1])
+    assert message.startswith("app.loop_monitor ")
+    assert "bloquée" in message
+    assert "_blocking_call" in message
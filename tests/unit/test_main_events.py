@@ -3,7 +3,7 @@ Tests pour les événements de démarrage/arrêt de l'application
 """
 import pytest
 from unittest.mock import patch, MagicMock
-from app.main import app, startup_event
+from app.main import BACKGROUND_TASKS, app, shutdown_event, startup_event
 from fastapi.testclient import TestClient
 
 
@@ -12,15 +12,81 @@ async def test_startup_event_model_not_loaded():
     """Test du startup event quand le modèle ne se charge pas - ligne 60"""
     from ml.model_loader import model_loader
     
+    from loguru import logger
+    
+    messages = []
+    handler_id = logger.add(messages.append, format="{message}")
     # Mock pour simuler un échec de chargement
-    with patch.object(model_loader, 'load', return_value=False):
-        with patch('builtins.print') as mock_print:
+    try:
+        with patch.object(model_loader, 'load', return_value=False):
             # Appeler directement le startup event
             await startup_event()
-            
-            # Vérifier que le print de ligne 60 a été appelé
-            print_calls = [str(call) for call in mock_print.call_args_list]
-            assert any("modèle n'a pas pu être chargé" in str(call).lower() or "charger manuellement" in str(call).lower() for call in print_calls)
+    finally:
+        # Arrêter les tâches de fond et la surveillance de la boucle
+        await shutdown_event()
+        logger.remove(handler_id)
+    
+    # Vérifier que l'avertissement a été journalisé
+    assert any("charger manuellement" in str(message).lower() for message in messages)
+
+
+@pytest.mark.asyncio
+async def test_startup_loads_admin_keys_by_default():
+    """Test du rechargement des clés d'API même sans authentification par clé (routes /admin)"""
+    from ml.model_loader import model_loader
+    from app.main import settings
+
+    assert not settings.API_KEY_AUTH_ENABLED
+    try:
+        with patch.object(model_loader, 'load', return_value=False):
+            await startup_event()
+        refresh_task = app.state.api_key_refresh_task
+        assert not refresh_task.done()
+    finally:
+        await shutdown_event()
+    assert refresh_task.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_stops_background_tasks():
+    """Test de l'arrêt : tâches de fond annulées et terminées, surveillance de la boucle arrêtée"""
+    from ml.model_loader import model_loader
+    from app.core.loop_monitor import loop_monitor
+
+    try:
+        with patch.object(model_loader, 'load', return_value=False):
+            await startup_event()
+        tasks = [getattr(app.state, name) for name in BACKGROUND_TASKS]
+    finally:
+        await shutdown_event()
+
+    assert all(task.done() for task in tasks)
+    assert all(getattr(app.state, name) is None for name in BACKGROUND_TASKS)
+    assert not loop_monitor.running
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sink_name", ["sql", "columnar"])
+async def test_shutdown_closes_writer_once(sink_name):
+    """Test de l'arrêt : l'écrivain SQL est fermé une seule fois, qu'il soit derrière le sink ou non"""
+    from app.core.circuit_breaker import CircuitBreaker
+    from app.models import persistence
+    from app.models.persistence import PersistencePolicy, PolicySink, PredictionWriter
+
+    writer = PredictionWriter(CircuitBreaker(failure_threshold=1, reset_timeout=30), MagicMock())
+    if sink_name == "sql":
+        sink = PolicySink(writer, PersistencePolicy("score_only"))
+    else:
+        sink = MagicMock()
+        sink.unwrap.return_value = sink
+
+    with patch.object(persistence, "prediction_sink", sink), \
+            patch.object(persistence, "prediction_writer", writer):
+        await shutdown_event()
+
+    assert writer.spool.close.call_count == 1
+    if sink_name == "columnar":
+        sink.close.assert_called_once()
 
 
 def test_main_module_if_name_main():
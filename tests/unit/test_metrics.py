@@ -0,0 +1,75 @@
+"""
+Tests unitaires pour le registre de métriques
+"""
+import pytest
+
+from app.core.metrics import MetricsRegistry
+
+
+def test_counter_render():
+    """Test du rendu d'un compteur étiqueté"""
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requêtes", ("status",))
+    counter.labels("200").inc()
+    counter.labels("200").inc(2)
+    counter.labels("500").inc()
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{status="200"} 3' in text
+    assert 'requests_total{status="500"} 1' in text
+
+
+def test_histogram_buckets_cumulative():
+    """Test des seaux cumulés, de la somme et du nombre d'observations"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latence", ("stage",), buckets=(0.1, 1.0))
+    child = histogram.labels("model")
+    for value in (0.05, 0.1, 0.5, 3.0):
+        child.observe(value)
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{stage="model",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{stage="model",le="1"} 3' in text
+    assert 'latency_seconds_bucket{stage="model",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{stage="model"} 4' in text
+    assert 'latency_seconds_sum{stage="model"} 3.65' in text
+
+
+def test_histogram_timer():
+    """Test du chronomètre de bloc"""
+    registry = MetricsRegistry()
+    child = registry.histogram("block_seconds", "Bloc").labels()
+    with child.time():
+        pass
+    assert sum(child.counts) == 1
+
+
+def test_gauge_function_and_label_escaping():
+    """Test des jauges calculées et de l'échappement des étiquettes"""
+    registry = MetricsRegistry()
+    registry.gauge("queue_depth", "File", ("lane",), lambda: {('a"b',): 3})
+    registry.counter_function("events_total", "Événements", function=lambda: 7)
+
+    text = registry.render()
+    assert 'queue_depth{lane="a\\"b"} 3' in text
+    assert "# TYPE events_total counter" in text
+    assert "events_total 7" in text
+
+
+def test_registry_rejects_duplicates_and_bad_labels():
+    """Test des erreurs d'enregistrement et d'étiquettes"""
+    registry = MetricsRegistry()
+    counter = registry.counter("x_total", "X", ("a",))
+    with pytest.raises(ValueError):
+        registry.counter("x_total", "X")
+    with pytest.raises(ValueError):
+        counter.labels("1", "2")
+
+
+def test_failing_gauge_does_not_break_render():
+    """Test qu'une jauge en échec n'empêche pas l'exposition"""
+    registry = MetricsRegistry()
+    registry.gauge("broken", "Cassée", function=lambda: 1 / 0)
+    registry.counter("ok_total", "OK").inc()
+    assert "ok_total 1" in registry.render()
@@ -0,0 +1,196 @@
+"""
+Tests unitaires pour le partitionnement, la rétention et les agrégats journaliers
+"""
+import gzip
+import json
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.database import AppliedRequest, Base, Prediction, PredictionDailyStats
+from app.models.partitioning import (
+    add_months,
+    partition_name,
+    parse_partition_name,
+    PostgresPartitionManager,
+    SQLitePartitionManager,
+    get_partition_manager,
+    rollup_days,
+    apply_retention,
+)
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """Session sur une base SQLite dédiée (le fixture `db` peut viser PostgreSQL)"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'partitions.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+class _RecordingSession:
+    """Session factice : enregistre les requêtes et répond aux lectures du catalogue"""
+
+    def __init__(self, attached=(), default_months=()):
+        self.attached = list(attached)
+        self.default_months = list(default_months)
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        if "to_regclass" in sql:
+            return _Result([(True,)])
+        if "pg_inherits" in sql:
+            return _Result([(name,) for name in self.attached])
+        if "date_trunc" in sql:
+            return _Result([(datetime.combine(m, datetime.min.time()),) for m in self.default_months])
+        return _Result([])
+
+    def commit(self):
+        self.statements.append("COMMIT")
+
+    def rollback(self):
+        self.statements.append("ROLLBACK")
+
+
+class _Result(list):
+    def scalar(self):
+        return self[0][0]
+
+
+def _add_prediction(db, created_at, department="Sales", prediction=1, probability=0.8):
+    db.add(Prediction(
+        employee_id=1,
+        input_data={"age": 30, "department": department, "poste": "Manager"},
+        prediction=prediction,
+        probability=probability,
+        class_name="Attrition" if prediction else "Pas d'attrition",
+        created_at=created_at,
+    ))
+
+
+def test_month_helpers():
+    """Test des utilitaires de calcul de mois"""
+    assert add_months(date(2026, 11, 15), 2) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 31), -1) == date(2025, 12, 1)
+    assert partition_name(date(2026, 3, 9)) == "predictions_y2026m03"
+    assert parse_partition_name("predictions_y2026m03") == date(2026, 3, 1)
+    assert parse_partition_name("predictions_default") is None
+
+
+def test_postgres_partition_ddl():
+    """Test du DDL de partition PostgreSQL"""
+    ddl = PostgresPartitionManager.partition_ddl(date(2026, 12, 1))
+
+    assert "predictions_y2026m12 PARTITION OF predictions" in ddl
+    assert "FROM ('2026-12-01T00:00:00') TO ('2027-01-01T00:00:00')" in ddl
+
+
+def test_postgres_ensure_moves_default_rows():
+    """Test du déplacement des lignes de la partition par défaut avant création"""
+    db = _RecordingSession(attached=["predictions_y2026m10", "predictions_default"])
+    months = PostgresPartitionManager(db).ensure_partitions(date(2026, 10, 1), months_ahead=1)
+
+    assert months == [date(2026, 10, 1), date(2026, 11, 1)]
+    ddl = [sql for sql in db.statements if "PARTITION OF" in sql]
+    assert len(ddl) == 1 and "predictions_y2026m11" in ddl[0]
+    moved = next(i for i, sql in enumerate(db.statements) if "DELETE FROM predictions_default" in sql)
+    created = db.statements.index(ddl[0])
+    reinserted = next(i for i, sql in enumerate(db.statements) if "INSERT INTO predictions SELECT" in sql)
+    assert moved < created < reinserted
+    assert db.statements[-1] == "COMMIT"
+
+
+def test_postgres_retention_purges_default():
+    """Test de la rétention sur les mois restés dans la partition par défaut"""
+    db = _RecordingSession(attached=["predictions_y2026m10"], default_months=[date(2026, 3, 1)])
+    manager = PostgresPartitionManager(db)
+
+    assert manager.list_partitions() == [date(2026, 3, 1), date(2026, 10, 1)]
+
+    db.statements.clear()
+    manager.drop_partition(date(2026, 3, 1))
+    assert not any("DROP TABLE" in sql for sql in db.statements)
+    assert any("DELETE FROM predictions_default" in sql for sql in db.statements)
+
+
+def test_sqlite_partition_manager(sqlite_db):
+    """Test de l'équivalent SQLite des partitions mensuelles"""
+    db = sqlite_db
+    _add_prediction(db, datetime(2026, 1, 10))
+    _add_prediction(db, datetime(2026, 3, 5))
+    db.commit()
+
+    manager = get_partition_manager(db)
+    assert isinstance(manager, SQLitePartitionManager)
+    assert manager.list_partitions() == [date(2026, 1, 1), date(2026, 3, 1)]
+
+    manager.drop_partition(date(2026, 1, 1))
+    assert manager.list_partitions() == [date(2026, 3, 1)]
+
+
+def test_rollup_days_idempotent(db):
+    """Test du calcul des agrégats journaliers"""
+    _add_prediction(db, datetime(2026, 1, 10, 9), probability=0.8)
+    _add_prediction(db, datetime(2026, 1, 10, 17), prediction=0, probability=0.2)
+    _add_prediction(db, datetime(2026, 1, 10, 18), department="IT", probability=0.9)
+    _add_prediction(db, datetime(2026, 1, 11, 8))
+    db.commit()
+
+    assert rollup_days(db, date(2026, 1, 1), date(2026, 2, 1)) == 3
+    assert rollup_days(db, date(2026, 1, 1), date(2026, 2, 1)) == 0
+
+    sales = db.query(PredictionDailyStats).filter_by(day=date(2026, 1, 10), department="Sales").one()
+    assert sales.count == 2
+    assert sales.positive_count == 1
+    assert abs(sales.probability_sum - 1.0) < 1e-9
+    assert sales.poste == "Manager"
+
+
+def test_rollup_days_completes_mixed_day(db):
+    """Test d'un jour mêlant lignes anciennes et lignes déjà agrégées à l'écriture"""
+    from app.models.persistence import PredictionRecord, save_prediction
+
+    save_prediction(db, PredictionRecord(
+        input_data={"department": "Sales", "poste": "Manager"}, prediction=1, probability=0.6,
+        class_name="Attrition", created_at=datetime(2026, 1, 10, 12),
+    ))
+    _add_prediction(db, datetime(2026, 1, 10, 9), probability=0.8)
+    db.commit()
+
+    assert rollup_days(db, date(2026, 1, 1), date(2026, 2, 1)) == 1
+    assert rollup_days(db, date(2026, 1, 1), date(2026, 2, 1)) == 0
+
+    sales = db.query(PredictionDailyStats).filter_by(day=date(2026, 1, 10)).one()
+    assert sales.count == 2
+    assert abs(sales.probability_sum - 1.4) < 1e-9
+    assert db.query(Prediction).filter(Prediction.aggregated.is_(None)).count() == 0
+
+
+def test_apply_retention(sqlite_db, tmp_path):
+    """Test de la rétention avec archivage"""
+    db = sqlite_db
+    _add_prediction(db, datetime(2026, 6, 1))
+    _add_prediction(db, datetime(2026, 9, 30))
+    _add_prediction(db, datetime(2026, 10, 2))
+    db.add(AppliedRequest(request_id="old", created_at=datetime(2026, 6, 1)))
+    db.add(AppliedRequest(request_id="recent", created_at=datetime(2026, 9, 30)))
+    db.commit()
+
+    result = apply_retention(db, keep_months=2, archive_dir=tmp_path, today=date(2026, 10, 19))
+
+    assert result["dropped"] == [date(2026, 6, 1)]
+    assert db.query(Prediction).count() == 2
+    assert [r.request_id for r in db.query(AppliedRequest)] == ["recent"]
+    assert db.query(PredictionDailyStats).filter_by(day=date(2026, 6, 1)).count() == 1
+
+    with gzip.open(result["archives"][0], "rt", encoding="utf-8") as f:
+        archived = [json.loads(line) for line in f]
+    assert len(archived) == 1
+    assert archived[0]["created_at"].startswith("2026-06-01")
@@ -0,0 +1,57 @@
+"""
+Tests unitaires pour le profilage à la demande
+"""
+import asyncio
+import pytest
+
+from app.core.profiling import ProfilingBusyError, ProfilingSession, stats_to_json, stats_to_text
+
+
+def _hot_path():
+    return sum(i * i for i in range(2000))
+
+
+@pytest.mark.asyncio
+async def test_profile_stops_after_n_requests():
+    """Test de l'arrêt après le nombre de requêtes demandé"""
+    session = ProfilingSession()
+
+    async def traffic():
+        await asyncio.sleep(0)
+        for _ in range(3):
+            _hot_path()
+            session.request_finished()
+
+    task = asyncio.ensure_future(traffic())
+    stats = await session.run(max_requests=3, seconds=5)
+    await task
+
+    assert session.active is False
+    assert session.requests_profiled == 3
+    functions = stats_to_json(stats, "cumulative", limit=200)
+    assert any(f["function"] == "_hot_path" for f in functions)
+    assert functions == sorted(functions, key=lambda f: f["cumtime"], reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_profile_stops_after_timeout():
+    """Test de l'arrêt à l'expiration du délai"""
+    session = ProfilingSession()
+    stats = await session.run(max_requests=1000, seconds=0.01)
+
+    assert session.active is False
+    assert "function calls" in stats_to_text(stats, "tottime", limit=5)
+
+
+@pytest.mark.asyncio
+async def test_profile_single_session():
+    """Test du refus d'une seconde session simultanée"""
+    session = ProfilingSession()
+    first = asyncio.ensure_future(session.run(max_requests=1, seconds=1))
+    await asyncio.sleep(0)
+
+    with pytest.raises(ProfilingBusyError):
+        await session.run(max_requests=1, seconds=1)
+
+    session.request_finished()
+    await first
@@ -0,0 +1,97 @@
+"""
+Tests unitaires pour la limitation de débit (token bucket)
+"""
+import pytest
+
+from app.core.rate_limit import Budget, InMemoryRateLimitStorage, RateLimiter
+
+
+class FakeClock:
+    """Horloge contrôlée par le test"""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def limiter(clock):
+    return RateLimiter(
+        InMemoryRateLimitStorage(clock=clock),
+        {"predict": Budget(rate=1, capacity=3), "batch_rows": Budget(rate=100, capacity=1000)},
+    )
+
+
+def test_bucket_allows_burst_then_rejects(limiter):
+    """Test de la rafale autorisée puis du refus"""
+    assert all(limiter.check("predict", "ip:a").allowed for _ in range(3))
+
+    result = limiter.check("predict", "ip:a")
+    assert result.allowed is False
+    assert result.retry_after == pytest.approx(1.0)
+
+
+def test_bucket_refills(limiter, clock):
+    """Test du remplissage au débit configuré"""
+    for _ in range(3):
+        limiter.check("predict", "ip:a")
+    clock.now = 2.0
+
+    assert limiter.check("predict", "ip:a").allowed is True
+    assert limiter.check("predict", "ip:a").allowed is True
+    assert limiter.check("predict", "ip:a").allowed is False
+
+
+def test_principals_and_budgets_are_independent(limiter):
+    """Test de l'isolation entre clients et entre budgets"""
+    for _ in range(3):
+        limiter.check("predict", "key:1")
+
+    assert limiter.check("predict", "key:1").allowed is False
+    assert limiter.check("predict", "key:2").allowed is True
+    assert limiter.check("batch_rows", "key:1", cost=1000).allowed is True
+
+
+def test_batch_cost_per_row(limiter, clock):
+    """Test du coût proportionnel au nombre de lignes"""
+    assert limiter.check("batch_rows", "ip:a", cost=800).allowed is True
+
+    result = limiter.check("batch_rows", "ip:a", cost=500)
+    assert result.allowed is False
+    assert result.retry_after == pytest.approx(3.0)
+
+    clock.now = 3.0
+    assert limiter.check("batch_rows", "ip:a", cost=500).allowed is True
+    assert limiter.stats()["batch_rows"] == {"accepted_units": 1300, "rejected_requests": 1}
+
+
+def test_refund_restores_units(limiter, clock):
+    """Test du remboursement des unités d'une requête non servie, plafonné à la capacité"""
+    for _ in range(3):
+        limiter.check("predict", "ip:a")
+    limiter.refund("predict", "ip:a")
+
+    assert limiter.check("predict", "ip:a").allowed is True
+    assert limiter.check("predict", "ip:a").allowed is False
+    assert limiter.stats()["predict"]["accepted_units"] == 3
+
+    clock.now = 10.0
+    limiter.refund("predict", "ip:a", cost=5)
+    assert all(limiter.check("predict", "ip:a").allowed for _ in range(3))
+    assert limiter.check("predict", "ip:a").allowed is False
+
+
+def test_storage_bounded_keys(clock):
+    """Test de la borne sur le nombre de seaux"""
+    storage = InMemoryRateLimitStorage(max_keys=2, clock=clock)
+    budget = Budget(rate=1, capacity=1)
+    for key in ("a", "b", "c"):
+        storage.consume(key, 1, budget)
+
+    assert list(storage._buckets) == ["b", "c"]
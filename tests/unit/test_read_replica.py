@@ -0,0 +1,88 @@
+"""
+Tests unitaires pour le routage des lectures vers la réplique
+"""
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from unittest.mock import patch
+
+from app.models.database import ReadReplicaRouter, ReplicaUnavailableError, get_read_db
+
+
+def _factory(url):
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def primary_and_replica(tmp_path):
+    """Deux bases SQLite distinctes : primaire et réplique"""
+    engines = []
+    factories = []
+    for name in ("primary", "replica"):
+        engine, factory = _factory(f"sqlite:///{tmp_path / name}.db")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE origin (name TEXT)"))
+            conn.execute(text("INSERT INTO origin VALUES (:name)"), {"name": name})
+        engines.append(engine)
+        factories.append(factory)
+    yield factories
+    for engine in engines:
+        engine.dispose()
+
+
+def _origin(db):
+    return db.execute(text("SELECT name FROM origin")).scalar()
+
+
+def test_router_without_replica(primary_and_replica):
+    """Sans réplique, les lectures vont sur la primaire"""
+    primary, _ = primary_and_replica
+    router = ReadReplicaRouter(primary)
+
+    with router.session() as db:
+        assert _origin(db) == "primary"
+
+
+def test_router_uses_replica(primary_and_replica):
+    """Les lectures vont sur la réplique lorsqu'elle est disponible"""
+    primary, replica = primary_and_replica
+    router = ReadReplicaRouter(primary, replica)
+
+    with router.session() as db:
+        assert _origin(db) == "replica"
+
+
+def test_router_fallback_when_replica_down(primary_and_replica, tmp_path):
+    """Repli sur la primaire et mise à l'écart temporaire de la réplique"""
+    primary, _ = primary_and_replica
+    _, broken = _factory(f"sqlite:///{tmp_path / 'absent' / 'replica.db'}")
+    router = ReadReplicaRouter(primary, broken, fallback=True, retry_seconds=60)
+
+    with router.session() as db:
+        assert _origin(db) == "primary"
+    assert router.replica_available() is False
+
+    # La réplique n'est pas retentée avant l'expiration du délai
+    with patch.object(router, "replica_factory", wraps=router.replica_factory) as factory:
+        router.session().close()
+        factory.assert_not_called()
+
+
+def test_router_without_fallback(primary_and_replica, tmp_path):
+    """Sans repli, une réplique indisponible lève une erreur"""
+    primary, _ = primary_and_replica
+    _, broken = _factory(f"sqlite:///{tmp_path / 'absent' / 'replica.db'}")
+    router = ReadReplicaRouter(primary, broken, fallback=False)
+
+    with pytest.raises(ReplicaUnavailableError):
+        router.session()
+
+
+def test_get_read_db_returns_503():
+    """Test de la dépendance FastAPI lorsque la réplique est indisponible"""
+    with patch("app.models.database.read_router.session", side_effect=ReplicaUnavailableError("down")):
+        with pytest.raises(HTTPException) as exc_info:
+            next(get_read_db())
+    assert exc_info.value.status_code == 503
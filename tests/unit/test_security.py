@@ -8,6 +8,7 @@ from fastapi import HTTPException
 from unittest.mock import patch, MagicMock
 
 from app.core.security import (
+    pwd_context,
     verify_password,
     get_password_hash,
     create_access_token,
@@ -33,6 +34,15 @@ def test_get_password_hash():
         assert isinstance(hashed, str)
 
 
+def test_password_hash_cost_changes_trigger_rehash():
+    """Test qu'un hash d'un autre coût que BCRYPT_ROUNDS, dans les deux sens, est à recalculer"""
+    template = "$2b${:02d}$N9qo8uLOickgx2ZMRZoMyeIjZAgcfl7p92ldGxad68LJZdL17lhWy"
+
+    assert pwd_context.needs_update(template.format(settings.BCRYPT_ROUNDS)) is False
+    assert pwd_context.needs_update(template.format(settings.BCRYPT_ROUNDS - 2)) is True
+    assert pwd_context.needs_update(template.format(settings.BCRYPT_ROUNDS + 2)) is True
+
+
 def test_verify_password_correct():
     """Test de vérification de mot de passe correct"""
     password = "test123"
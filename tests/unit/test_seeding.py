@@ -0,0 +1,45 @@
+"""
+Tests unitaires pour le chargement en masse de prédictions synthétiques
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from app.models.aggregates import query_stats
+from app.models.database import Prediction
+from app.models.schemas import PredictRequest
+from app.models.seeding import seed_predictions
+
+
+def test_seed_predictions_inserts_chunks(db):
+    """Test du nombre de lignes, des blocs et de la progression"""
+    progress = []
+    now = datetime(2026, 10, 1, 12)
+    stats = seed_predictions(
+        db, rows=1200, chunk_size=500, employees=100, days=30, seed=0, now=now, on_progress=progress.append
+    )
+
+    assert stats == {"inserted": 1200, "chunks": 3}
+    assert [p.inserted for p in progress] == [500, 1000, 1200]
+    assert progress[-1].eta_seconds == 0
+    assert db.query(func.count(Prediction.id)).scalar() == 1200
+    assert db.query(func.count(func.distinct(Prediction.employee_id))).scalar() <= 100
+
+    oldest, newest = db.query(func.min(Prediction.created_at), func.max(Prediction.created_at)).one()
+    assert oldest >= now - timedelta(days=30)
+    assert newest <= now
+
+    prediction = db.query(Prediction).first()
+    assert prediction.input_data["employee_id"] == prediction.employee_id
+    PredictRequest(**prediction.input_data)
+    assert prediction.class_name == ("Attrition" if prediction.prediction == 1 else "Pas d'attrition")
+
+
+def test_seed_predictions_updates_aggregates(db):
+    """Test des agrégats journaliers incrémentés par bloc"""
+    seed_predictions(db, rows=300, chunk_size=100, seed=1, scorer=lambda df: [0.9] * len(df))
+
+    overall = query_stats(db, group_by=[])[0]
+    assert overall["count"] == 300
+    assert overall["positive_count"] == 300
+    assert abs(overall["mean_probability"] - 0.9) < 1e-9
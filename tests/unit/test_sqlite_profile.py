@@ -0,0 +1,177 @@
+"""
+Tests unitaires pour le profil SQLite (pragmas, écrivain dédié)
+"""
+import threading
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.models.database import (
+    Base,
+    Prediction,
+    SQLiteWriteQueue,
+    configure_sqlite_engine,
+    is_sqlite_file,
+)
+from app.models.persistence import PredictionRecord, PredictionWriter
+from app.models.spool import PredictionSpool
+
+
+@pytest.fixture
+def sqlite_url(tmp_path):
+    """Base SQLite sur fichier avec les tables créées"""
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    engine = configure_sqlite_engine(create_engine(url, connect_args={"check_same_thread": False}))
+    Base.metadata.create_all(bind=engine)
+    yield url
+    engine.dispose()
+
+
+@pytest.fixture
+def write_queue(sqlite_url):
+    """Écrivain dédié sur la base de test"""
+    write_queue = SQLiteWriteQueue(sqlite_url, max_batch=16)
+    yield write_queue
+    write_queue.close()
+
+
+def _add_prediction(employee_id):
+    def write(session):
+        prediction = Prediction(
+            employee_id=employee_id,
+            input_data={},
+            prediction=1,
+            probability=0.9,
+            class_name="Attrition",
+        )
+        session.add(prediction)
+        session.flush()
+        return prediction.id
+    return write
+
+
+def test_is_sqlite_file():
+    """Test de la détection d'une base SQLite sur fichier"""
+    assert is_sqlite_file("sqlite:///./app.db") is True
+    assert is_sqlite_file("sqlite://") is False
+    assert is_sqlite_file("sqlite:///:memory:") is False
+    assert is_sqlite_file("postgresql://localhost/db") is False
+
+
+def test_pragmas_applied(sqlite_url):
+    """Test de l'application des pragmas à la connexion"""
+    engine = configure_sqlite_engine(create_engine(sqlite_url))
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+    engine.dispose()
+
+
+def test_write_queue_group_commit(sqlite_url, write_queue):
+    """Test des écritures concurrentes regroupées par l'écrivain"""
+    results = []
+
+    def worker(i):
+        results.append(write_queue.execute(_add_prediction(i), timeout=10))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(40)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(set(results)) == 40
+    assert write_queue.writes == 40
+    assert write_queue.batches <= 40
+
+    engine = create_engine(sqlite_url)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM predictions")).scalar() == 40
+    engine.dispose()
+
+
+def test_write_queue_failure_isolated(sqlite_url, write_queue):
+    """Test qu'une écriture en échec n'annule pas les autres du lot"""
+    def failing(session):
+        session.add(Prediction(input_data={}, prediction=1, probability=0.5, class_name="x"))
+        session.flush()
+        raise ValueError("boom")
+
+    futures = [write_queue.submit(_add_prediction(1)), write_queue.submit(failing),
+               write_queue.submit(_add_prediction(2))]
+
+    assert futures[0].result(10) is not None
+    with pytest.raises(ValueError):
+        futures[1].result(10)
+    assert futures[2].result(10) is not None
+
+    engine = create_engine(sqlite_url)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM predictions")).scalar() == 2
+    engine.dispose()
+
+
+def test_prediction_writer_uses_queue(sqlite_url, write_queue, tmp_path):
+    """Test que le writer passe par l'écrivain dédié pour sa base"""
+    writer = PredictionWriter(
+        CircuitBreaker(failure_threshold=1, reset_timeout=30),
+        PredictionSpool(str(tmp_path / "spool")),
+        write_queue=write_queue,
+    )
+    engine = create_engine(sqlite_url, connect_args={"check_same_thread": False})
+    db = sessionmaker(bind=engine)()
+    try:
+        prediction_id = writer.write(db, PredictionRecord(
+            employee_id=7, input_data={"department": "Sales"},
+            prediction=1, probability=0.9, class_name="Attrition",
+        ))
+        assert prediction_id is not None
+        assert write_queue.writes == 1
+        assert db.get(Prediction, prediction_id).employee_id == 7
+    finally:
+        db.close()
+        writer.spool.close()
+        engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_write_queue_async_group_commit(write_queue):
+    """Test du regroupement des écritures attendues depuis la boucle d'événements"""
+    import asyncio
+
+    write_queue.linger = 0.005
+    ids = await asyncio.gather(*(write_queue.execute_async(_add_prediction(i)) for i in range(50)))
+
+    assert len(set(ids)) == 50
+    assert write_queue.writes == 50
+    assert write_queue.batches < write_queue.writes
+
+
+@pytest.mark.asyncio
+async def test_prediction_writer_async_timeout_spools(sqlite_url, tmp_path):
+    """Test du spool lorsqu'une écriture dépasse le délai de l'écrivain"""
+    import time
+
+    write_queue = SQLiteWriteQueue(sqlite_url, timeout=0.05)
+    writer = PredictionWriter(
+        CircuitBreaker(failure_threshold=1, reset_timeout=30),
+        PredictionSpool(str(tmp_path / "spool")),
+        write_queue=write_queue,
+    )
+    engine = create_engine(sqlite_url, connect_args={"check_same_thread": False})
+    db = sessionmaker(bind=engine)()
+    try:
+        # Écrivain occupé : l'écriture suivante attend au-delà du délai
+        write_queue.submit(lambda session: time.sleep(0.3))
+        prediction_id = await writer.write_async(db, PredictionRecord(
+            employee_id=7, input_data={}, prediction=1, probability=0.9, class_name="Attrition",
+        ))
+        assert prediction_id is None
+        assert writer.spooled_count == 1
+        assert writer.breaker.state == CircuitBreaker.OPEN
+    finally:
+        db.close()
+        writer.close()
+        engine.dispose()
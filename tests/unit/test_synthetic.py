@@ -0,0 +1,78 @@
+"""
+Tests unitaires pour le générateur d'employés synthétiques
+"""
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.models.schemas import PredictRequest
+from ml.synthetic import (
+    DEFAULT_CATEGORIES, GeneratorProfile, generate_employees, iter_employee_chunks, schema_bounds,
+    synthetic_probability
+)
+
+
+def test_generate_employees_matches_schema():
+    """Test des colonnes, bornes et catégories"""
+    df = generate_employees(5000, seed=0)
+
+    assert list(df.columns) == list(PredictRequest.model_fields)
+    for name, (low, high) in schema_bounds().items():
+        if name == "employee_id":
+            continue
+        if low is not None:
+            assert df[name].min() >= low, name
+        if high is not None:
+            assert df[name].max() <= high, name
+    for name, categories in DEFAULT_CATEGORIES.items():
+        assert set(df[name]) <= set(categories)
+    for record in df.head(200).to_dict("records"):
+        PredictRequest(**record)
+
+
+def test_generate_employees_consistency():
+    """Test de la cohérence entre âge, expérience, ancienneté et poste"""
+    df = generate_employees(20000, seed=1)
+
+    assert (df["annee_experience_totale"] <= df["age"] - 18).all()
+    assert (df["annees_dans_l_entreprise"] <= df["annee_experience_totale"]).all()
+    assert (df["annees_dans_le_poste_actuel"] <= df["annees_dans_l_entreprise"]).all()
+    assert (df["annees_depuis_la_derniere_promotion"] <= df["annees_dans_l_entreprise"]).all()
+    assert np.corrcoef(df["annee_experience_totale"], np.log(df["revenu_mensuel"]))[0, 1] > 0.2
+    assert abs(df["age"].mean() - 37) < 1
+
+
+def test_generate_employees_reproducible():
+    """Test de la graine et des identifiants consécutifs par bloc"""
+    assert generate_employees(100, seed=7).equals(generate_employees(100, seed=7))
+
+    chunks = list(iter_employee_chunks(250, chunk_size=100, seed=7))
+    assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+    assert chunks[-1]["employee_id"].tolist() == list(range(201, 251))
+
+
+def test_profile_from_model():
+    """Test de la lecture des distributions et catégories du pipeline"""
+    scaler = SimpleNamespace(mean_=np.array([45.0, 1.0]), scale_=np.array([5.0, 1.0]))
+    encoder = SimpleNamespace(categories_=[np.array(["A", "B"]), np.array(["X"])])
+    transformer = SimpleNamespace(transformers_=[
+        ("num", scaler, ["age", "inconnue"]),
+        ("cat", SimpleNamespace(steps=[("encoder", encoder)]), ["departement", "inconnue"]),
+    ])
+    profile = GeneratorProfile.from_model(SimpleNamespace(steps=[("columntransformer", transformer)]))
+
+    assert profile.numeric["age"] == (45.0, 5.0)
+    assert profile.categories["department"] == ("A", "B")
+    assert "inconnue" not in profile.numeric
+    assert profile.categories["poste"] == DEFAULT_CATEGORIES["poste"]
+    assert set(generate_employees(100, seed=0, profile=profile)["department"]) <= {"A", "B"}
+
+
+def test_synthetic_probability():
+    """Test des probabilités synthétiques (bornées, sensibles aux heures supplémentaires)"""
+    df = generate_employees(20000, seed=2)
+    probabilities = synthetic_probability(df, np.random.default_rng(0))
+
+    assert ((probabilities > 0) & (probabilities < 1)).all()
+    overtime = df["heure_supplementaires"] == 1
+    assert probabilities[overtime].mean() > probabilities[~overtime].mean()
@@ -0,0 +1,108 @@
+"""
+Tests unitaires pour le cache des tokens JWT vérifiés
+"""
+import time
+from datetime import timedelta
+from unittest.mock import patch
+from jose import ExpiredSignatureError, jwt
+
+from app.core.token_cache import TokenCache
+from app.core.security import create_access_token, revoke_token, token_cache, verify_token
+
+
+def _payload(ttl=60):
+    return {"sub": "user", "exp": time.time() + ttl}
+
+
+def test_cache_hit_and_miss():
+    """Test des succès et échecs du cache"""
+    cache = TokenCache(max_size=10)
+
+    assert cache.get("token") is None
+    cache.put("token", _payload())
+    assert cache.get("token")["sub"] == "user"
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_cache_expiry():
+    """Test de l'expiration d'une entrée au `exp` du token"""
+    cache = TokenCache()
+    cache.put("token", _payload(ttl=10))
+
+    with patch("app.core.token_cache.time.time", return_value=time.time() + 11):
+        assert cache.get("token") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_cache_lru_eviction():
+    """Test de l'éviction de l'entrée la moins récemment utilisée"""
+    cache = TokenCache(max_size=2)
+    cache.put("a", _payload())
+    cache.put("b", _payload())
+    cache.get("a")
+    cache.put("c", _payload())
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_ignores_payload_without_exp():
+    """Test qu'un payload sans expiration n'est pas mis en cache"""
+    cache = TokenCache()
+    cache.put("token", {"sub": "user"})
+    assert cache.get("token") is None
+
+
+def test_cache_returns_copy():
+    """Test que le payload en cache ne peut pas être modifié par l'appelant"""
+    cache = TokenCache()
+    cache.put("token", _payload())
+    cache.get("token")["sub"] = "other"
+    assert cache.get("token")["sub"] == "user"
+
+
+def test_verify_token_uses_cache():
+    """Test que la vérification n'est faite qu'une fois par token"""
+    token = create_access_token({"sub": "cached_user"})
+
+    with patch("app.core.security.jwt.decode", wraps=jwt.decode) as decode:
+        assert verify_token(token)["sub"] == "cached_user"
+        assert verify_token(token)["sub"] == "cached_user"
+    assert decode.call_count == 1
+
+
+def test_verify_token_tampered_not_cached():
+    """Test qu'un token altéré est refusé même si l'original est en cache"""
+    token = create_access_token({"sub": "user"})
+    assert verify_token(token) is not None
+
+    header, payload, signature = token.split(".")
+    tampered = ".".join([header, payload, signature[:-2] + ("AA" if signature[-2:] != "AA" else "BB")])
+    assert verify_token(tampered) is None
+
+
+def test_verify_token_expired_cached_entry():
+    """Test qu'un token en cache est refusé après son expiration"""
+    token = create_access_token({"sub": "user"}, expires_delta=timedelta(seconds=30))
+    assert verify_token(token) is not None
+
+    later = time.time() + 60
+    with patch("app.core.token_cache.time.time", return_value=later), \
+            patch("app.core.security.jwt.decode", side_effect=ExpiredSignatureError("expired")):
+        assert verify_token(token) is None
+
+
+def test_revoke_token():
+    """Test de la révocation d'un token"""
+    token = create_access_token({"sub": "revoked_user"})
+    assert verify_token(token) is not None
+
+    revoke_token(token)
+
+    assert verify_token(token) is None
+    assert token_cache.is_revoked(token) is True
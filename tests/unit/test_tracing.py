@@ -0,0 +1,135 @@
+"""
+Tests unitaires pour les traces par requête
+"""
+import json
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from loguru import logger
+
+from app.core.tracing import (
+    Trace,
+    TracingMiddleware,
+    aggregate_spans,
+    current_trace,
+    record_span,
+    set_attribute,
+    span,
+)
+
+
+def _app(sample_rate=1.0, slow_threshold_ms=10_000.0, delay=0.0):
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware, sample_rate=sample_rate, slow_threshold_ms=slow_threshold_ms)
+
+    @app.get("/work")
+    async def work():
+        with span("outer"):
+            start = time.perf_counter()
+            time.sleep(delay)
+            record_span("inner", start, time.perf_counter())
+            record_span("inner", start, time.perf_counter())
+        set_attribute("batch_size", 3)
+        return {"traced": current_trace() is not None}
+
+    return app
+
+
+def test_span_noop_without_trace():
+    """Test que l'instrumentation ne fait rien hors trace"""
+    assert current_trace() is None
+    with span("stage"):
+        record_span("other", 0.0, 1.0)
+        set_attribute("key", "value")
+
+
+def test_trace_tree_and_server_timing():
+    """Test de l'arbre de spans et de l'en-tête Server-Timing"""
+    trace = Trace()
+    index = trace.open("batch", trace.start)
+    trace.add("model_predict", trace.start, trace.start + 0.002)
+    trace.add("model_predict", trace.start, trace.start + 0.001)
+    trace.close(index, trace.start + 0.005)
+
+    tree = trace.tree()
+    assert [(s["name"], s["depth"]) for s in tree] == [("batch", 0), ("model_predict", 1), ("model_predict", 1)]
+    header = trace.server_timing()
+    assert "batch;dur=5.00" in header
+    assert 'model_predict;dur=3.00;desc="x2"' in header
+    assert "total;dur=" in header
+
+
+def test_middleware_server_timing_header():
+    """Test de l'en-tête Server-Timing sur une requête tracée"""
+    response = TestClient(_app()).get("/work")
+
+    assert response.json() == {"traced": True}
+    assert "outer;dur=" in response.headers["server-timing"]
+    assert 'inner;dur=' in response.headers["server-timing"]
+
+
+def test_middleware_sampling_disabled():
+    """Test qu'aucune trace n'est créée avec un taux d'échantillonnage nul"""
+    response = TestClient(_app(sample_rate=0.0)).get("/work")
+
+    assert response.json() == {"traced": False}
+    assert "server-timing" not in response.headers
+
+
+def _slow_requests(run):
+    """Entrées JSON du journal app.slow_requests émises pendant `run()`"""
+    records = []
+    handler_id = logger.add(
+        records.append, level="WARNING", format="{message}",
+        filter=lambda record: record["name"] == "app.slow_requests"
+    )
+    try:
+        run()
+    finally:
+        logger.remove(handler_id)
+    return [json.loads(record) for record in records]
+
+
+def test_slow_request_logged():
+    """Test de la journalisation structurée d'une requête lente"""
+    entry = _slow_requests(lambda: TestClient(_app(slow_threshold_ms=1.0, delay=0.01)).get("/work"))[-1]
+    assert entry["path"] == "/work"
+    assert entry["status"] == 200
+    assert entry["batch_size"] == 3
+    assert entry["duration_ms"] >= 1.0
+    assert [s["name"] for s in entry["spans"]] == ["outer", "inner", "inner"]
+    assert entry["spans"][1]["depth"] == 1
+
+
+def test_trace_caps_spans():
+    """Test du plafond de spans : les suivants sont agrégés par nom"""
+    trace = Trace(max_spans=3)
+    for i in range(10):
+        trace.add("db", trace.start, trace.start + 0.001 * (i + 1))
+
+    assert len(trace.tree()) == 3
+    assert trace.summary() == [{"name": "db", "count": 7, "total_ms": 49.0, "max_ms": 10.0}]
+    assert 'db;dur=55.00;desc="x10"' in trace.server_timing()
+
+
+def test_batch_spans_aggregated():
+    """Test de l'agrégation des spans d'un lot dans le journal des requêtes lentes"""
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware, sample_rate=1.0, slow_threshold_ms=0.0)
+
+    @app.get("/batch")
+    async def batch():
+        with span("batch"), aggregate_spans():
+            for _ in range(1000):
+                with span("row"):
+                    record_span("model_predict", 0.0, 0.002)
+        record_span("after", 0.0, 0.001)
+        return {}
+
+    entry = _slow_requests(lambda: TestClient(app).get("/batch"))[-1]
+    assert [s["name"] for s in entry["spans"]] == ["batch", "after"]
+    stats = {s["name"]: s for s in entry["span_stats"]}
+    assert stats["row"]["count"] == 1000
+    assert stats["model_predict"]["count"] == 1000
+    assert stats["model_predict"]["max_ms"] == 2.0